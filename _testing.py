@@ -0,0 +1,54 @@
+"""Shared helpers for the test scripts: synthetic clips and stub models (not collected as tests)."""
+
+import cv2
+import numpy as np
+
+from src.classifiers.base import Classifier
+from src.config import AppConfig
+from src.detectors.base import Detector
+from src.llm.cache import ExplanationCache
+from src.llm.explainer import LLMExplainer
+from src.pipeline import PipelineModels
+from src.utils.types import ClassificationResult, Detection
+
+
+def write_clip(path, count=40, fps=30, size=(160, 120), step=6):
+    """Flat-grey MJPG clip whose frame ``i`` has brightness ``i * step`` (mod 256)."""
+    # MJPG is intra-only, so every decoder reproduces each frame exactly
+    w, h = size
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), fps, (w, h))
+    for i in range(count):
+        writer.write(np.full((h, w, 3), (i * step) % 256, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+class CenterSign(Detector):
+    """One stop sign in the middle of every frame."""
+
+    def detect(self, frame):
+        h, w = frame.shape[:2]
+        return [Detection("stop", 0.9, (w // 2 - 20, h // 2 - 20, w // 2 + 20, h // 2 + 20))]
+
+
+class StopClassifier(Classifier):
+    def classify_crops(self, crops):
+        return [ClassificationResult("stop", 0.95) for _ in crops]
+
+
+def make_models(detector, classifier, cfg=None):
+    """``PipelineModels`` around stub models, with a stub LLM and an in-memory explanation cache."""
+    cfg = cfg or AppConfig()
+    return PipelineModels(detector, classifier, LLMExplainer(cfg.llm), ExplanationCache())
+
+
+def stub_models(cfg):
+    """Module-level so that worker processes can unpickle it as a models factory."""
+    return make_models(CenterSign(), StopClassifier(), cfg)
+
+
+def sync_config():
+    """Default config with LLM explanations generated inline, so results do not depend on a worker thread."""
+    cfg = AppConfig()
+    cfg.llm.async_explain = False
+    return cfg
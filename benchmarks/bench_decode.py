@@ -0,0 +1,98 @@
+"""Benchmark video file decoding: read() every frame vs grab()/retrieve() sampling vs segment-parallel workers.
+
+Usage:
+    python -m benchmarks.bench_decode [VIDEO] [--frames 300] [--stride 3] [--workers 1 2 4] [--hw] [--threads N]
+
+Point VIDEO at a clip from the 1080p dashcam archive. Without one, a synthetic
+1080p MPEG-4 clip of ``--frames`` frames is written to a temporary directory.
+"source fps" is video frames covered per second and "kept fps" is frames
+delivered to the pipeline per second.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from src.utils.decode import ParallelDecoder, open_capture, read_frames
+
+
+def _synthetic_clip(path: str, frames: int) -> str:
+    rng = np.random.default_rng(0)
+    base = cv2.GaussianBlur(rng.integers(0, 255, size=(1080, 1920, 3), dtype=np.uint8), (0, 0), 3)
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), 30, (1920, 1080))
+    for i in range(frames):
+        writer.write(np.roll(base, i * 12, axis=1))  # camera pan
+    writer.release()
+    return path
+
+
+def _read_all(path: str, stride: int, hw: bool, threads: int):
+    """Baseline: decode and retrieve every frame, keep every ``stride``-th."""
+    cap = open_capture(path, hw, threads)
+    covered = kept = 0
+    while True:
+        ok, _ = cap.read()
+        if not ok:
+            break
+        kept += covered % stride == 0
+        covered += 1
+    cap.release()
+    return covered, kept
+
+
+def _grab_retrieve(path: str, stride: int, hw: bool, threads: int):
+    cap = open_capture(path, hw, threads)
+    last = kept = 0
+    for last, _ in read_frames(cap, stride=stride):
+        kept += 1
+    covered = int(cap.get(cv2.CAP_PROP_POS_FRAMES)) or last + 1
+    cap.release()
+    return covered, kept
+
+
+def _parallel(path: str, stride: int, workers: int, hw: bool, threads: int):
+    decoder = ParallelDecoder(path, workers=workers, stride=stride, hw_accel=hw, threads=threads)
+    kept = 0
+    for _ in decoder.frames():
+        kept += 1
+    return decoder.total, kept
+
+
+def _run(name: str, fn, *args) -> None:
+    start = time.perf_counter()
+    covered, kept = fn(*args)
+    seconds = time.perf_counter() - start
+    print(f"{name:<28} {kept:>6} {seconds:>8.2f} {covered / seconds:>11.1f} {kept / seconds:>10.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Video decode throughput benchmark")
+    parser.add_argument("video", nargs="?", help="Video file (default: synthetic 1080p clip)")
+    parser.add_argument("--frames", type=int, default=300, help="Length of the synthetic clip")
+    parser.add_argument("--stride", type=int, default=3, help="Keep every Nth frame (e.g. 30 fps source at 10 fps)")
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 2, 4], help="Worker process counts for parallel decoding")
+    parser.add_argument("--hw", action="store_true", help="Request hardware decoding")
+    parser.add_argument("--threads", type=int, default=0, help="Decoder threads per capture (0: backend default)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.video or _synthetic_clip(os.path.join(tmp, "synthetic_1080p.mp4"), args.frames)
+        cap = cv2.VideoCapture(path)
+        size = f"{int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))}x{int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))}"
+        print(f"{path}: {size}, {int(cap.get(cv2.CAP_PROP_FRAME_COUNT))} frames @ {cap.get(cv2.CAP_PROP_FPS):.1f} fps, "
+              f"{os.cpu_count()} CPUs{', hw decode requested' if args.hw else ''}")
+        cap.release()
+        print(f"{'mode':<28} {'kept':>6} {'seconds':>8} {'source fps':>11} {'kept fps':>10}")
+        _run("read() all", _read_all, path, 1, args.hw, args.threads)
+        _run(f"read() all, keep 1/{args.stride}", _read_all, path, args.stride, args.hw, args.threads)
+        _run(f"grab/retrieve 1/{args.stride}", _grab_retrieve, path, args.stride, args.hw, args.threads)
+        for workers in args.workers:
+            _run(f"{workers} workers, keep 1/{args.stride}", _parallel, path, args.stride, workers, args.hw, args.threads)
+
+
+if __name__ == "__main__":
+    main()
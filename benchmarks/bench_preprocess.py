@@ -0,0 +1,84 @@
+"""Benchmark the cached Preprocessor against rebuilding CLAHE/kernels/LUTs per frame.
+
+Usage:
+    python -m benchmarks.bench_preprocess [--frames 100] [--repeats 7] [--native]
+
+``--native`` preprocesses at the source resolution instead of the default
+640x640 detector input, which magnifies per-frame allocation costs. Each
+variant is timed ``--repeats`` times, alternating between them; the table
+reports the median per-frame time and the spread (min-max) of the runs.
+"""
+
+import argparse
+import statistics
+import time
+
+import cv2
+import numpy as np
+
+from src.config import PreprocessConfig
+from src.utils.preprocess import Preprocessor
+
+RESOLUTIONS = {"720p": (1280, 720), "1080p": (1920, 1080)}
+
+
+def _legacy_preprocess(frame: np.ndarray, cfg: PreprocessConfig, target_size: tuple) -> np.ndarray:
+    """The per-frame implementation the Preprocessor replaced, kept as the baseline."""
+    processed = cv2.resize(frame, target_size, interpolation=cv2.INTER_LINEAR)
+    if cfg.enable_clahe:
+        lab = cv2.cvtColor(processed, cv2.COLOR_BGR2LAB)
+        l, a, b = cv2.split(lab)
+        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+        l = clahe.apply(l)
+        processed = cv2.merge([l, a, b])
+        processed = cv2.cvtColor(processed, cv2.COLOR_LAB2BGR)
+    if cfg.enable_blur:
+        processed = cv2.GaussianBlur(processed, (cfg.blur_kernel, cfg.blur_kernel), 0)
+    if cfg.enable_bilateral:
+        processed = cv2.bilateralFilter(processed, 9, 75, 75)
+    if cfg.enable_sharpen:
+        kernel = np.array([[-1, -1, -1], [-1, 9, -1], [-1, -1, -1]])
+        processed = cv2.filter2D(processed, -1, kernel)
+    if cfg.enable_gamma:
+        inv_gamma = 1.0 / cfg.gamma
+        table = np.array([((i / 255.0) ** inv_gamma) * 255 for i in range(256)]).astype("uint8")
+        processed = cv2.LUT(processed, table)
+    return processed
+
+
+def _time(fn, frames) -> float:
+    start = time.perf_counter()
+    for frame in frames:
+        fn(frame)
+    return (time.perf_counter() - start) * 1000 / len(frames)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Preprocessing per-frame cost benchmark")
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--repeats", type=int, default=7, help="Timed runs per variant; the median is reported")
+    parser.add_argument("--native", action="store_true", help="Preprocess at source resolution instead of 640x640")
+    args = parser.parse_args()
+
+    # The legacy path stretches, so the Preprocessor must too for the two to do the same work.
+    cfg = PreprocessConfig(enable_gamma=True, letterbox=False)
+    rng = np.random.default_rng(0)
+    print(f"{'source':>8} {'target':>10} {'legacy ms':>20} {'cached ms':>20} {'saved':>8}")
+    for name, (w, h) in RESOLUTIONS.items():
+        target = (w, h) if args.native else (640, 640)
+        frames = [rng.integers(0, 255, size=(h, w, 3), dtype=np.uint8) for _ in range(4)] * max(1, args.frames // 4)
+        variants = {"legacy": lambda f: _legacy_preprocess(f, cfg, target), "cached": Preprocessor(cfg, target)}
+        if not np.array_equal(variants["legacy"](frames[0]), variants["cached"](frames[0])):  # also the warm-up
+            raise SystemExit(f"{name}: Preprocessor output differs from the legacy baseline; the comparison is void")
+        runs = {key: [] for key in variants}
+        for _ in range(max(1, args.repeats)):
+            for key, fn in variants.items():
+                runs[key].append(_time(fn, frames))
+        legacy, cached = (statistics.median(runs[key]) for key in variants)
+        spread = {key: f"{min(r):.2f}-{max(r):.2f}" for key, r in runs.items()}
+        print(f"{name:>8} {target[0]}x{target[1]:<6} {legacy:6.2f} ({spread['legacy']:>11}) "
+              f"{cached:6.2f} ({spread['cached']:>11}) {1 - cached / legacy:8.1%}")
+
+
+if __name__ == "__main__":
+    main()
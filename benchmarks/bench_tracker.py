@@ -0,0 +1,62 @@
+"""Benchmark EnhancedTracker.update as the number of simultaneous tracks grows.
+
+Usage:
+    python -m benchmarks.bench_tracker [--frames 50] [--counts 10 50 100 200 400]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from src.utils import tracker as tracker_mod
+from src.utils.tracker import EnhancedTracker
+from src.utils.types import Detection
+
+LABELS = ["stop", "yield", "speed_limit_50", "no_entry", "pedestrian_crossing"]
+
+
+def _scene(n: int, rng: np.random.Generator) -> np.ndarray:
+    xy = rng.uniform(0, 1800, size=(n, 2))
+    wh = rng.uniform(15, 80, size=(n, 2))
+    return np.hstack([xy, xy + wh])
+
+
+def bench(n_tracks: int, frames: int, seed: int = 0) -> float:
+    """Mean update time in milliseconds for ``n_tracks`` jittering boxes."""
+    rng = np.random.default_rng(seed)
+    boxes = _scene(n_tracks, rng)
+    labels = [LABELS[i % len(LABELS)] for i in range(n_tracks)]
+    tracker = EnhancedTracker(iou_threshold=0.3, max_age=30, min_stable=3)
+    timings = []
+    for _ in range(frames):
+        boxes = boxes + rng.normal(0, 1.5, size=boxes.shape)
+        detections = [
+            Detection(label=labels[i], confidence=float(rng.uniform(0.5, 1.0)), bbox=tuple(int(v) for v in boxes[i]))
+            for i in range(n_tracks)
+        ]
+        start = time.perf_counter()
+        tracker.update(detections)
+        timings.append(time.perf_counter() - start)
+    return float(np.mean(timings[1:])) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="EnhancedTracker.update scaling benchmark")
+    parser.add_argument("--frames", type=int, default=50)
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 50, 100, 200, 400])
+    args = parser.parse_args()
+
+    solver = tracker_mod.linear_sum_assignment
+    print(f"{'tracks':>8} {'optimal ms':>12} {'greedy ms':>12}")
+    for n in args.counts:
+        tracker_mod.linear_sum_assignment = solver
+        optimal = bench(n, args.frames) if solver is not None else float("nan")
+        tracker_mod.linear_sum_assignment = None
+        greedy = bench(n, args.frames)
+        print(f"{n:>8} {optimal:>12.2f} {greedy:>12.2f}")
+    tracker_mod.linear_sum_assignment = solver
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""
+Offline batch processing of recorded drives.
+
+Videos are sharded over a process pool. Every worker builds its own
+detector/classifier once and runs ``process_stream`` over one video at a time,
+without the UI. Each video's results are streamed to ``<output>/<video>-<hash>.jsonl``
+(one ``FrameResult`` per line), or with ``--format parquet|arrow|npy`` to a
+columnar ``ResultSink`` file (one row per detection, optional logits). The
+output is renamed into place once its video is complete, and the video is then recorded in ``manifest.jsonl``. A rerun with
+the same output directory skips every video the manifest lists as done and
+retries the failed or interrupted ones.
+
+Usage:
+    python -m src.main batch /data/drives "/archive/2024-*/*.mp4" --output results/ [--workers N] [--fps 10] [--format parquet]
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import cv2
+
+from .config import AppConfig
+from .pipeline import PipelineModels, build_models, process_stream
+from .utils.decode import decode_stride, open_capture, read_frames
+from .utils.result_sink import FORMATS, ResultSink
+from .utils.types import FrameResult
+
+try:
+    import torch
+except ImportError:  # pragma: no cover - optional
+    torch = None
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".m4v", ".ts")
+MANIFEST = "manifest.jsonl"
+SUFFIXES = {"jsonl": ".jsonl", "parquet": ".parquet", "arrow": ".arrow", "npy": ""}  # npy results are directories
+
+
+def collect_videos(inputs: Iterable[str]) -> List[str]:
+    """Absolute paths of the videos named by ``inputs`` (files, directories searched recursively, or glob patterns)."""
+    found = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, files in os.walk(item):
+                found.extend(os.path.join(root, name) for name in files if name.lower().endswith(VIDEO_EXTENSIONS))
+        elif os.path.isfile(item):
+            found.append(item)
+        else:
+            found.extend(path for path in glob.glob(item, recursive=True) if os.path.isfile(path))
+    return sorted({os.path.abspath(path) for path in found})
+
+
+def output_name(video: str, format: str = "jsonl") -> str:
+    """Result file name for ``video``; the path hash keeps same-named clips from different drives apart."""
+    stem = os.path.splitext(os.path.basename(video))[0]
+    return f"{stem}-{hashlib.sha1(video.encode()).hexdigest()[:8]}{SUFFIXES[format]}"
+
+
+def load_manifest(output_dir: str) -> Dict[str, Dict[str, Any]]:
+    """Latest manifest entry per video (later lines win; a torn last line from a crash is ignored)."""
+    entries: Dict[str, Dict[str, Any]] = {}
+    path = os.path.join(output_dir, MANIFEST)
+    if not os.path.exists(path):
+        return entries
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            entries[entry["video"]] = entry
+    return entries
+
+
+def result_record(result: FrameResult) -> Dict[str, Any]:
+    """JSON-ready form of a ``FrameResult`` (runtime counters in ``stats`` are left out)."""
+
+    def cls(c):
+        return None if c is None else {"label": c.label, "confidence": round(float(c.confidence), 4)}
+
+    return {
+        "frame_id": int(result.frame_id),
+        "detections": [
+            {"label": d.label, "confidence": round(float(d.confidence), 4), "bbox": [int(v) for v in d.bbox], "track_id": d.track_id}
+            for d in result.detections
+        ],
+        "classifications": [cls(c) for c in result.classifications or []],
+        "classification": cls(result.classification),
+        "llm_explanation": result.llm_explanation,
+        "safety_tier": result.safety_tier,
+        "degraded": bool(result.degraded),
+        "latency_ms": round(float(result.latency_ms), 2),
+        "stage_latency": {k: round(float(v), 2) for k, v in (result.stage_latency or {}).items()},
+    }
+
+
+class JsonlSink:
+    """Writes one ``result_record`` line per ``FrameResult``, in chunks of ``flush_every`` lines."""
+
+    def __init__(self, path: str, flush_every: int = 100) -> None:
+        self.flush_every = max(1, flush_every)
+        self.frames = 0
+        self._handle = open(path, "w", encoding="utf-8")
+        self._buffer: List[str] = []
+
+    def write(self, result: FrameResult) -> None:
+        self._buffer.append(json.dumps(result_record(result), separators=(",", ":")))
+        self.frames += 1
+        if len(self._buffer) >= self.flush_every:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._buffer:
+            self._handle.write("\n".join(self._buffer) + "\n")
+            self._buffer.clear()
+        self._handle.flush()
+
+    def close(self) -> None:
+        self.flush()
+        self._handle.close()
+
+
+def _remove(path: str) -> None:
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    elif os.path.exists(path):
+        os.remove(path)
+
+
+_worker: Dict[str, Any] = {}
+
+
+def _init_worker(cfg: AppConfig, models_factory: Callable[[AppConfig], PipelineModels], threads: int) -> None:
+    # Each process gets an equal share of the cores instead of every library spawning one thread per core.
+    cv2.setNumThreads(threads)
+    if torch is not None:
+        torch.set_num_threads(threads)
+    _worker["cfg"] = cfg
+    _worker["models"] = models_factory(cfg)
+
+
+def process_video(video: str, output_path: str) -> Dict[str, Any]:
+    """Run the pipeline over one video in a worker process; returns its manifest entry."""
+    cfg: AppConfig = _worker["cfg"]
+    cap = open_capture(video, cfg.runtime.hw_decode, cfg.runtime.decode_threads)
+    if not cap.isOpened():
+        raise RuntimeError(f"Unable to open video source: {video}")
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    stride = decode_stride(fps, cfg.batch.sample_fps) if cfg.batch.sample_fps else 1
+    start = time.perf_counter()
+    # Results go to a .part file (or directory) first; an interrupted run leaves one behind for the next run to replace.
+    part = output_path + ".part"
+    _remove(part)
+    if cfg.batch.format == "jsonl":
+        sink = JsonlSink(part, cfg.batch.flush_every)
+    else:
+        sink = ResultSink(part, cfg.batch.format, logits=cfg.batch.logits)
+    try:
+        for result in process_stream(read_frames(cap, stride=stride, resize=cfg.runtime.resize), cfg, models=_worker["models"]):
+            sink.write(result)
+    finally:
+        cap.release()
+        sink.close()
+    _remove(output_path)
+    os.replace(part, output_path)
+    seconds = time.perf_counter() - start
+    return {"video": video, "status": "done", "output": os.path.basename(output_path), "frames": sink.frames,
+            "stride": stride, "seconds": round(seconds, 2), "worker": os.getpid()}
+
+
+def run_batch(videos: List[str], cfg: AppConfig, output_dir: str, models_factory: Callable[[AppConfig], PipelineModels] = build_models,
+              progress: Optional[Callable[[str], None]] = print) -> Dict[str, Any]:
+    """
+    Process ``videos`` on ``cfg.batch.workers`` processes, skipping those already done in ``output_dir``.
+    ``models_factory`` must be picklable (a module-level function); it runs once per worker.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = load_manifest(output_dir)
+
+    def done(video):
+        entry = manifest.get(video)
+        return entry is not None and entry["status"] == "done" and os.path.exists(os.path.join(output_dir, entry["output"]))
+
+    todo = [video for video in videos if not done(video)]
+    # Longest (largest) videos first, so no worker is left with a long one at the end.
+    todo.sort(key=lambda video: os.path.getsize(video) if os.path.exists(video) else 0, reverse=True)
+    summary = {"videos": len(videos), "skipped": len(videos) - len(todo), "done": 0, "failed": 0, "frames": 0}
+    if not todo:
+        return summary
+
+    cores = os.cpu_count() or 1
+    workers = min(cfg.batch.workers or cores, len(todo))
+    threads = cfg.batch.threads_per_worker or max(1, cores // workers)
+    if progress:
+        progress(f"{len(todo)} videos to process ({summary['skipped']} already done) on {workers} workers x {threads} threads")
+    start = time.perf_counter()
+    with open(os.path.join(output_dir, MANIFEST), "a", encoding="utf-8") as log, \
+            ProcessPoolExecutor(workers, mp_context=get_context("spawn"), initializer=_init_worker,
+                                initargs=(cfg, models_factory, threads)) as pool:
+        futures = {pool.submit(process_video, video, os.path.join(output_dir, output_name(video, cfg.batch.format))): video
+                   for video in todo}
+        for finished, future in enumerate(as_completed(futures), start=1):
+            video = futures[future]
+            try:
+                entry = future.result()
+                summary["done"] += 1
+                summary["frames"] += entry["frames"]
+                line = f"{entry['frames']} frames in {entry['seconds']:.1f} s"
+            except Exception as error:
+                entry = {"video": video, "status": "failed", "error": f"{type(error).__name__}: {error}"}
+                summary["failed"] += 1
+                line = f"failed: {entry['error']}"
+            log.write(json.dumps(entry) + "\n")
+            log.flush()
+            if progress:
+                progress(f"[{finished}/{len(todo)}] {os.path.basename(video)}: {line}")
+    summary["seconds"] = round(time.perf_counter() - start, 2)
+    summary["fps"] = round(summary["frames"] / summary["seconds"], 1) if summary["seconds"] else 0.0
+    return summary
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m src.main batch", description="Reprocess recorded videos offline on all cores")
+    parser.add_argument("inputs", nargs="+", help="Video files, directories (searched recursively) or glob patterns")
+    parser.add_argument("--output", required=True, help="Directory for per-video result files and the resumable manifest")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes, each with its own models (default: one per core)")
+    parser.add_argument("--threads", type=int, default=None, help="Torch/OpenCV threads per worker (default: cores / workers)")
+    parser.add_argument("--fps", type=float, default=None, help="Decode only enough frames for this rate (default: every frame)")
+    parser.add_argument("--format", choices=("jsonl",) + FORMATS, default=None, help="Result file format (columnar ones: one row per detection)")
+    parser.add_argument("--logits", action="store_true", help="Also store classifier logits (columnar formats)")
+    parser.add_argument("--detector", default=None, help="Detector name or path to an exported .onnx model")
+    parser.add_argument("--classifier", default=None, help="Classifier name or path to an exported .onnx model")
+    parser.add_argument("--resize", nargs=2, type=int, metavar=("W", "H"), help="Optional resize")
+    parser.add_argument("--max-frames", type=int, default=None, help="Stop each video after N frames")
+    parser.add_argument("--hw-decode", action="store_true", help="Use hardware video decoding when the backend supports it")
+    return parser.parse_args(argv)
+
+
+def build_config(args: argparse.Namespace) -> AppConfig:
+    cfg = AppConfig()
+    if args.detector:
+        cfg.detector.name = args.detector
+    if args.classifier:
+        cfg.classifier.name = args.classifier
+    if args.resize:
+        cfg.runtime.resize = (args.resize[0], args.resize[1])
+    cfg.runtime.max_frames = args.max_frames
+    cfg.runtime.hw_decode = args.hw_decode
+    cfg.batch.output_dir = args.output
+    if args.workers is not None:
+        cfg.batch.workers = args.workers
+    if args.threads is not None:
+        cfg.batch.threads_per_worker = args.threads
+    cfg.batch.sample_fps = args.fps
+    if args.format:
+        cfg.batch.format = args.format
+    cfg.batch.logits = args.logits
+    return cfg
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    cfg = build_config(args)
+    videos = collect_videos(args.inputs)
+    if not videos:
+        raise SystemExit(f"No videos found in {args.inputs}")
+    summary = run_batch(videos, cfg, cfg.batch.output_dir)
+    print(json.dumps(summary))
+
+
+if __name__ == "__main__":
+    main()
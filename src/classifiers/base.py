@@ -1,9 +1,94 @@
 from abc import ABC, abstractmethod
-from typing import Optional
-from ..utils.types import ClassificationResult
+from typing import List, Optional
+
+import numpy as np
+
+from ..utils.types import ClassificationResult, Detection
 
 
 class Classifier(ABC):
     @abstractmethod
-    def classify(self, frame, detections) -> Optional[ClassificationResult]:
+    def classify_crops(self, crops: List[np.ndarray]) -> List[ClassificationResult]:
+        """Classify a list of image crops in a single batched forward pass."""
         raise NotImplementedError
+
+    def classify(self, frame, detections) -> Optional[ClassificationResult]:
+        if not detections:
+            return None
+        return self.classify_batch(frame, detections[:1])[0]
+
+    def classify_batch(self, frame: np.ndarray, detections: List[Detection]) -> List[ClassificationResult]:
+        """Classify every detection in ``frame``; results are aligned with ``detections``."""
+        if not detections:
+            return []
+        return self.classify_crops([crop_detection(frame, det) for det in detections])
+
+
+def crop_detection(frame: np.ndarray, detection: Detection) -> np.ndarray:
+    """Crop a detection from ``frame``, clipping the bbox so the crop is never empty."""
+    h, w = frame.shape[:2]
+    x1, y1, x2, y2 = (int(round(v)) for v in detection.bbox)
+    x1 = min(max(x1, 0), w - 1)
+    y1 = min(max(y1, 0), h - 1)
+    x2 = min(max(x2, x1 + 1), w)
+    y2 = min(max(y2, y1 + 1), h)
+    return frame[y1:y2, x1:x2]
+
+
+def crop_with_padding(frame: np.ndarray, bbox, padding: float) -> tuple:
+    """
+    Crop ``bbox`` grown by ``padding`` (fraction of its width/height on each side), clipped to ``frame``.
+
+    Returns:
+        ``(crop, inner)`` where ``inner`` is the original box as ``(x1, y1, x2, y2)`` inside ``crop``
+    """
+    h, w = frame.shape[:2]
+    x1, y1, x2, y2 = (int(round(v)) for v in bbox)
+    x1 = min(max(x1, 0), w - 1)
+    y1 = min(max(y1, 0), h - 1)
+    x2 = min(max(x2, x1 + 1), w)
+    y2 = min(max(y2, y1 + 1), h)
+    px, py = int(round((x2 - x1) * padding)), int(round((y2 - y1) * padding))
+    ox1, oy1 = max(x1 - px, 0), max(y1 - py, 0)
+    ox2, oy2 = min(x2 + px, w), min(y2 + py, h)
+    return frame[oy1:oy2, ox1:ox2], (x1 - ox1, y1 - oy1, x2 - ox1, y2 - oy1)
+
+
+def results_from_logits(logits: np.ndarray, class_names: List[str]) -> List[ClassificationResult]:
+    """Turn a ``(N, C)`` logits array into one ``ClassificationResult`` per row."""
+    shifted = logits - logits.max(axis=1, keepdims=True)
+    probs = np.exp(shifted)
+    probs /= probs.sum(axis=1, keepdims=True)
+    idx = probs.argmax(axis=1)
+    results = []
+    for i, k in enumerate(idx.tolist()):
+        label = class_names[k] if class_names else str(k)
+        results.append(ClassificationResult(label=label, confidence=float(probs[i, k]), logits=logits[i : i + 1]))
+    return results
+
+
+def load_weights(model, cfg, input_size):
+    """
+    Prepare a freshly built torchvision model for ``cfg``.
+
+    With ``cfg.quantized`` the float model is first converted to the INT8 graph
+    produced by ``optimization.quantization`` so the saved quantized state dict
+    fits it. ``cfg.model_path`` weights are then loaded on top; float layers are
+    resized to the saved shapes first, so channel-pruned weights load too.
+    """
+    import torch
+
+    device = cfg.device
+    if cfg.quantized:
+        from ..optimization.quantization import prepare_quantized_model
+
+        model = prepare_quantized_model(model, cfg.quant_backend, input_size)
+        device = "cpu"  # quantized kernels are CPU-only
+    if cfg.model_path:
+        state = torch.load(cfg.model_path, map_location=device)
+        if not cfg.quantized:
+            from ..optimization.pruning import conform_to_state_dict
+
+            model = conform_to_state_dict(model, state)
+        model.load_state_dict(state)
+    return model.eval().to(device)
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List
 import numpy as np
 
 try:
@@ -10,45 +10,43 @@ except ImportError:  # pragma: no cover - optional
     transforms = None
 
 from ..config import ClassifierConfig
-from ..utils.types import ClassificationResult, Detection
+from ..utils.types import ClassificationResult
+from .base import Classifier, load_weights, results_from_logits
 
 
-class EfficientNetClassifier:
+class EfficientNetClassifier(Classifier):
     def __init__(self, cfg: ClassifierConfig) -> None:
         self.cfg = cfg
-        self.device = cfg.device
+        self.device = "cpu" if cfg.quantized else cfg.device
         self.model = None
         self.preprocess = None
+        self.input_size = (380, 380)  # (H, W) fed to the network
         if torch and models:
             self.model = models.efficientnet_b4(weights=models.EfficientNet_B4_Weights.IMAGENET1K_V1)
-            if cfg.model_path:
-                state = torch.load(cfg.model_path, map_location=cfg.device)
-                self.model.load_state_dict(state)
-            self.model.eval().to(cfg.device)
+            self.model = load_weights(self.model, cfg, self.input_size)
             self.preprocess = transforms.Compose([
                 transforms.ToPILImage(),
-                transforms.Resize((380, 380)),
+                transforms.Resize(self.input_size),
                 transforms.ToTensor(),
                 transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225]),
             ])
         else:
             print("Torch/torchvision missing; EfficientNet classifier will emit stubs.")
 
-    def classify(self, frame: np.ndarray, detections: list[Detection]) -> Optional[ClassificationResult]:
-        if not detections:
-            return None
-        x1, y1, x2, y2 = detections[0].bbox
-        crop = frame[y1:y2, x1:x2]
+    def prepare(self, crop: np.ndarray):
+        """Turn one BGR crop into the normalised CHW tensor the network expects."""
+        return self.preprocess(crop)
+
+    def classify_crops(self, crops: List[np.ndarray]) -> List[ClassificationResult]:
+        if not crops:
+            return []
         if self.model is None or self.preprocess is None or torch is None:
-            return ClassificationResult(label="unclassified", confidence=0.1, logits=None)
+            return [ClassificationResult(label="unclassified", confidence=0.1, logits=None) for _ in crops]
 
         with torch.no_grad():
-            tensor = self.preprocess(crop).unsqueeze(0).to(self.device)
-            if self.cfg.half_precision:
+            tensor = torch.stack([self.prepare(crop) for crop in crops]).to(self.device)
+            if self.cfg.half_precision and not self.cfg.quantized:
                 tensor = tensor.half()
                 self.model.half()
             logits = self.model(tensor)
-            probs = torch.softmax(logits, dim=1)
-            conf, idx = torch.max(probs, dim=1)
-            label = self.cfg.class_names[idx.item()] if self.cfg.class_names else str(idx.item())
-            return ClassificationResult(label=label, confidence=float(conf.item()), logits=logits.cpu().numpy())
+            return results_from_logits(logits.float().cpu().numpy(), self.cfg.class_names)
@@ -0,0 +1,49 @@
+import json
+from typing import List
+
+import cv2
+import numpy as np
+
+from ..config import ClassifierConfig
+from ..utils.onnx_session import create_session, session_metadata
+from ..utils.types import ClassificationResult
+from .base import Classifier, results_from_logits
+
+_MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+_STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+
+
+class OnnxClassifier(Classifier):
+    """Classifier exported from the torchvision zoo to ONNX and run on onnxruntime."""
+
+    def __init__(self, cfg: ClassifierConfig) -> None:
+        self.cfg = cfg
+        self.session = None
+        self.class_names = list(cfg.class_names)
+        path = cfg.model_path or (cfg.name if cfg.name.lower().endswith(".onnx") else None)
+        if path:
+            self.session = create_session(path, cfg.device, cfg.onnx_intra_threads, cfg.onnx_inter_threads)
+        if self.session is None:
+            print("onnxruntime or ONNX classifier weights missing; classifier will emit stubs.")
+            return
+        inp = self.session.get_inputs()[0]
+        self.input_name = inp.name
+        self.input_size = (int(inp.shape[2]), int(inp.shape[3]))
+        names = session_metadata(self.session).get("class_names")
+        if names and not self.class_names:
+            self.class_names = json.loads(names)
+
+    def _prepare(self, crop: np.ndarray) -> np.ndarray:
+        # Mirrors the torchvision pipeline: resize, scale to [0, 1], ImageNet normalisation
+        h, w = self.input_size
+        resized = cv2.resize(crop, (w, h), interpolation=cv2.INTER_LINEAR).astype(np.float32) / 255.0
+        return ((resized - _MEAN) / _STD).transpose(2, 0, 1)
+
+    def classify_crops(self, crops: List[np.ndarray]) -> List[ClassificationResult]:
+        if not crops:
+            return []
+        if self.session is None:
+            return [ClassificationResult(label="unclassified", confidence=0.1, logits=None) for _ in crops]
+        batch = np.ascontiguousarray(np.stack([self._prepare(crop) for crop in crops]), dtype=np.float32)
+        logits = self.session.run(None, {self.input_name: batch})[0]
+        return results_from_logits(logits.astype(np.float32), self.class_names)
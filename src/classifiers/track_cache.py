@@ -0,0 +1,79 @@
+"""Per-track classification reuse for stable tracks."""
+
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+from ..utils.types import ClassificationResult, Detection
+
+
+@dataclass
+class _Entry:
+    result: ClassificationResult
+    frame_id: int
+    det_confidence: float
+    area: float
+
+
+def _area(bbox) -> float:
+    x1, y1, x2, y2 = bbox
+    return max(float(x2 - x1), 1.0) * max(float(y2 - y1), 1.0)
+
+
+class TrackClassificationCache:
+    """
+    Remember the last classification of each track and reuse it while the track is stable.
+
+    A stable track is re-classified only when its cached result is older than
+    ``interval`` frames, when the cached or detector confidence drops, or when
+    its box changes scale a lot (the sign got much closer, so a sharper crop is
+    available). Everything else reuses the cached ``ClassificationResult``.
+    """
+
+    def __init__(self, interval: int = 15, min_confidence: float = 0.6, confidence_drop: float = 0.15,
+                 scale_change: float = 0.3) -> None:
+        """
+        Args:
+            interval: Frames after which a stable track is re-classified anyway
+            min_confidence: Cached results below this confidence are not reused
+            confidence_drop: Re-classify when detector confidence falls this far below its value at classification
+            scale_change: Re-classify when the box side length changes by more than this fraction
+        """
+        self.interval = interval
+        self.min_confidence = min_confidence
+        self.confidence_drop = confidence_drop
+        self.scale_change = scale_change
+        self._entries: Dict[int, _Entry] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, detection: Detection, frame_id: int, stable: bool) -> Optional[ClassificationResult]:
+        """Return the cached result for ``detection``'s track if it may be reused, else None."""
+        entry = self._entries.get(detection.track_id) if detection.track_id is not None else None
+        if entry is None or not stable or not self._reusable(entry, detection, frame_id):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry.result
+
+    def store(self, detection: Detection, result: Optional[ClassificationResult], frame_id: int) -> None:
+        if detection.track_id is None or result is None:
+            return
+        self._entries[detection.track_id] = _Entry(result, frame_id, detection.confidence, _area(detection.bbox))
+
+    def prune(self, is_live: Callable[[int], bool]) -> None:
+        """Forget tracks for which ``is_live(track_id)`` is False."""
+        for track_id in [tid for tid in self._entries if not is_live(tid)]:
+            del self._entries[track_id]
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+    def _reusable(self, entry: _Entry, detection: Detection, frame_id: int) -> bool:
+        if frame_id - entry.frame_id >= self.interval:
+            return False
+        if entry.result.confidence < self.min_confidence:
+            return False
+        if detection.confidence < entry.det_confidence - self.confidence_drop:
+            return False
+        scale = (_area(detection.bbox) / entry.area) ** 0.5
+        return abs(scale - 1.0) <= self.scale_change
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List
 import numpy as np
 
 try:
@@ -10,38 +10,37 @@ except ImportError:  # pragma: no cover - optional
     transforms = None
 
 from ..config import ClassifierConfig
-from ..utils.types import ClassificationResult, Detection
+from ..utils.types import ClassificationResult
+from .base import Classifier, load_weights, results_from_logits
 
 
-class ViTClassifier:
+class ViTClassifier(Classifier):
     def __init__(self, cfg: ClassifierConfig) -> None:
         self.cfg = cfg
-        self.device = cfg.device
+        self.device = "cpu" if cfg.quantized else cfg.device
         self.model = None
         self.preprocess = None
+        self.input_size = (384, 384)  # (H, W) fed to the network
         if torch and models:
             self.model = models.vit_b_16(weights=models.ViT_B_16_Weights.IMAGENET1K_SWAG_E2E_V1)
-            if cfg.model_path:
-                state = torch.load(cfg.model_path, map_location=cfg.device)
-                self.model.load_state_dict(state)
-            self.model.eval().to(cfg.device)
+            self.model = load_weights(self.model, cfg, self.input_size)
             weights = models.ViT_B_16_Weights.IMAGENET1K_SWAG_E2E_V1
             self.preprocess = weights.transforms()
         else:
             print("Torch/torchvision missing; ViT classifier will emit stubs.")
 
-    def classify(self, frame: np.ndarray, detections: list[Detection]) -> Optional[ClassificationResult]:
-        if not detections:
-            return None
-        x1, y1, x2, y2 = detections[0].bbox
-        crop = frame[y1:y2, x1:x2]
+    def prepare(self, crop: np.ndarray):
+        """Turn one BGR crop into the normalised CHW tensor the network expects."""
+        # weights.transforms() expects CHW tensors rather than HWC numpy crops
+        return self.preprocess(torch.from_numpy(np.ascontiguousarray(crop)).permute(2, 0, 1))
+
+    def classify_crops(self, crops: List[np.ndarray]) -> List[ClassificationResult]:
+        if not crops:
+            return []
         if self.model is None or self.preprocess is None or torch is None:
-            return ClassificationResult(label="unclassified", confidence=0.1, logits=None)
+            return [ClassificationResult(label="unclassified", confidence=0.1, logits=None) for _ in crops]
 
         with torch.no_grad():
-            tensor = self.preprocess(crop).unsqueeze(0).to(self.device)
+            tensor = torch.stack([self.prepare(crop) for crop in crops]).to(self.device)
             logits = self.model(tensor)
-            probs = torch.softmax(logits, dim=1)
-            conf, idx = torch.max(probs, dim=1)
-            label = self.cfg.class_names[idx.item()] if self.cfg.class_names else str(idx.item())
-            return ClassificationResult(label=label, confidence=float(conf.item()), logits=logits.cpu().numpy())
+            return results_from_logits(logits.float().cpu().numpy(), self.cfg.class_names)
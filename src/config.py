@@ -12,23 +12,42 @@ def _get_device() -> str:
 
 @dataclass
 class DetectorConfig:
-    name: str = "yolov8n"  # options: yolov8n, yolov9c, efficientdet_d0, ssd_mobilenet_v3
+    name: str = "yolov8n"  # options: yolov8n, yolov9c, efficientdet_d0, ssd_mobilenet_v3, onnx (or a *.onnx path)
     conf_threshold: float = 0.35
     iou_threshold: float = 0.45
     device: str = field(default_factory=_get_device)  # auto-detect CUDA
     max_det: int = 10
     half_precision: bool = True
     model_path: Optional[str] = None  # custom weights for Indian datasets
+    input_size: int = 640  # network input resolution
+    onnx_intra_threads: int = 0  # onnxruntime threads per operator (0 = runtime default)
+    onnx_inter_threads: int = 0  # onnxruntime threads across operators (0 = runtime default)
+    # Sliced inference on the full-resolution frame for small, distant signs
+    tiled: bool = False
+    tile_cols: int = 2
+    tile_rows: int = 2
+    tile_overlap: float = 0.2  # fraction of a tile shared with its neighbour
+    tile_full_frame: bool = True  # also detect on the whole frame (large, close signs)
+    tile_merge_threshold: float = 0.6  # intersection-over-smaller above which cross-tile boxes are merged
 
 
 @dataclass
 class ClassifierConfig:
-    name: str = "efficientnet_b4"  # options: resnet50, efficientnet_b4, mobilenet_v3_large, vit_b_16
+    name: str = "efficientnet_b4"  # options: resnet50, efficientnet_b4, mobilenet_v3_large, vit_b_16, onnx (or a *.onnx path)
     num_classes: int = 120
     device: str = field(default_factory=_get_device)  # auto-detect CUDA
     half_precision: bool = False
     model_path: Optional[str] = None
     class_names: List[str] = field(default_factory=list)
+    onnx_intra_threads: int = 0  # onnxruntime threads per operator (0 = runtime default)
+    onnx_inter_threads: int = 0  # onnxruntime threads across operators (0 = runtime default)
+    quantized: bool = False  # model_path holds an INT8 state dict from optimization.quantization
+    quant_backend: str = "x86"  # x86/fbgemm for servers, qnnpack for ARM edge boxes
+    reuse_stable_tracks: bool = True  # reuse a stable track's last result instead of re-classifying
+    reclassify_interval: int = 15  # frames before a stable track is re-classified anyway
+    reclassify_min_conf: float = 0.6  # cached results below this confidence are not reused
+    reclassify_conf_drop: float = 0.15  # detector confidence drop that forces re-classification
+    reclassify_scale_change: float = 0.3  # relative bbox size change that forces re-classification
 
 
 @dataclass
@@ -39,6 +58,12 @@ class LLMConfig:
     max_tokens: int = 160
     temperature: float = 0.2
     safety_bias: float = 0.25  # increase safety tone
+    async_explain: bool = True  # generate explanations on a background worker
+    request_queue: int = 8  # max tracks waiting for an explanation
+    cache_size: int = 256  # explanations kept in the label-keyed cache
+    cache_ttl_s: Optional[float] = 6 * 3600.0  # None keeps entries until evicted
+    confidence_bucket: float = 0.1  # confidences in the same bucket share an explanation
+    cache_path: Optional[str] = None  # SQLite file to keep the cache across restarts
 
 
 @dataclass
@@ -60,11 +85,23 @@ class PreprocessConfig:
     blur_kernel: int = 3
     enable_bilateral: bool = False
     enable_sharpen: bool = True
-    enable_hsv_mask: bool = True
+    enable_hsv_mask: bool = True  # only runs when skip_empty_frames (or a caller) needs the sign-colored regions
     enable_adaptive_thresh: bool = False
     enable_gamma: bool = False
     gamma: float = 1.2
     enable_dehaze: bool = False
+    dehaze_strength: float = 0.9  # fraction of the estimated haze removed
+    # Explicit op order, e.g. ["hsv_mask", "dehaze", "clahe", "sharpen"]; None derives it from the enable_* flags
+    ops: Optional[List[str]] = None
+    hsv_min_saturation: int = 80
+    hsv_min_value: int = 60
+    min_region_area: int = 64  # px at detector resolution; smaller sign-colored blobs are ignored
+    skip_empty_frames: bool = False  # skip detection when the HSV mask finds no sign-colored regions
+    letterbox: bool = True  # keep the aspect ratio when resizing for the detector (pad instead of stretch)
+    native_crops: bool = True  # classify crops cut from the full-resolution source frame
+    # Detector sees the plain resized frame; image ops run only on padded detection crops before classification
+    roi_only: bool = False
+    roi_padding: float = 0.15  # context added around each box, as a fraction of its size, for the crop filters
 
 
 @dataclass
@@ -74,6 +111,41 @@ class TrackingConfig:
     min_stable: int = 3
 
 
+@dataclass
+class SchedulingConfig:
+    # Full-frame detection on keyframes only; in between, detect on regions around predicted track boxes
+    enabled: bool = False
+    keyframe_interval: int = 5  # N when no budget is set
+    detect_budget_ms: Optional[float] = None  # average detection time per frame; picks N adaptively
+    min_interval: int = 1
+    max_interval: int = 10  # bounds how long a newly appearing sign can go unseen
+    scene_change_threshold: float = 0.15  # mean abs. difference (0-1) to the last keyframe that forces a keyframe
+    roi_expand: float = 0.5  # margin added around each predicted track box, as a fraction of its size
+    roi_min_size: int = 96  # px in the source frame; small far-away boxes get at least this much context
+
+
+@dataclass
+class BatchingConfig:
+    # Micro-batch detector/classifier calls from concurrent streams (threads sharing one PipelineModels)
+    enabled: bool = False
+    max_batch_frames: int = 8
+    max_batch_crops: int = 32
+    max_wait_ms: float = 5.0  # how long the first request of a batch waits for others
+    slo_ms: Optional[float] = None  # per-request latency target (queueing + compute); adapts the batch size
+
+
+@dataclass
+class BatchConfig:
+    # Offline reprocessing of recorded videos (python -m src.main batch)
+    output_dir: str = "batch_results"
+    workers: int = 0  # worker processes, each with its own models (0: one per CPU core)
+    threads_per_worker: int = 0  # torch/OpenCV threads per worker (0: cores / workers)
+    sample_fps: Optional[float] = None  # decode only enough frames for this rate (None: every frame)
+    flush_every: int = 100  # results buffered before they are written to the video's result file
+    format: str = "jsonl"  # or columnar "parquet" / "arrow" (need pyarrow) / "npy" (see utils/result_sink.py)
+    logits: bool = False  # columnar formats: also store the classifier logits of every detection
+
+
 @dataclass
 class RuntimeConfig:
     source: str = "0"  # webcam id or video path
@@ -82,6 +154,18 @@ class RuntimeConfig:
     max_frames: Optional[int] = None
     target_fps: float = 20.0
     frame_queue: int = 5
+    frame_ring_slots: int = 0  # >0 decodes into a shared-memory ring of at least this many slots (grown to cover queued and in-flight frames)
+    latest_frame: bool = False  # hand the pipeline only the newest frame; frames it is too slow for are dropped
+    sample_files: bool = False  # file sources keep every Nth frame to play at target_fps; the rest are grabbed, not retrieved
+    hw_decode: bool = False  # ask the capture backend for hardware video decoding
+    decode_threads: int = 0  # decoder threads per capture (0: backend default)
+    decode_workers: int = 0  # >1 decodes a video file in that many parallel segments, as fast as possible (offline runs)
+    record_path: Optional[str] = None  # also write every FrameResult to a columnar file (.parquet, .arrow or an npy directory)
+    pipelined: bool = False  # run pipeline stages on separate threads
+    stage_queue: int = 2  # bounded queue size between pipelined stages
+    # Several cameras ("name=source" or plain sources) sharing one detector/classifier
+    sources: List[str] = field(default_factory=list)
+    batch_max_wait_ms: float = 15.0  # how long a multi-camera batch waits for the other cameras' frames
 
 
 @dataclass
@@ -93,3 +177,6 @@ class AppConfig:
     runtime: RuntimeConfig = field(default_factory=RuntimeConfig)
     preprocess: PreprocessConfig = field(default_factory=PreprocessConfig)
     tracking: TrackingConfig = field(default_factory=TrackingConfig)
+    scheduling: SchedulingConfig = field(default_factory=SchedulingConfig)
+    batching: BatchingConfig = field(default_factory=BatchingConfig)
+    batch: BatchConfig = field(default_factory=BatchConfig)
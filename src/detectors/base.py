@@ -7,3 +7,7 @@ class Detector(ABC):
     @abstractmethod
     def detect(self, frame) -> List[Detection]:
         raise NotImplementedError
+
+    def detect_batch(self, frames) -> List[List[Detection]]:
+        """Detect on several images; backends that can batch override this with one forward pass."""
+        return [self.detect(frame) for frame in frames]
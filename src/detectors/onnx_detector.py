@@ -0,0 +1,78 @@
+import ast
+from typing import List
+
+import cv2
+import numpy as np
+
+from ..config import DetectorConfig
+from ..utils.onnx_session import create_session, session_metadata
+from ..utils.preprocess import FrameTransform, letterbox
+from ..utils.types import Detection
+from .base import Detector
+from .postprocess import non_max_suppression
+
+
+class OnnxDetector(Detector):
+    """YOLOv8-style detector exported to ONNX and run on onnxruntime."""
+
+    def __init__(self, cfg: DetectorConfig) -> None:
+        self.cfg = cfg
+        self.session = None
+        self.names = {}
+        path = cfg.model_path or (cfg.name if cfg.name.lower().endswith(".onnx") else None)
+        if path:
+            self.session = create_session(path, cfg.device, cfg.onnx_intra_threads, cfg.onnx_inter_threads)
+        if self.session is None:
+            print("onnxruntime or ONNX detector weights missing; detector will emit stubs.")
+            return
+        inp = self.session.get_inputs()[0]
+        self.input_name = inp.name
+        self.dynamic_batch = not isinstance(inp.shape[0], int)
+        h, w = inp.shape[2], inp.shape[3]
+        # Dynamic spatial axes fall back to the configured size
+        self.input_size = (h if isinstance(h, int) else cfg.input_size, w if isinstance(w, int) else cfg.input_size)
+        names = session_metadata(self.session).get("names")
+        if names:
+            self.names = ast.literal_eval(names)
+
+    def detect(self, frame) -> List[Detection]:
+        if self.session is None:
+            h, w, _ = frame.shape
+            return [Detection(label="onnx_stub", confidence=0.2, bbox=(w // 4, h // 4, w // 2, h // 2))]
+
+        return self.detect_batch([frame])[0]
+
+    def detect_batch(self, frames) -> List[List[Detection]]:
+        if self.session is None or not frames:
+            return [self.detect(frame) for frame in frames]
+        if not self.dynamic_batch and len(frames) > 1:
+            return [self.detect_batch([frame])[0] for frame in frames]
+        in_h, in_w = self.input_size
+        blobs, transforms = [], []
+        for frame in frames:
+            # Same letterbox as YOLO training; a no-op copy when the frame already has the input size.
+            img, transform = letterbox(frame, (in_w, in_h))
+            blobs.append(cv2.cvtColor(img, cv2.COLOR_BGR2RGB).transpose(2, 0, 1))
+            transforms.append(transform)
+        blob = np.ascontiguousarray(np.stack(blobs), dtype=np.float32) / 255.0
+        outputs = self.session.run(None, {self.input_name: blob})[0]  # (N, 4 + num_classes, num_anchors)
+        return [self._decode(output, transform) for output, transform in zip(outputs, transforms)]
+
+    def _decode(self, output: np.ndarray, transform: FrameTransform) -> List[Detection]:
+        preds = output.T
+        class_scores = preds[:, 4:]
+        classes = class_scores.argmax(axis=1)
+        scores = class_scores[np.arange(len(preds)), classes]
+        keep = scores >= self.cfg.conf_threshold
+        preds, classes, scores = preds[keep], classes[keep], scores[keep]
+        if len(preds) == 0:
+            return []
+        cx, cy, bw, bh = preds[:, 0], preds[:, 1], preds[:, 2], preds[:, 3]
+        boxes = np.stack([cx - bw / 2, cy - bh / 2, cx + bw / 2, cy + bh / 2], axis=1)
+        kept = non_max_suppression(boxes, scores, classes, self.cfg.iou_threshold, self.cfg.max_det)
+        detections: List[Detection] = []
+        for i in kept:
+            x1, y1, x2, y2 = transform.to_source(boxes[i].tolist())
+            cls_id = int(classes[i])
+            detections.append(Detection(label=self.names.get(cls_id, str(cls_id)), confidence=float(scores[i]), bbox=(x1, y1, x2, y2)))
+        return detections
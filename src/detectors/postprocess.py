@@ -0,0 +1,50 @@
+"""Box post-processing shared by detector backends."""
+
+import numpy as np
+
+from ..utils.tracker import iou_matrix
+
+
+def ios_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Pairwise intersection over the smaller box's area, shape (len(a), len(b))."""
+    a = np.asarray(a, dtype=np.float64).reshape(-1, 4)
+    b = np.asarray(b, dtype=np.float64).reshape(-1, 4)
+    iw = np.clip(np.minimum(a[:, None, 2], b[None, :, 2]) - np.maximum(a[:, None, 0], b[None, :, 0]), 0, None)
+    ih = np.clip(np.minimum(a[:, None, 3], b[None, :, 3]) - np.maximum(a[:, None, 1], b[None, :, 1]), 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    smaller = np.minimum(area_a[:, None], area_b[None, :])
+    return np.where(smaller > 0, iw * ih / np.maximum(smaller, 1e-9), 0.0)
+
+
+def non_max_suppression(boxes: np.ndarray, scores: np.ndarray, classes: np.ndarray, iou_threshold: float, max_det: int = 300) -> np.ndarray:
+    """
+    Class-aware greedy NMS.
+
+    Args:
+        boxes: (N, 4) boxes as x1, y1, x2, y2
+        scores: (N,) confidences
+        classes: (N,) integer class ids; boxes of different classes never suppress each other
+        iou_threshold: Overlap above which the lower-scoring box is dropped
+        max_det: Maximum number of boxes to keep
+
+    Returns:
+        Indices of kept boxes, highest score first
+    """
+    if len(boxes) == 0:
+        return np.zeros((0,), dtype=np.int64)
+    order = np.argsort(-scores, kind="stable")
+    boxes = np.asarray(boxes, dtype=np.float64)[order]
+    classes = np.asarray(classes)[order]
+    overlap = iou_matrix(boxes, boxes)
+    overlap[classes[:, None] != classes[None, :]] = 0.0
+    suppressed = np.zeros(len(order), dtype=bool)
+    keep = []
+    for i in range(len(order)):
+        if suppressed[i]:
+            continue
+        keep.append(i)
+        if len(keep) >= max_det:
+            break
+        suppressed |= overlap[i] > iou_threshold
+    return order[np.array(keep, dtype=np.int64)]
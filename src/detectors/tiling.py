@@ -0,0 +1,85 @@
+"""Sliced (tiled) inference for small signs in high-resolution frames."""
+
+from typing import List, Tuple
+
+import numpy as np
+
+from ..config import DetectorConfig
+from ..utils.types import Detection
+from .base import Detector
+from .postprocess import ios_matrix
+
+Tile = Tuple[int, int, int, int]  # x1, y1, x2, y2 in frame pixels
+
+
+def tile_grid(width: int, height: int, cols: int, rows: int, overlap: float) -> List[Tile]:
+    """
+    Cover a ``width`` x ``height`` frame with ``cols`` x ``rows`` equally sized, overlapping tiles.
+
+    Neighbouring tiles share ``overlap`` of a tile's width/height, so a sign
+    up to that size is fully inside at least one tile.
+    """
+    cols, rows = max(1, cols), max(1, rows)
+    overlap = min(max(overlap, 0.0), 0.9)
+    tw = int(np.ceil(width / (cols - (cols - 1) * overlap)))
+    th = int(np.ceil(height / (rows - (rows - 1) * overlap)))
+    xs = np.linspace(0, width - tw, cols).round().astype(int) if cols > 1 else [0]
+    ys = np.linspace(0, height - th, rows).round().astype(int) if rows > 1 else [0]
+    return [(int(x), int(y), min(int(x) + tw, width), min(int(y) + th, height)) for y in ys for x in xs]
+
+
+def merge_detections(per_image: List[List[Detection]], offsets: List[Tuple[int, int]], threshold: float, max_det: int) -> List[Detection]:
+    """
+    Shift each image's detections by its offset and merge duplicates across images.
+
+    Same-label boxes whose intersection over the smaller box exceeds
+    ``threshold`` form one group. Each group becomes the union of its boxes and
+    keeps the best confidence. Plain NMS would instead keep whichever box scored
+    highest, which may be a sign cut in half by a tile edge.
+    """
+    shifted = [
+        Detection(d.label, d.confidence, (d.bbox[0] + ox, d.bbox[1] + oy, d.bbox[2] + ox, d.bbox[3] + oy))
+        for dets, (ox, oy) in zip(per_image, offsets) for d in dets
+    ]
+    if not shifted:
+        return []
+    boxes = np.array([d.bbox for d in shifted], dtype=np.float64)
+    scores = np.array([d.confidence for d in shifted])
+    labels = np.array([d.label for d in shifted])
+    overlap = ios_matrix(boxes, boxes) > threshold
+    overlap &= labels[:, None] == labels[None, :]
+
+    merged: List[Detection] = []
+    used = np.zeros(len(shifted), dtype=bool)
+    for i in np.argsort(-scores, kind="stable").tolist():
+        if used[i]:
+            continue
+        group = overlap[i] & ~used
+        group[i] = True
+        used |= group
+        members = boxes[group]
+        union = (members[:, 0].min(), members[:, 1].min(), members[:, 2].max(), members[:, 3].max())
+        merged.append(Detection(shifted[i].label, float(scores[i]), tuple(int(v) for v in union)))
+        if len(merged) >= max_det:
+            break
+    return merged
+
+
+def detect_tiled(detector: Detector, frame: np.ndarray, cfg: DetectorConfig) -> List[Detection]:
+    """
+    Detect on overlapping full-resolution tiles of ``frame`` in one batched call.
+
+    With ``cfg.tile_full_frame`` the whole frame is added to the same batch so
+    large signs spanning several tiles are still found. Boxes are returned in
+    ``frame`` coordinates.
+    """
+    h, w = frame.shape[:2]
+    tiles = tile_grid(w, h, cfg.tile_cols, cfg.tile_rows, cfg.tile_overlap)
+    images = [frame[y1:y2, x1:x2] for x1, y1, x2, y2 in tiles]
+    offsets = [(x1, y1) for x1, y1, _, _ in tiles]
+    if cfg.tile_full_frame:
+        images.append(frame)
+        offsets.append((0, 0))
+    per_image = detector.detect_batch(images)
+    per_image = [[d for d in dets if d.confidence >= cfg.conf_threshold] for dets in per_image]
+    return merge_detections(per_image, offsets, cfg.tile_merge_threshold, cfg.max_det)
@@ -24,13 +24,27 @@ class YoloDetector(Detector):
             h, w, _ = frame.shape
             return [Detection(label="unknown", confidence=0.2, bbox=(w // 4, h // 4, w // 2, h // 2))]
 
-        results = self.model.predict(frame, imgsz=640, conf=self.cfg.conf_threshold, iou=self.cfg.iou_threshold, device=self.cfg.device, half=self.cfg.half_precision, max_det=self.cfg.max_det, verbose=False)
+        results = self._predict(frame)
         detections: List[Detection] = []
         for r in results:
-            for box in r.boxes:
-                x1, y1, x2, y2 = box.xyxy[0].cpu().numpy().astype(int).tolist()
-                conf = float(box.conf[0].cpu().item())
-                cls_id = int(box.cls[0].item())
-                label = self.model.model.names.get(cls_id, str(cls_id)) if hasattr(self.model, "model") else str(cls_id)
-                detections.append(Detection(label=label, confidence=conf, bbox=(x1, y1, x2, y2)))
+            detections.extend(self._to_detections(r))
+        return detections
+
+    def detect_batch(self, frames) -> List[List[Detection]]:
+        if not self.model:
+            return [self.detect(frame) for frame in frames]
+        # A list source is predicted as one batch; results come back in input order.
+        return [self._to_detections(r) for r in self._predict(list(frames))]
+
+    def _predict(self, source):
+        return self.model.predict(source, imgsz=self.cfg.input_size, conf=self.cfg.conf_threshold, iou=self.cfg.iou_threshold, device=self.cfg.device, half=self.cfg.half_precision, max_det=self.cfg.max_det, verbose=False)
+
+    def _to_detections(self, result) -> List[Detection]:
+        detections: List[Detection] = []
+        for box in result.boxes:
+            x1, y1, x2, y2 = box.xyxy[0].cpu().numpy().astype(int).tolist()
+            conf = float(box.conf[0].cpu().item())
+            cls_id = int(box.cls[0].item())
+            label = self.model.model.names.get(cls_id, str(cls_id)) if hasattr(self.model, "model") else str(cls_id)
+            detections.append(Detection(label=label, confidence=conf, bbox=(x1, y1, x2, y2)))
         return detections
@@ -0,0 +1,132 @@
+"""Background worker that keeps slow LLM calls off the frame loop."""
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+
+class AsyncExplainer:
+    """
+    Run ``explainer.explain`` on a background thread.
+
+    Requests are coalesced per track: submitting again for a track that is still
+    waiting replaces its pending request instead of queueing a second one. The
+    pending set is bounded; when it is full new tracks are rejected rather than
+    blocking the caller. Finished explanations are kept per track and read with
+    ``latest``, which never waits.
+    """
+
+    def __init__(self, explainer, max_pending: int = 8, max_results: int = 256,
+                 on_result: Optional[Callable[[str, float, str], None]] = None) -> None:
+        """
+        Args:
+            explainer: Object with an ``explain(label, confidence) -> str`` method
+            max_pending: Maximum number of tracks waiting for an explanation
+            max_results: Maximum number of finished explanations to remember
+            on_result: Optional ``(label, confidence, text)`` callback run on the worker thread
+        """
+        self.explainer = explainer
+        self.on_result = on_result
+        self.max_pending = max(1, max_pending)
+        self.max_results = max(1, max_results)
+        self._pending: "OrderedDict[int, Tuple[str, float]]" = OrderedDict()
+        self._results: "OrderedDict[int, Tuple[str, str]]" = OrderedDict()
+        self._inflight: Optional[Tuple[int, str]] = None
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self.submitted = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self.completed = 0
+
+    def start(self) -> "AsyncExplainer":
+        with self._cond:
+            if self._running:
+                return self
+            self._running = True
+        self._thread = threading.Thread(target=self._loop, daemon=True, name="llm-explainer")
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 1.0) -> None:
+        with self._cond:
+            self._running = False
+            self._pending.clear()
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def submit(self, track_id: int, label: str, confidence: float) -> bool:
+        """
+        Queue an explanation request without blocking.
+
+        Returns:
+            True if the request is pending or already running, False if it was rejected
+        """
+        with self._cond:
+            if not self._running:
+                return False
+            if self._inflight == (track_id, label):
+                self.coalesced += 1
+                return True
+            if track_id in self._pending:
+                self._pending[track_id] = (label, confidence)
+                self.coalesced += 1
+                return True
+            if len(self._pending) >= self.max_pending:
+                self.rejected += 1
+                return False
+            self._pending[track_id] = (label, confidence)
+            self.submitted += 1
+            self._cond.notify()
+            return True
+
+    def latest(self, track_id: int, label: Optional[str] = None) -> Optional[str]:
+        """Return the newest finished explanation for ``track_id`` (matching ``label`` if given)."""
+        with self._cond:
+            entry = self._results.get(track_id)
+        if entry is None or (label is not None and entry[0] != label):
+            return None
+        return entry[1]
+
+    def forget(self, track_id: int) -> None:
+        """Drop pending and finished state for a track that is gone."""
+        with self._cond:
+            self._pending.pop(track_id, None)
+            self._results.pop(track_id, None)
+            if self._inflight is not None and self._inflight[0] == track_id:
+                self._inflight = None  # the running request's text is not kept for the track
+
+    def pending_count(self) -> int:
+        with self._cond:
+            return len(self._pending) + (1 if self._inflight else 0)
+
+    def _loop(self) -> None:
+        while True:
+            with self._cond:
+                while self._running and not self._pending:
+                    self._cond.wait(timeout=0.1)
+                if not self._running:
+                    return
+                track_id, (label, confidence) = self._pending.popitem(last=False)
+                self._inflight = (track_id, label)
+            try:
+                text = self.explainer.explain(label, confidence)
+            except Exception:
+                text = None
+            if text is not None and self.on_result is not None:
+                try:
+                    self.on_result(label, confidence, text)
+                except Exception:
+                    pass  # a failing sink must not stop the worker
+            with self._cond:
+                current = self._inflight == (track_id, label)
+                self._inflight = None
+                if text is not None and current:
+                    self._results[track_id] = (label, text)
+                    self._results.move_to_end(track_id)
+                    while len(self._results) > self.max_results:
+                        self._results.popitem(last=False)
+                    self.completed += 1
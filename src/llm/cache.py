@@ -0,0 +1,131 @@
+"""Bounded explanation cache keyed by sign label, confidence bucket and prompt template."""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from .explainer import PROMPT_TEMPLATE
+
+CacheKey = Tuple[str, int, str]
+
+
+class ExplanationCache:
+    """
+    LRU + TTL cache for LLM explanations.
+
+    Explanations depend on the sign, not on the track that saw it, so entries are
+    keyed by ``(label, confidence bucket, prompt template id)`` and reused across
+    tracks. When ``path`` is given, entries are written through to a SQLite file
+    and reloaded on start-up so a restarted unit begins warm.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_s: Optional[float] = 6 * 3600.0, confidence_bucket: float = 0.1,
+                 path: Optional[str] = None, template: str = PROMPT_TEMPLATE) -> None:
+        """
+        Args:
+            max_entries: Maximum number of cached explanations (least recently used evicted first)
+            ttl_s: Seconds an entry stays valid; None disables expiry
+            confidence_bucket: Width of the confidence buckets that share an explanation
+            path: Optional SQLite file for persistence across restarts
+            template: Prompt template; changing it invalidates previously cached text
+        """
+        self.max_entries = max(1, max_entries)
+        self.ttl_s = ttl_s
+        self.confidence_bucket = confidence_bucket
+        self.template_id = hashlib.sha1(template.encode("utf-8")).hexdigest()[:12]
+        self._entries: "OrderedDict[CacheKey, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        if path:
+            self._open(path)
+
+    def key(self, label: str, confidence: float) -> CacheKey:
+        # small epsilon so e.g. 0.3 / 0.1 lands in bucket 3 rather than 2
+        bucket = int(confidence / self.confidence_bucket + 1e-9) if self.confidence_bucket > 0 else 0
+        return (label, bucket, self.template_id)
+
+    def get(self, label: str, confidence: float) -> Optional[str]:
+        key = self.key(label, confidence)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry[1]):
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, label: str, confidence: float, text: str) -> None:
+        key = self.key(label, confidence)
+        created = time.time()
+        with self._lock:
+            self._entries[key] = (text, created)
+            self._entries.move_to_end(key)
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO explanations VALUES (?, ?, ?, ?, ?)", (*key, text, created))
+                self._db.commit()
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "size": len(self._entries),
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _expired(self, created: float) -> bool:
+        return self.ttl_s is not None and (time.time() - created) > self.ttl_s
+
+    def _remove(self, key: CacheKey) -> None:
+        self._entries.pop(key, None)
+        if self._db is not None:
+            self._db.execute("DELETE FROM explanations WHERE label = ? AND bucket = ? AND template = ?", key)
+            self._db.commit()
+
+    def _open(self, path: str) -> None:
+        # The background LLM worker writes from its own thread; access is serialised by _lock.
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS explanations ("
+            "label TEXT, bucket INTEGER, template TEXT, text TEXT, created REAL, "
+            "PRIMARY KEY (label, bucket, template))"
+        )
+        if self.ttl_s is not None:
+            self._db.execute("DELETE FROM explanations WHERE created < ?", (time.time() - self.ttl_s,))
+        self._db.execute("DELETE FROM explanations WHERE template != ?", (self.template_id,))
+        self._db.execute(
+            "DELETE FROM explanations WHERE rowid NOT IN "
+            "(SELECT rowid FROM explanations ORDER BY created DESC LIMIT ?)",
+            (self.max_entries,),
+        )
+        self._db.commit()
+        # Oldest first so the most recent entries end up at the MRU end.
+        rows = self._db.execute("SELECT label, bucket, template, text, created FROM explanations ORDER BY created").fetchall()
+        for label, bucket, template, text, created in rows:
+            self._entries[(label, bucket, template)] = (text, created)
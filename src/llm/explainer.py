@@ -8,6 +8,12 @@ except ImportError:  # pragma: no cover - optional
 
 from ..config import LLMConfig
 
+PROMPT_TEMPLATE = (
+    "You are a concise driving safety assistant for Indian roads. "
+    "Explain the sign '{label}' with confidence {confidence:.2f}, "
+    "then provide a short instruction for a cautious human driver."
+)
+
 
 class LLMExplainer:
     def __init__(self, cfg: LLMConfig) -> None:
@@ -24,12 +30,9 @@ class LLMExplainer:
             if not pipeline:
                 print("Transformers not installed; LLM layer will emit stubs.")
 
-    def explain(self, sign_label: str, confidence: float) -> str:
-        prompt = (
-            "You are a concise driving safety assistant for Indian roads. "
-            f"Explain the sign '{sign_label}' with confidence {confidence:.2f}, "
-            "then provide a short instruction for a cautious human driver."
-        )
+    def explain(self, sign_label: str, confidence: float) -> Optional[str]:
+        """Explanation text, or None when generation failed (callers must not cache a failure)."""
+        prompt = PROMPT_TEMPLATE.format(label=sign_label, confidence=confidence)
         if self._client is None:
             return f"Detected sign '{sign_label}'. Drive cautiously and obey posted rules."
 
@@ -38,5 +41,5 @@ class LLMExplainer:
             if isinstance(out, list) and out:
                 return out[0]["generated_text"][-self.cfg.max_tokens :]
         except Exception:
-            return f"Detected sign '{sign_label}'. Drive cautiously."
-        return "Drive safely."
+            return None
+        return None
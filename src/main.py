@@ -1,23 +1,41 @@
 import argparse
+import sys
 from typing import Optional
 
 from .config import AppConfig
 from .pipeline import process_stream
+from .multicam import parse_sources, process_multi_stream
 from .ui.dashboard import Dashboard
+from .utils.decode import ParallelDecoder
+from .utils.result_sink import ResultSink
 from .utils.video_source import FrameStream
 from .utils.controls import ControlListener, ControlState
 
 
 def parse_args() -> argparse.Namespace:
-    parser = argparse.ArgumentParser(description="Road sign recognition console app for Indian roads")
-    parser.add_argument("--source", default="0", help="Camera index or video file path")
+    parser = argparse.ArgumentParser(description="Road sign recognition console app for Indian roads",
+                                     epilog="Reprocess recorded videos offline: python -m src.main batch --help")
+    parser.add_argument("--source", nargs="+", default=["0"], help="Camera index or video file path; several (optionally as name=source, e.g. front=0 left=1) share one set of models")
+    parser.add_argument("--batch-wait", type=float, default=None, metavar="MS", help="Max wait for other cameras' frames before a multi-camera batch runs")
     parser.add_argument("--resize", nargs=2, type=int, metavar=("W", "H"), help="Optional resize")
-    parser.add_argument("--detector", default=None, help="Detector name (yolov8n, yolov9c, efficientdet_d0, ssd_mobilenet_v3)")
-    parser.add_argument("--classifier", default=None, help="Classifier name (resnet50, efficientnet_b4, mobilenet_v3_large, vit_b_16)")
+    parser.add_argument("--detector", default=None, help="Detector name (yolov8n, yolov9c, efficientdet_d0, ssd_mobilenet_v3) or path to an exported .onnx model")
+    parser.add_argument("--classifier", default=None, help="Classifier name (resnet50, efficientnet_b4, mobilenet_v3_large, vit_b_16) or path to an exported .onnx model")
     parser.add_argument("--max-frames", type=int, default=None, help="Stop after N frames")
     parser.add_argument("--no-preview", action="store_true", help="Disable preview rendering (TUI only)")
     parser.add_argument("--target-fps", type=float, default=20.0, help="Target capture FPS with frame skipping")
     parser.add_argument("--queue", type=int, default=5, help="Frame queue size for capture thread")
+    parser.add_argument("--frame-ring", type=int, default=0, metavar="SLOTS", help="Decode frames into a shared-memory ring with SLOTS slots instead of allocating per frame")
+    parser.add_argument("--latest-frame", action="store_true", help="Always process the newest captured frame, dropping the ones the pipeline was too slow for")
+    parser.add_argument("--sample-file", action="store_true", help="For video files, decode only every Nth frame so the file plays at --target-fps")
+    parser.add_argument("--hw-decode", action="store_true", help="Use hardware video decoding when the backend supports it")
+    parser.add_argument("--decode-threads", type=int, default=0, metavar="N", help="Decoder threads per video source")
+    parser.add_argument("--decode-workers", type=int, default=0, metavar="N", help="Decode a video file in N parallel segments (unpaced, for offline runs)")
+    parser.add_argument("--record", default=None, metavar="PATH", help="Also write every result to a columnar file (.parquet, .arrow, or a directory of .npy columns)")
+    parser.add_argument("--pipelined", action="store_true", help="Run preprocess/detect/classify/LLM stages on separate threads")
+    parser.add_argument("--tiles", nargs=2, type=int, metavar=("COLS", "ROWS"), help="Sliced inference on COLS x ROWS overlapping full-resolution tiles")
+    parser.add_argument("--keyframe-interval", type=int, default=None, metavar="N", help="Full-frame detection every N frames, track-guided regions in between")
+    parser.add_argument("--detect-budget", type=float, default=None, metavar="MS", help="Mean detection time per frame; picks the keyframe interval adaptively")
+    parser.add_argument("--roi-only", action="store_true", help="Enhance only padded detection crops instead of the full frame")
     return parser.parse_args()
 
 
@@ -29,33 +47,96 @@ def build_config(args: argparse.Namespace) -> AppConfig:
         cfg.classifier.name = args.classifier
     if args.resize:
         cfg.runtime.resize = (args.resize[0], args.resize[1])
-    cfg.runtime.source = args.source
+    cfg.runtime.source = args.source[0]
+    if len(args.source) > 1:
+        cfg.runtime.sources = list(args.source)
+    if args.batch_wait is not None:
+        cfg.runtime.batch_max_wait_ms = args.batch_wait
     cfg.runtime.max_frames = args.max_frames
     cfg.runtime.show_preview = not args.no_preview
     cfg.runtime.target_fps = args.target_fps
     cfg.runtime.frame_queue = args.queue
+    cfg.runtime.frame_ring_slots = args.frame_ring
+    cfg.runtime.latest_frame = args.latest_frame
+    cfg.runtime.sample_files = args.sample_file
+    cfg.runtime.hw_decode = args.hw_decode
+    cfg.runtime.decode_threads = args.decode_threads
+    cfg.runtime.decode_workers = args.decode_workers
+    cfg.runtime.record_path = args.record
+    cfg.runtime.pipelined = args.pipelined
+    cfg.preprocess.roi_only = args.roi_only
+    if args.tiles:
+        cfg.detector.tiled = True
+        cfg.detector.tile_cols, cfg.detector.tile_rows = args.tiles
+    if args.keyframe_interval or args.detect_budget:
+        cfg.scheduling.enabled = True
+        if args.keyframe_interval:
+            cfg.scheduling.keyframe_interval = args.keyframe_interval
+        cfg.scheduling.detect_budget_ms = args.detect_budget
     return cfg
 
 
+def frames_in_flight(cfg: AppConfig) -> int:
+    """Upper bound on frames of one source the pipeline holds at once (latest-frame buffers and ring slots must not be reused under them)."""
+    if cfg.runtime.sources:
+        # The camera's own inbox, the frame in the current batch and the one its reader is waiting to queue
+        return max(1, cfg.runtime.frame_queue) + 2
+    if cfg.runtime.pipelined:
+        # A queue in front of each of the four stages, one frame inside each stage and one in the feeder
+        return 4 * (max(1, cfg.runtime.stage_queue) + 1) + 1
+    return 1
+
+
+def recorded(results, sink: ResultSink):
+    """Pass results through while writing them to ``sink``; the sink is closed when the stream ends."""
+    try:
+        for result in results:
+            sink.write(result)
+            yield result
+    finally:
+        sink.close()
+
+
 def main():
+    if sys.argv[1:2] == ["batch"]:
+        from .batch import main as batch_main
+        return batch_main(sys.argv[2:])
     args = parse_args()
     cfg = build_config(args)
     dashboard = Dashboard()
     controls = ControlState()
     control_thread = ControlListener(controls)
     control_thread.start()
-    stream = FrameStream(cfg.runtime.source, cfg.runtime.resize, max_queue=cfg.runtime.frame_queue, target_fps=cfg.runtime.target_fps).start()
+    sources = parse_sources(cfg.runtime.sources) if cfg.runtime.sources else {"main": cfg.runtime.source}
+    decoder = None
+    if cfg.runtime.decode_workers > 1 and not cfg.runtime.sources and not str(cfg.runtime.source).isdigit():
+        hold = frames_in_flight(cfg)
+        decoder = ParallelDecoder(cfg.runtime.source, cfg.runtime.decode_workers, resize=cfg.runtime.resize, slots=hold + 16, hold=hold,
+                                  hw_accel=cfg.runtime.hw_decode, threads=cfg.runtime.decode_threads,
+                                  target_fps=cfg.runtime.target_fps if cfg.runtime.sample_files else None)
+        sources = {}
+    streams = {
+        name: FrameStream(source, cfg.runtime.resize, max_queue=cfg.runtime.frame_queue, target_fps=cfg.runtime.target_fps,
+                          ring_slots=cfg.runtime.frame_ring_slots, latest=cfg.runtime.latest_frame, hold=frames_in_flight(cfg),
+                          sample=cfg.runtime.sample_files, hw_accel=cfg.runtime.hw_decode,
+                          decode_threads=cfg.runtime.decode_threads).start()
+        for name, source in sources.items()
+    }
 
-    def limited_frames():
+    def limited_frames(stream):
         try:
-            for idx, frame in stream.frames():
-                yield idx, frame
+            yield from stream.frames()
         finally:
             stream.stop()
-            control_thread.stop()
 
     try:
-        result_stream = process_stream(limited_frames(), cfg, controls)
+        if cfg.runtime.sources:
+            frames = {name: limited_frames(stream) for name, stream in streams.items()}
+            result_stream = process_multi_stream(frames, cfg, controls)
+        else:
+            result_stream = process_stream(decoder.frames() if decoder else limited_frames(streams["main"]), cfg, controls)
+        if cfg.runtime.record_path:
+            result_stream = recorded(result_stream, ResultSink(cfg.runtime.record_path))
         dashboard.run_live(result_stream)
     except KeyboardInterrupt:
         print("\nShutdown complete.")
@@ -64,7 +145,8 @@ def main():
         raise
     finally:
         control_thread.stop()
-        stream.stop()
+        for stream in streams.values():
+            stream.stop()
         print("Application closed.")
 
 
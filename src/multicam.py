@@ -0,0 +1,273 @@
+"""Several cameras served by one set of models, with inference batched across cameras.
+
+Each camera keeps its own tracker, safety guard, caches and in-order result
+stream (a ``_StreamPipeline``); only the detector, classifier and LLM are
+shared. A batch holds at most one frame per camera and closes once every
+running camera has contributed a frame or ``runtime.batch_max_wait_ms`` has
+passed since its first frame. Every batch then gets one detector forward pass
+and one classifier forward pass.
+"""
+
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from queue import Empty, Full, Queue
+from typing import Any, Dict, Generator, Iterable, List, Optional, Tuple
+
+from .config import AppConfig
+from .pipeline import PipelineModels, _FrameWork, _StreamPipeline, _admit_frames, build_models
+from .utils.controls import ControlState
+from .utils.types import FrameResult
+
+_NAMED_SOURCE = re.compile(r"^(\w+)=(.+)$")
+_DONE = object()
+
+
+class _SourceFailure:
+    """Carries an exception raised while reading a camera to the serving loop."""
+
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+def parse_sources(specs: Iterable[str]) -> Dict[str, str]:
+    """
+    Name camera sources given as ``name=source`` (e.g. ``front=0``) or bare sources.
+
+    Bare sources are named ``cam0``, ``cam1``, ... by position. URLs such as
+    ``rtsp://host/stream?a=b`` stay bare because ``rtsp://host/stream?a`` is not a name.
+    """
+    named: Dict[str, str] = {}
+    for i, spec in enumerate(specs):
+        match = _NAMED_SOURCE.match(spec)
+        name, source = (match.group(1), match.group(2)) if match else (f"cam{i}", spec)
+        if name in named:
+            raise ValueError(f"Duplicate camera name: {name}")
+        named[name] = source
+    return named
+
+
+class MultiCameraServer:
+    """
+    Serve several frame sources with one shared ``PipelineModels``.
+
+    ``run()`` yields every camera's results as they are produced, tagged with
+    ``FrameResult.source_id``. Alternatively, ``start()`` serves in the
+    background and ``results(name)`` gives one camera's own stream. Each
+    camera's stream must then be consumed, since a full result queue holds up
+    the batch loop.
+
+    Stage times in each result are that camera's share of the batched forward
+    pass. ``stats["batch"]`` records how many cameras, full-frame detections
+    and crops the batch held.
+    """
+
+    def __init__(self, sources: Dict[str, Iterable[Tuple[int, Any]]], cfg: AppConfig,
+                 controls: Optional[ControlState] = None, models: Optional[PipelineModels] = None,
+                 max_wait_ms: Optional[float] = None, result_queue: int = 8) -> None:
+        """
+        Args:
+            sources: Camera name -> iterable of ``(frame_id, frame)``, e.g. ``FrameStream.frames()``
+            cfg: Application config shared by every camera
+            controls: Optional quit/pause/override state
+            models: Models to share; built from ``cfg`` (and closed on exit) when omitted
+            max_wait_ms: Batch deadline; defaults to ``cfg.runtime.batch_max_wait_ms``
+            result_queue: Capacity of each camera's queue for ``results()``
+        """
+        if not sources:
+            raise ValueError("MultiCameraServer needs at least one source")
+        self.cfg = cfg
+        self.sources = sources
+        self.controls = controls
+        self._owns_models = models is None
+        self.models = models or build_models(cfg)
+        wait_ms = cfg.runtime.batch_max_wait_ms if max_wait_ms is None else max_wait_ms
+        self.max_wait_s = max(0.0, wait_ms) / 1000
+        self.result_queue = max(1, result_queue)
+        self.pipelines = {name: _StreamPipeline(cfg, self.models, controls) for name in sources}
+        self.batches = 0
+        self.batched_frames = 0
+        # One bounded queue per camera: a fast camera blocks on its own queue instead of piling up frames
+        self._inboxes: Dict[str, Queue] = {name: Queue(maxsize=max(1, cfg.runtime.frame_queue)) for name in sources}
+        self._arrived = threading.Event()
+        self._outboxes: Dict[str, Queue] = {}
+        self._live: set = set()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._serve_thread: Optional[threading.Thread] = None
+        self._error: Optional[BaseException] = None
+
+    def _offer(self, queue: Queue, item: Any) -> bool:
+        while not self._stop.is_set():
+            try:
+                queue.put(item, timeout=0.05)
+                return True
+            except Full:
+                continue
+        return False
+
+    def _read(self, name: str, frames: Iterable[Tuple[int, Any]]) -> None:
+        inbox = self._inboxes[name]
+        try:
+            for work in _admit_frames(frames, self.cfg, self.controls):
+                if not self._offer(inbox, work):
+                    return
+                self._arrived.set()
+            item: Any = _DONE
+        except BaseException as error:  # surfaced by the serving loop
+            item = _SourceFailure(error)
+        self._offer(inbox, item)
+        self._arrived.set()
+
+    def _collect(self) -> List[Tuple[str, _FrameWork]]:
+        """Gather at most one frame per camera until all running cameras are in or the deadline passes."""
+        batch: Dict[str, _FrameWork] = {}
+        deadline = None
+        while not self._stop.is_set() and not self._live <= batch.keys():
+            if self.controls and self.controls.request_quit:
+                break
+            # Cleared before polling, so a frame queued after the poll still ends the wait below.
+            self._arrived.clear()
+            for name in sorted(self._live - batch.keys()):
+                try:
+                    item = self._inboxes[name].get_nowait()
+                except Empty:
+                    continue
+                if item is _DONE:
+                    self._live.discard(name)
+                elif isinstance(item, _SourceFailure):
+                    raise RuntimeError(f"Camera '{name}' failed: {item.error}") from item.error
+                else:
+                    batch[name] = item
+                    if deadline is None:
+                        deadline = time.perf_counter() + self.max_wait_s
+            if self._live <= batch.keys():
+                break
+            timeout = 0.05 if deadline is None else deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            self._arrived.wait(min(timeout, 0.05))
+        return list(batch.items())
+
+    def _process(self, batch: List[Tuple[str, _FrameWork]], pool: ThreadPoolExecutor) -> List[FrameResult]:
+        pairs = [(self.pipelines[name], work) for name, work in batch]
+        # Each camera has its own Preprocessor, so frames can be preprocessed concurrently.
+        list(pool.map(lambda pair: pair[0].preprocess(pair[1]), pairs))
+
+        full = [(pipe, work) for pipe, work in pairs if pipe.plan_detection(work)]
+        raw: Dict[int, List] = {}
+        detect_share = 0.0
+        if full:
+            t0 = time.perf_counter()
+            outputs = self.models.detector.detect_batch([work.processed for _, work in full])
+            detect_share = (time.perf_counter() - t0) * 1000 / len(full)
+            raw = {id(work): dets for (_, work), dets in zip(full, outputs)}
+        for pipe, work in pairs:
+            batched = id(work) in raw
+            pipe.detect(work, raw=raw.get(id(work)), raw_ms=detect_share if batched else 0.0)
+
+        t1 = time.perf_counter()
+        for pipe, work in pairs:
+            pipe.prepare_crops(work)
+        counts = [len(work.crops) for _, work in pairs]
+        crops = [crop for _, work in pairs for crop in work.crops]
+        fresh = self.models.classifier.classify_crops(crops) if crops else []
+        classify_share = (time.perf_counter() - t1) * 1000 / len(pairs)
+        start = 0
+        for (pipe, work), count in zip(pairs, counts):
+            pipe.finish_classify(work, fresh[start:start + count])
+            work.stage_latency["classify_ms"] = classify_share
+            start += count
+
+        results = []
+        for (name, work), (pipe, _) in zip(batch, pairs):
+            result = pipe.finalize(work)
+            result.source_id = name
+            result.stats["batch"] = {"cameras": len(batch), "full_frames": len(full), "crops": len(crops)}
+            results.append(result)
+        self.batches += 1
+        self.batched_frames += len(batch)
+        return results
+
+    def run(self) -> Generator[FrameResult, None, None]:
+        """Serve every camera until all sources end (or quit is requested), yielding results as batches finish."""
+        self._stop.clear()
+        self._live = set(self.sources)
+        self._threads = [
+            threading.Thread(target=self._read, args=(name, frames), daemon=True, name=f"camera-{name}")
+            for name, frames in self.sources.items()
+        ]
+        for thread in self._threads:
+            thread.start()
+        for pipe in self.pipelines.values():
+            pipe.start()
+        pool = ThreadPoolExecutor(max_workers=len(self.sources), thread_name_prefix="preprocess")
+        try:
+            while not (self.controls and self.controls.request_quit):
+                batch = self._collect()
+                if not batch:
+                    break
+                yield from self._process(batch, pool)
+        finally:
+            self._stop.set()
+            pool.shutdown(wait=True)
+            for thread in self._threads:
+                thread.join(timeout=1)
+            for pipe in self.pipelines.values():
+                pipe.close()
+            if self._owns_models:
+                self.models.llm_cache.close()
+
+    def start(self) -> "MultiCameraServer":
+        """Serve on a background thread; read each camera's results with ``results(name)``."""
+        self._outboxes = {name: Queue(maxsize=self.result_queue) for name in self.sources}
+        self._error = None
+        self._serve_thread = threading.Thread(target=self._serve, daemon=True, name="multicam-serve")
+        self._serve_thread.start()
+        return self
+
+    def _serve(self) -> None:
+        try:
+            for result in self.run():
+                self._offer(self._outboxes[result.source_id], result)
+        except BaseException as error:
+            self._error = error
+        finally:
+            for outbox in self._outboxes.values():
+                self._close_outbox(outbox)
+
+    @staticmethod
+    def _close_outbox(outbox: Queue) -> None:
+        """Queue end-of-stream without blocking, dropping the oldest unread results when no one is reading."""
+        while True:
+            try:
+                outbox.put_nowait(_DONE)
+                return
+            except Full:
+                try:
+                    outbox.get_nowait()
+                except Empty:
+                    pass
+
+    def results(self, name: str) -> Generator[FrameResult, None, None]:
+        """One camera's results, in frame order, until serving ends."""
+        outbox = self._outboxes[name]
+        while True:
+            item = outbox.get()
+            if item is _DONE:
+                if self._error is not None:
+                    raise RuntimeError(f"Multi-camera serving failed: {self._error}") from self._error
+                return
+            yield item
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._serve_thread is not None:
+            self._serve_thread.join(timeout=1)
+
+
+def process_multi_stream(sources: Dict[str, Iterable[Tuple[int, Any]]], cfg: AppConfig,
+                         controls: Optional[ControlState] = None) -> Generator[FrameResult, None, None]:
+    """Multi-camera counterpart of ``process_stream``: results of all cameras, tagged with ``source_id``."""
+    yield from MultiCameraServer(sources, cfg, controls).run()
@@ -0,0 +1,82 @@
+"""Sign-crop folders for calibration, fine-tuning and distillation."""
+
+import os
+from typing import Callable, List, Optional, Tuple
+
+import cv2
+
+try:
+    import torch
+    from torch.utils.data import DataLoader, Dataset
+except ImportError:  # pragma: no cover - optional
+    torch = None
+    DataLoader = None
+    Dataset = object
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".ppm", ".webp")
+
+
+class CropFolder(Dataset):
+    """
+    Image crops on disk, read as BGR arrays like the live pipeline sees them.
+
+    ``root/<class_name>/*.jpg`` gives labelled samples (labels follow
+    ``class_names`` if provided, else sorted folder names). A flat folder of
+    images gives unlabelled samples with label -1, which is enough for
+    calibration.
+    """
+
+    def __init__(self, root: str, transform: Callable, class_names: Optional[List[str]] = None, limit: Optional[int] = None) -> None:
+        """
+        Args:
+            root: Dataset directory
+            transform: Maps one BGR crop (H, W, 3) to a CHW tensor, e.g. ``classifier.prepare``
+            class_names: Optional label order; folders not listed are skipped
+            limit: Optional cap on the number of samples
+        """
+        if not os.path.isdir(root):
+            raise FileNotFoundError(f"Crop folder not found: {root}")
+        self.root = root
+        self.transform = transform
+        subdirs = sorted(d for d in os.listdir(root) if os.path.isdir(os.path.join(root, d)))
+        self.class_names = list(class_names) if class_names else subdirs
+        self.samples: List[Tuple[str, int]] = []
+        if subdirs:
+            index = {name: i for i, name in enumerate(self.class_names)}
+            for name in subdirs:
+                if name not in index:
+                    continue
+                for path in _images(os.path.join(root, name)):
+                    self.samples.append((path, index[name]))
+        else:
+            self.samples = [(path, -1) for path in _images(root)]
+        if limit is not None:
+            self.samples = self.samples[:limit]
+        if not self.samples:
+            raise ValueError(f"No images found under {root}")
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    def __getitem__(self, idx: int):
+        path, label = self.samples[idx]
+        crop = cv2.imread(path, cv2.IMREAD_COLOR)
+        if crop is None:
+            raise ValueError(f"Unreadable image: {path}")
+        return self.transform(crop), label
+
+
+def crop_loader(root: str, transform: Callable, batch_size: int = 32, shuffle: bool = False,
+                class_names: Optional[List[str]] = None, limit: Optional[int] = None, num_workers: int = 0):
+    """DataLoader over a ``CropFolder``."""
+    if torch is None:
+        raise RuntimeError("Crop loaders require torch")
+    dataset = CropFolder(root, transform, class_names=class_names, limit=limit)
+    return DataLoader(dataset, batch_size=batch_size, shuffle=shuffle, num_workers=num_workers)
+
+
+def _images(folder: str) -> List[str]:
+    return sorted(
+        os.path.join(folder, name) for name in os.listdir(folder)
+        if name.lower().endswith(IMAGE_EXTENSIONS)
+    )
@@ -0,0 +1,228 @@
+"""Knowledge distillation from a large classifier (ViT/EfficientNet) into MobileNetV3.
+
+Usage:
+    python -m src.optimization.distillation --teacher vit_b_16 --teacher-weights models/vit.pt \
+        --student mobilenet_v3_large --data data/crops --output models/mobilenet_distilled.pt
+
+``data`` is a crop folder: ``<class_name>/*.jpg`` subfolders give hard labels,
+a flat folder of crops trains on the teacher's soft labels only. The output is a
+student state dict that ``classifier.model_path`` loads directly.
+"""
+
+import argparse
+import copy
+import os
+from dataclasses import dataclass
+from typing import Any, Optional
+
+try:
+    import torch
+    import torch.nn.functional as F
+    from torch import nn
+except ImportError:  # pragma: no cover - optional
+    torch = None
+    F = None
+    nn = None
+
+from ..config import AppConfig, ClassifierConfig
+from .datasets import crop_loader
+
+
+@dataclass
+class DistillationReport:
+    epochs: int
+    samples: int
+    final_loss: float
+    agreement_before: float
+    agreement_after: float
+
+    def summary(self) -> str:
+        return (
+            f"{self.epochs} epoch(s) over {self.samples} crops | final loss {self.final_loss:.4f} | "
+            f"top-1 agreement with teacher {self.agreement_before:.2%} -> {self.agreement_after:.2%}"
+        )
+
+
+def _require_torch() -> None:
+    if torch is None:
+        raise RuntimeError("Distillation requires torch")
+
+
+def distillation_loss(student_logits, teacher_logits, labels, temperature: float = 4.0, alpha: float = 0.7):
+    """
+    Hinton-style distillation loss.
+
+    ``alpha`` weights the KL divergence between temperature-softened teacher and
+    student distributions (scaled by T^2 to keep gradient magnitudes comparable);
+    ``1 - alpha`` weights cross-entropy on hard labels. Samples labelled -1
+    (unlabelled crops) contribute only to the soft term.
+    """
+    soft = F.kl_div(
+        F.log_softmax(student_logits / temperature, dim=1),
+        F.softmax(teacher_logits / temperature, dim=1),
+        reduction="batchmean",
+    ) * temperature ** 2
+    if labels is None or bool((labels < 0).all()):
+        return soft
+    hard = F.cross_entropy(student_logits, labels, ignore_index=-1)
+    return alpha * soft + (1.0 - alpha) * hard
+
+
+def _split_batch(batch):
+    """Return ``(teacher_input, student_input, labels)`` from a loader batch."""
+    inputs, labels = batch if isinstance(batch, (list, tuple)) and len(batch) == 2 else (batch, None)
+    if isinstance(inputs, (list, tuple)):
+        return inputs[0], inputs[1], labels
+    return inputs, inputs, labels
+
+
+def distill(teacher: Any, student: Any, loader: Any, epochs: int = 1, lr: float = 1e-4, temperature: float = 4.0,
+            alpha: float = 0.7, device: str = "cpu") -> float:
+    """
+    Train ``student`` in place to match ``teacher`` on ``loader``.
+
+    Batches are ``(images, labels)`` or ``((teacher_images, student_images), labels)``
+    when the two networks expect different input sizes.
+
+    Returns:
+        Mean loss of the last epoch
+    """
+    _require_torch()
+    teacher = teacher.to(device).eval()
+    student = student.to(device).train()
+    optimizer = torch.optim.AdamW(student.parameters(), lr=lr)
+    mean = 0.0
+    for epoch in range(epochs):
+        total, batches = 0.0, 0
+        for batch in loader:
+            t_in, s_in, labels = _split_batch(batch)
+            with torch.no_grad():
+                t_logits = teacher(t_in.to(device)).float()
+            s_logits = student(s_in.to(device))
+            loss = distillation_loss(s_logits, t_logits, labels.to(device) if labels is not None else None, temperature, alpha)
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+            total += loss.item()
+            batches += 1
+        mean = total / max(batches, 1)
+        print(f"[optim] distillation epoch {epoch + 1}/{epochs} loss={mean:.4f}")
+    student.eval()
+    return mean
+
+
+def teacher_agreement(teacher: Any, student: Any, loader: Any, device: str = "cpu") -> float:
+    """Fraction of crops on which the student's top-1 class matches the teacher's."""
+    _require_torch()
+    teacher, student = teacher.to(device).eval(), student.to(device).eval()
+    agree = total = 0
+    with torch.no_grad():
+        for batch in loader:
+            t_in, s_in, _ = _split_batch(batch)
+            t_top = teacher(t_in.to(device)).argmax(dim=1)
+            s_top = student(s_in.to(device)).argmax(dim=1)
+            agree += int((t_top == s_top).sum())
+            total += len(t_top)
+    return agree / total if total else 0.0
+
+
+def replace_head(model: Any, num_classes: int) -> Any:
+    """Swap the last ``nn.Linear`` of ``model`` for a fresh one with ``num_classes`` outputs."""
+    _require_torch()
+    name = next((n for n, m in reversed(list(model.named_modules())) if isinstance(m, nn.Linear)), None)
+    if name is None:
+        raise ValueError(f"No linear head found in {type(model).__name__}")
+    old = model.get_submodule(name)
+    if old.out_features == num_classes:
+        return model
+    parent_name, _, child = name.rpartition(".")
+    parent = model.get_submodule(parent_name) if parent_name else model
+    setattr(parent, child, nn.Linear(old.in_features, num_classes, bias=old.bias is not None))
+    return model
+
+
+def distill_classifier(teacher_cfg: ClassifierConfig, student_cfg: ClassifierConfig, data_dir: str, output: str,
+                       epochs: int = 3, lr: float = 1e-4, temperature: float = 4.0, alpha: float = 0.7,
+                       batch_size: int = 16, device: str = "cpu", max_images: Optional[int] = None) -> DistillationReport:
+    """
+    Distil the configured teacher into the configured student and save the student's state dict.
+
+    Each crop is preprocessed twice, once per network, so teacher and student
+    keep their own input sizes and normalisation. If the teacher was fine-tuned
+    on a different number of classes than the student's head, the student head
+    is resized to match before training.
+
+    Args:
+        teacher_cfg: Teacher classifier config (``model_path`` should hold its fine-tuned weights)
+        student_cfg: Student classifier config (optionally with initial ``model_path`` weights)
+        data_dir: Crop folder
+        output: Destination of the student state dict
+        epochs, lr, temperature, alpha: Training hyper-parameters
+        batch_size: Crops per step
+        device: Training device
+        max_images: Optional cap on the number of crops
+
+    Returns:
+        A ``DistillationReport``
+    """
+    from ..pipeline import build_classifier
+
+    _require_torch()
+    built = []
+    for cfg in (teacher_cfg, student_cfg):
+        cfg = copy.copy(cfg)
+        cfg.device, cfg.half_precision, cfg.quantized = device, False, False
+        clf = build_classifier(AppConfig(classifier=cfg))
+        if getattr(clf, "model", None) is None:
+            raise RuntimeError(f"Classifier '{cfg.name}' has no torch model to distil")
+        built.append(clf)
+    teacher, student = built
+
+    with torch.no_grad():
+        num_classes = teacher.model(torch.zeros(1, 3, *teacher.input_size, device=device)).shape[1]
+    student_model = replace_head(student.model, num_classes).to(device)
+
+    def prepare_pair(crop):
+        return teacher.prepare(crop), student.prepare(crop)
+
+    loader = crop_loader(data_dir, prepare_pair, batch_size=batch_size, shuffle=True,
+                         class_names=student_cfg.class_names or None, limit=max_images)
+    eval_loader = crop_loader(data_dir, prepare_pair, batch_size=batch_size,
+                              class_names=student_cfg.class_names or None, limit=max_images)
+
+    before = teacher_agreement(teacher.model, student_model, eval_loader, device)
+    loss = distill(teacher.model, student_model, loader, epochs=epochs, lr=lr, temperature=temperature, alpha=alpha, device=device)
+    after = teacher_agreement(teacher.model, student_model, eval_loader, device)
+
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    torch.save(student_model.cpu().state_dict(), output)
+    return DistillationReport(epochs, len(loader.dataset), loss, before, after)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Distil a large classifier into a small one")
+    parser.add_argument("--teacher", default="vit_b_16", help="Teacher classifier name (vit_b_16, efficientnet_b4, ...)")
+    parser.add_argument("--teacher-weights", default=None, help="Teacher fine-tuned weights (model_path)")
+    parser.add_argument("--student", default="mobilenet_v3_large", help="Student classifier name")
+    parser.add_argument("--student-weights", default=None, help="Optional initial student weights")
+    parser.add_argument("--data", required=True, help="Crop folder (<class>/*.jpg or flat)")
+    parser.add_argument("--output", required=True, help="Destination of the student state dict")
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--lr", type=float, default=1e-4)
+    parser.add_argument("--temperature", type=float, default=4.0)
+    parser.add_argument("--alpha", type=float, default=0.7, help="Weight of the soft-label loss")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--device", default="cpu")
+    args = parser.parse_args()
+
+    teacher = ClassifierConfig(name=args.teacher, model_path=args.teacher_weights)
+    student = ClassifierConfig(name=args.student, model_path=args.student_weights)
+    report = distill_classifier(teacher, student, args.data, args.output, epochs=args.epochs, lr=args.lr,
+                                temperature=args.temperature, alpha=args.alpha, batch_size=args.batch_size,
+                                device=args.device)
+    print(f"[optim] Saved distilled student to {args.output}")
+    print(f"[optim] {report.summary()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Export the torchvision classifiers and the YOLO detector to ONNX.
+
+Usage:
+    python -m src.optimization.onnx_export classifier --name mobilenet_v3_large --output models/cls.onnx
+    python -m src.optimization.onnx_export detector --name yolov8n --output models/det.onnx
+"""
+
+import argparse
+import inspect
+import json
+import shutil
+from typing import Any, Dict, Optional
+
+try:
+    import torch
+except ImportError:  # pragma: no cover - optional
+    torch = None
+
+try:
+    import onnx  # type: ignore
+except ImportError:  # pragma: no cover - optional
+    onnx = None
+
+from ..config import AppConfig, ClassifierConfig, DetectorConfig
+
+
+def export_onnx(model: Any, sample_input: Any, path: str, opset: int = 17, metadata: Optional[Dict[str, str]] = None) -> str:
+    """
+    Export a PyTorch module to ONNX with a dynamic batch axis.
+
+    Args:
+        model: ``torch.nn.Module`` taking one image batch
+        sample_input: Example input tensor of shape (N, 3, H, W)
+        path: Destination ``.onnx`` file
+        opset: ONNX opset version
+        metadata: Optional key/value pairs stored in the model's metadata_props
+
+    Returns:
+        The written path
+    """
+    if torch is None:
+        raise RuntimeError("ONNX export requires torch")
+    model = model.eval().float().cpu()
+    # Newer torch defaults to the dynamo exporter; the TorchScript one handles dynamic_axes everywhere.
+    legacy = {"dynamo": False} if "dynamo" in inspect.signature(torch.onnx.export).parameters else {}
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            (sample_input.float().cpu(),),
+            path,
+            input_names=["images"],
+            output_names=["logits"],
+            dynamic_axes={"images": {0: "batch"}, "logits": {0: "batch"}},
+            opset_version=opset,
+            **legacy,
+        )
+    if metadata:
+        if onnx is None:
+            raise RuntimeError("Writing ONNX metadata requires the onnx package")
+        proto = onnx.load(path)
+        for key, value in metadata.items():
+            entry = proto.metadata_props.add()
+            entry.key, entry.value = key, value
+        onnx.save(proto, path)
+    return path
+
+
+def export_classifier_onnx(cfg: ClassifierConfig, path: str, opset: int = 17) -> str:
+    """Build the configured torchvision classifier (with ``model_path`` weights) and export it."""
+    from ..pipeline import build_classifier
+
+    classifier = build_classifier(AppConfig(classifier=cfg))
+    if getattr(classifier, "model", None) is None:
+        raise RuntimeError(f"Classifier '{cfg.name}' has no torch model to export")
+    h, w = classifier.input_size
+    metadata = {"class_names": json.dumps(cfg.class_names)} if cfg.class_names else None
+    return export_onnx(classifier.model, torch.zeros(1, 3, h, w), path, opset=opset, metadata=metadata)
+
+
+def export_yolo_onnx(cfg: DetectorConfig, path: Optional[str] = None, opset: int = 12) -> str:
+    """
+    Export the configured YOLO weights with Ultralytics' exporter.
+
+    The exported graph keeps the raw ``(N, 4 + num_classes, anchors)`` head that
+    ``OnnxDetector`` decodes, and Ultralytics embeds the class names as metadata.
+    """
+    from ..detectors.yolo_detector import YOLO
+
+    if YOLO is None:
+        raise RuntimeError("YOLO export requires the ultralytics package")
+    model = YOLO(cfg.model_path or cfg.name)
+    exported = model.export(format="onnx", imgsz=cfg.input_size, opset=opset, dynamic=True, simplify=False)
+    if path and str(exported) != path:
+        shutil.move(str(exported), path)
+        return path
+    return str(exported)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export detector/classifier weights to ONNX")
+    parser.add_argument("kind", choices=["classifier", "detector"])
+    parser.add_argument("--name", required=True, help="Model name as used in the config (e.g. mobilenet_v3_large, yolov8n)")
+    parser.add_argument("--weights", default=None, help="Optional fine-tuned weights (model_path)")
+    parser.add_argument("--output", required=True, help="Destination .onnx file")
+    parser.add_argument("--opset", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.kind == "classifier":
+        cfg = ClassifierConfig(name=args.name, model_path=args.weights, device="cpu")
+        out = export_classifier_onnx(cfg, args.output, opset=args.opset or 17)
+    else:
+        cfg = DetectorConfig(name=args.name, model_path=args.weights, device="cpu")
+        out = export_yolo_onnx(cfg, args.output, opset=args.opset or 12)
+    print(f"[optim] Exported {args.kind} to {out}")
+
+
+if __name__ == "__main__":
+    main()
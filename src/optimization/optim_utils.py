@@ -1,26 +1,52 @@
 """Optimization hooks for quantization, pruning, and distillation.
-This file exposes placeholders to guide integration with your training stack.
+Thin entry points over the quantization, pruning, distillation and onnx_export modules.
 """
 
-from typing import Any
+import os
+from typing import Any, Optional
 
-
-def apply_quantization(model: Any, backend: str = "onnx", precision: str = "int8") -> Any:
-    # Plug in torch.quantization or onnxruntime quantization here
-    print(f"[optim] Request quantization backend={backend} precision={precision}")
-    return model
+from . import distillation, onnx_export, pruning, quantization
 
 
-def apply_pruning(model: Any, amount: float = 0.3) -> Any:
-    print(f"[optim] Request pruning amount={amount}")
-    return model
+def apply_quantization(model: Any, backend: str = "onnx", precision: str = "int8", calibration: Any = None,
+                       input_size: tuple = (224, 224)) -> Any:
+    """
+    INT8 post-training quantization.
 
-
-def distill_teacher_student(teacher: Any, student: Any, dataloader: Any) -> Any:
+    With ``backend="onnx"`` ``model`` is the path of an exported ``.onnx`` file and
+    the path of the quantized copy is returned. Torch backends (``x86``,
+    ``fbgemm``, ``qnnpack``) calibrate ``model`` on ``calibration`` batches.
+    """
+    print(f"[optim] Request quantization backend={backend} precision={precision}")
+    if precision != "int8":
+        raise ValueError(f"Unsupported precision: {precision}")
+    if backend == "onnx":
+        if not isinstance(model, (str, os.PathLike)):
+            raise TypeError(f"The onnx backend quantizes an exported .onnx file; got {type(model).__name__} (export it first)")
+        root, ext = os.path.splitext(os.fspath(model))
+        return quantization.quantize_onnx(os.fspath(model), f"{root}_int8{ext or '.onnx'}")
+    if calibration is None:
+        raise ValueError("Static quantization needs calibration batches")
+    return quantization.quantize_static(model, calibration, backend=backend, input_size=input_size)
+
+
+def apply_pruning(model: Any, amount: float = 0.3, budget_ms: Optional[float] = None,
+                  input_size: tuple = (224, 224)) -> Any:
+    """Structured channel pruning to ``amount`` sparsity, or to a CPU latency budget when ``budget_ms`` is set."""
+    print(f"[optim] Request pruning amount={amount} budget_ms={budget_ms}")
+    if budget_ms is not None:
+        return pruning.prune_to_budget(model, budget_ms, input_size)[0]
+    return pruning.prune_channels(model, amount)
+
+
+def distill_teacher_student(teacher: Any, student: Any, dataloader: Any, epochs: int = 1, lr: float = 1e-4,
+                            temperature: float = 4.0, alpha: float = 0.7) -> Any:
+    """Train ``student`` on ``teacher``'s soft labels plus the loader's hard labels; returns the student."""
     print("[optim] Distillation hook invoked")
+    distillation.distill(teacher, student, dataloader, epochs=epochs, lr=lr, temperature=temperature, alpha=alpha)
     return student
 
 
 def export_onnx(model: Any, sample_input: Any, path: str) -> str:
     print(f"[optim] Exporting model to ONNX at {path}")
-    return path
+    return onnx_export.export_onnx(model, sample_input, path)
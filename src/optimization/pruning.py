@@ -0,0 +1,353 @@
+"""Structured channel pruning for the torchvision classifiers.
+
+Whole channels are removed from the hidden layers of each residual block, so the
+pruned network is a smaller dense network that runs faster on any backend (no
+sparse kernels needed). Block inputs and outputs keep their width, which leaves
+skip connections and the classifier head untouched.
+
+Usage:
+    python -m src.optimization.pruning --name mobilenet_v3_large --amount 0.3 --output models/cls_pruned.pt
+    python -m src.optimization.pruning --name resnet50 --budget-ms 25 --output models/cls_pruned.pt
+
+The saved state dict loads through ``build_classifier`` via ``classifier.model_path``;
+layer widths are taken from the state dict.
+"""
+
+import argparse
+import copy
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+try:
+    import torch
+    from torch import nn
+except ImportError:  # pragma: no cover - optional
+    torch = None
+    nn = None
+
+from ..config import AppConfig, ClassifierConfig
+
+
+@dataclass
+class PruningReport:
+    amount: float
+    params_before: int
+    params_after: int
+    ms_before: float
+    ms_after: float
+
+    def summary(self) -> str:
+        return (
+            f"pruned {self.amount:.0%} of hidden channels | params {self.params_before / 1e6:.2f}M -> "
+            f"{self.params_after / 1e6:.2f}M | CPU latency {self.ms_before:.2f} -> {self.ms_after:.2f} ms/crop"
+        )
+
+
+def _require_torch() -> None:
+    if torch is None:
+        raise RuntimeError("Pruning requires torch")
+
+
+def count_params(model: Any) -> int:
+    return sum(p.numel() for p in model.parameters())
+
+
+def measure_latency(model: Any, input_size: Tuple[int, int] = (224, 224), batch: int = 1, repeats: int = 10) -> float:
+    """Median CPU latency per crop in ms for ``model`` on this machine."""
+    _require_torch()
+    model = model.eval()
+    x = torch.zeros(batch, 3, *input_size)
+    times = []
+    with torch.no_grad():
+        model(x)  # warm-up
+        for _ in range(repeats):
+            start = time.perf_counter()
+            model(x)
+            times.append(time.perf_counter() - start)
+    times.sort()
+    return times[len(times) // 2] * 1000.0 / batch
+
+
+# ---------------------------------------------------------------------------
+# Layer surgery
+
+
+def _conv_like(conv: "nn.Conv2d", in_channels: int, out_channels: int, groups: int) -> "nn.Conv2d":
+    return nn.Conv2d(
+        in_channels, out_channels, conv.kernel_size, stride=conv.stride, padding=conv.padding,
+        dilation=conv.dilation, groups=groups, bias=conv.bias is not None, padding_mode=conv.padding_mode,
+    )
+
+
+def _select_conv(conv: "nn.Conv2d", out_idx=None, in_idx=None) -> "nn.Conv2d":
+    """Copy of ``conv`` keeping only output channels ``out_idx`` and/or input channels ``in_idx``."""
+    weight = conv.weight.data
+    bias = conv.bias.data if conv.bias is not None else None
+    depthwise = conv.groups > 1 and conv.groups == conv.in_channels == conv.out_channels
+    if depthwise:
+        # Depthwise filters are per channel: input and output selections coincide.
+        idx = out_idx if out_idx is not None else in_idx
+        new = _conv_like(conv, len(idx), len(idx), groups=len(idx))
+        new.weight.data = weight[idx].clone()
+        if bias is not None:
+            new.bias.data = bias[idx].clone()
+        return new
+    if out_idx is not None:
+        weight = weight[out_idx]
+        bias = bias[out_idx] if bias is not None else None
+    if in_idx is not None:
+        weight = weight[:, in_idx]
+    new = _conv_like(conv, weight.shape[1] * conv.groups, weight.shape[0], conv.groups)
+    new.weight.data = weight.clone()
+    if bias is not None:
+        new.bias.data = bias.clone()
+    return new
+
+
+def _select_bn(bn: "nn.BatchNorm2d", idx) -> "nn.BatchNorm2d":
+    new = nn.BatchNorm2d(len(idx), eps=bn.eps, momentum=bn.momentum, affine=bn.affine,
+                         track_running_stats=bn.track_running_stats)
+    if bn.affine:
+        new.weight.data = bn.weight.data[idx].clone()
+        new.bias.data = bn.bias.data[idx].clone()
+    if bn.track_running_stats:
+        new.running_mean = bn.running_mean[idx].clone()
+        new.running_var = bn.running_var[idx].clone()
+        new.num_batches_tracked = bn.num_batches_tracked.clone()
+    return new
+
+
+def _keep_count(channels: int, amount: float, divisor: int) -> int:
+    keep = channels * (1.0 - amount)
+    keep = int(round(keep / divisor)) * divisor if channels > divisor else int(round(keep))
+    return min(channels, max(keep, min(divisor, channels), 1))
+
+
+def _ranked(conv: "nn.Conv2d", bn: "nn.BatchNorm2d", keep: int):
+    """Indices of the ``keep`` most important output channels, in their original order."""
+    score = conv.weight.data.abs().flatten(1).sum(dim=1)
+    if bn is not None and bn.affine:
+        score = score * bn.weight.data.abs()
+    return torch.sort(torch.topk(score, keep).indices).values
+
+
+def _prune_bottleneck(block: Any, amount: float, divisor: int) -> None:
+    """ResNet BasicBlock/Bottleneck: shrink conv1 (and conv2 for Bottleneck) outputs."""
+    pairs = [("conv1", "bn1", "conv2")]
+    if hasattr(block, "conv3"):
+        pairs.append(("conv2", "bn2", "conv3"))
+    for conv_name, bn_name, next_name in pairs:
+        conv, bn, nxt = getattr(block, conv_name), getattr(block, bn_name), getattr(block, next_name)
+        keep = _keep_count(conv.out_channels, amount, divisor)
+        if keep >= conv.out_channels:
+            continue
+        idx = _ranked(conv, bn, keep)
+        setattr(block, conv_name, _select_conv(conv, out_idx=idx))
+        setattr(block, bn_name, _select_bn(bn, idx))
+        setattr(block, next_name, _select_conv(nxt, in_idx=idx))
+
+
+def _prune_inverted_residual(block: Any, amount: float, divisor: int) -> None:
+    """MobileNetV3 InvertedResidual / EfficientNet MBConv: shrink the expanded channels."""
+    layers = block.block
+    if len(layers) < 3:
+        return
+    expand, depthwise = layers[0], layers[1]
+    if not (isinstance(expand, nn.Sequential) and isinstance(depthwise, nn.Sequential)):
+        return
+    if not (isinstance(expand[0], nn.Conv2d) and isinstance(depthwise[0], nn.Conv2d)):
+        return
+    if expand[0].kernel_size != (1, 1) or depthwise[0].groups != depthwise[0].in_channels:
+        return  # no expansion layer; hidden width equals the block input
+    channels = expand[0].out_channels
+    keep = _keep_count(channels, amount, divisor)
+    if keep >= channels:
+        return
+    idx = _ranked(expand[0], expand[1], keep)
+    expand[0] = _select_conv(expand[0], out_idx=idx)
+    expand[1] = _select_bn(expand[1], idx)
+    depthwise[0] = _select_conv(depthwise[0], out_idx=idx)
+    depthwise[1] = _select_bn(depthwise[1], idx)
+    for layer in list(layers)[2:]:
+        if hasattr(layer, "fc1") and hasattr(layer, "fc2"):  # squeeze-and-excitation
+            layer.fc1 = _select_conv(layer.fc1, in_idx=idx)
+            layer.fc2 = _select_conv(layer.fc2, out_idx=idx)
+        else:  # projection back to the block output width
+            layer[0] = _select_conv(layer[0], in_idx=idx)
+            break
+
+
+def prune_channels(model: Any, amount: float, divisor: int = 8) -> Any:
+    """
+    Remove ``amount`` of the hidden channels of every residual block.
+
+    Channels are ranked by the L1 norm of their filters scaled by the BatchNorm
+    gain. Kept widths are rounded to a multiple of ``divisor`` so the smaller
+    layers stay friendly to vectorised CPU kernels.
+
+    Args:
+        model: torchvision ResNet, MobileNetV3 or EfficientNet
+        amount: Fraction of hidden channels to remove, in [0, 1)
+        divisor: Channel rounding multiple
+
+    Returns:
+        A pruned copy of ``model``
+    """
+    _require_torch()
+    if not 0.0 <= amount < 1.0:
+        raise ValueError(f"Pruning amount must be in [0, 1), got {amount}")
+    training = model.training
+    model = copy.deepcopy(model).cpu().float()
+    pruned = 0
+    for module in model.modules():
+        if hasattr(module, "conv1") and hasattr(module, "bn1") and hasattr(module, "conv2"):
+            _prune_bottleneck(module, amount, divisor)
+            pruned += 1
+        elif isinstance(getattr(module, "block", None), nn.Sequential):
+            _prune_inverted_residual(module, amount, divisor)
+            pruned += 1
+    if pruned == 0:
+        raise ValueError(f"No prunable blocks found in {type(model).__name__}")
+    return model.train(training)  # new layers are created in train mode
+
+
+def prune_to_budget(model: Any, budget_ms: float, input_size: Tuple[int, int] = (224, 224), step: float = 0.1,
+                    max_amount: float = 0.8, divisor: int = 8):
+    """
+    Prune in increasing steps until the measured CPU latency per crop fits ``budget_ms``.
+
+    Returns:
+        ``(pruned_model, amount)``; ``amount`` is 0 if the model already fits and
+        ``max_amount`` if the budget cannot be met.
+    """
+    if measure_latency(model, input_size) <= budget_ms:
+        return copy.deepcopy(model), 0.0
+    amount = step
+    while True:
+        pruned = prune_channels(model, amount, divisor)
+        if measure_latency(pruned, input_size) <= budget_ms or amount + step > max_amount + 1e-9:
+            return pruned, amount
+        amount = round(amount + step, 6)
+
+
+def fine_tune(model: Any, loader: Any, epochs: int = 1, lr: float = 1e-4, device: str = "cpu") -> Any:
+    """Plain cross-entropy fine-tuning over ``(images, labels)`` batches to recover pruning loss."""
+    _require_torch()
+    model = model.to(device).train()
+    optimizer = torch.optim.AdamW(model.parameters(), lr=lr)
+    loss_fn = nn.CrossEntropyLoss()
+    for epoch in range(epochs):
+        total, batches = 0.0, 0
+        for images, labels in loader:
+            optimizer.zero_grad()
+            loss = loss_fn(model(images.to(device)), labels.to(device))
+            loss.backward()
+            optimizer.step()
+            total += loss.item()
+            batches += 1
+        print(f"[optim] fine-tune epoch {epoch + 1}/{epochs} loss={total / max(batches, 1):.4f}")
+    return model.eval()
+
+
+def conform_to_state_dict(model: Any, state: Dict[str, Any]) -> Any:
+    """
+    Resize Conv2d/BatchNorm2d/Linear layers of ``model`` in place to the shapes in ``state``.
+
+    This lets a freshly built torchvision model receive weights saved from a
+    pruned copy. Layers whose shapes already match are left alone.
+    """
+    _require_torch()
+    for name, module in list(model.named_modules()):
+        weight = state.get(f"{name}.weight" if name else "weight")
+        if weight is None or not hasattr(module, "weight") or module.weight is None:
+            continue
+        if tuple(weight.shape) == tuple(module.weight.shape):
+            continue
+        if isinstance(module, nn.Conv2d):
+            depthwise = module.groups > 1 and module.groups == module.in_channels == module.out_channels
+            out_ch = weight.shape[0]
+            groups = out_ch if depthwise else module.groups
+            new = _conv_like(module, weight.shape[1] * groups, out_ch, groups)
+        elif isinstance(module, nn.BatchNorm2d):
+            new = nn.BatchNorm2d(weight.shape[0], eps=module.eps, momentum=module.momentum,
+                                 affine=module.affine, track_running_stats=module.track_running_stats)
+        elif isinstance(module, nn.Linear):
+            new = nn.Linear(weight.shape[1], weight.shape[0], bias=module.bias is not None)
+        else:
+            continue
+        parent_name, _, child = name.rpartition(".")
+        parent = model.get_submodule(parent_name) if parent_name else model
+        setattr(parent, child, new)
+    return model
+
+
+def prune_classifier(cfg: ClassifierConfig, output: str, amount: Optional[float] = None, budget_ms: Optional[float] = None,
+                     finetune: Optional[Callable[[Any], Any]] = None) -> PruningReport:
+    """
+    Prune the configured classifier to a sparsity ratio or a latency budget and save its state dict.
+
+    Args:
+        cfg: Float classifier config (``model_path`` may hold fine-tuned weights)
+        output: Destination of the pruned state dict
+        amount: Fraction of hidden channels to remove
+        budget_ms: CPU latency budget per crop; used when ``amount`` is None
+        finetune: Optional hook ``model -> model`` run after pruning, e.g. a ``fine_tune`` closure
+
+    Returns:
+        A ``PruningReport``
+    """
+    from ..pipeline import build_classifier
+
+    if amount is None and budget_ms is None:
+        raise ValueError("Give either a pruning amount or a latency budget")
+    float_cfg = copy.copy(cfg)
+    float_cfg.device, float_cfg.half_precision, float_cfg.quantized = "cpu", False, False
+    classifier = build_classifier(AppConfig(classifier=float_cfg))
+    model = getattr(classifier, "model", None)
+    if model is None:
+        raise RuntimeError(f"Classifier '{cfg.name}' has no torch model to prune")
+    input_size = classifier.input_size
+
+    ms_before = measure_latency(model, input_size)
+    if amount is not None:
+        pruned = prune_channels(model, amount)
+    else:
+        pruned, amount = prune_to_budget(model, budget_ms, input_size)
+    if finetune is not None:
+        pruned = finetune(pruned)
+    pruned = pruned.eval().cpu()
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    torch.save(pruned.state_dict(), output)
+    return PruningReport(amount, count_params(model), count_params(pruned), ms_before, measure_latency(pruned, input_size))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Structured channel pruning of a classifier")
+    parser.add_argument("--name", required=True, help="Classifier name as used in the config (e.g. resnet50)")
+    parser.add_argument("--weights", default=None, help="Optional fine-tuned weights (model_path)")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--amount", type=float, help="Fraction of hidden channels to remove")
+    target.add_argument("--budget-ms", type=float, help="CPU latency budget per crop on this machine")
+    parser.add_argument("--finetune-dir", default=None, help="Labelled crop folder (<class>/*.jpg) for fine-tuning")
+    parser.add_argument("--epochs", type=int, default=1)
+    parser.add_argument("--output", required=True, help="Destination of the pruned state dict")
+    args = parser.parse_args()
+
+    cfg = ClassifierConfig(name=args.name, model_path=args.weights, device="cpu")
+    hook = None
+    if args.finetune_dir:
+        from ..pipeline import build_classifier
+        from .datasets import crop_loader
+
+        prepare = build_classifier(AppConfig(classifier=cfg)).prepare
+        loader = crop_loader(args.finetune_dir, prepare, shuffle=True)
+        hook = lambda model: fine_tune(model, loader, epochs=args.epochs)  # noqa: E731
+    report = prune_classifier(cfg, args.output, amount=args.amount, budget_ms=args.budget_ms, finetune=hook)
+    print(f"[optim] Saved pruned weights to {args.output}")
+    print(f"[optim] {report.summary()}")
+
+
+if __name__ == "__main__":
+    main()
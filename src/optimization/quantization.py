@@ -0,0 +1,215 @@
+"""Post-training static INT8 quantization for the torchvision classifiers.
+
+Usage:
+    python -m src.optimization.quantization --name mobilenet_v3_large --weights models/cls.pt \
+        --calib data/crops --output models/cls_int8.pt
+
+The output is a quantized state dict. Load it back through ``build_classifier``
+with ``classifier.quantized: true`` and ``classifier.model_path`` pointing at it.
+"""
+
+import argparse
+import copy
+import os
+import time
+import warnings
+from dataclasses import asdict, dataclass
+from typing import Any, Iterable, Optional, Tuple
+
+try:
+    import torch
+    from torch.ao.quantization import get_default_qconfig_mapping
+    from torch.ao.quantization.quantize_fx import convert_fx, prepare_fx
+except ImportError:  # pragma: no cover - optional
+    torch = None
+
+from ..config import AppConfig, ClassifierConfig
+from .datasets import crop_loader
+
+
+@dataclass
+class QuantizationReport:
+    backend: str
+    calibration_images: int
+    eval_images: int
+    top1_agreement: float
+    fp32_ms_per_crop: float
+    int8_ms_per_crop: float
+    speedup: float
+    fp32_size_mb: float
+    int8_size_mb: float
+
+    def summary(self) -> str:
+        return (
+            f"top-1 agreement {self.top1_agreement:.2%} over {self.eval_images} crops | "
+            f"CPU latency {self.fp32_ms_per_crop:.2f} -> {self.int8_ms_per_crop:.2f} ms/crop ({self.speedup:.2f}x) | "
+            f"size {self.fp32_size_mb:.1f} -> {self.int8_size_mb:.1f} MB"
+        )
+
+
+def _require_torch() -> None:
+    if torch is None:
+        raise RuntimeError("Quantization requires torch")
+
+
+def _prepare(model: Any, backend: str, input_size: Tuple[int, int]):
+    _require_torch()
+    torch.backends.quantized.engine = backend
+    example = (torch.zeros(1, 3, *input_size),)
+    model = copy.deepcopy(model).float().cpu().eval()
+    return prepare_fx(model, get_default_qconfig_mapping(backend), example)
+
+
+def prepare_quantized_model(model: Any, backend: str = "x86", input_size: Tuple[int, int] = (224, 224)):
+    """
+    Build the INT8 graph for ``model`` without calibrating it.
+
+    The result has the same modules and buffers as the output of
+    ``quantize_static``, so a state dict saved from a calibrated model loads
+    into it (scales and zero points are part of the state dict).
+    """
+    with warnings.catch_warnings():
+        # Observers are intentionally empty here; the real qparams come from the state dict.
+        warnings.filterwarnings("ignore", message="must run observer")
+        return convert_fx(_prepare(model, backend, input_size))
+
+
+def quantize_static(model: Any, batches: Iterable, backend: str = "x86", input_size: Tuple[int, int] = (224, 224),
+                    max_batches: Optional[int] = None):
+    """
+    Post-training static quantization with FX graph mode.
+
+    Args:
+        model: Float ``torch.nn.Module``
+        batches: Iterable of image tensors (N, 3, H, W) or ``(images, labels)`` pairs used for calibration
+        backend: Quantized engine, ``x86``/``fbgemm`` for servers and ``qnnpack`` for ARM
+        input_size: (H, W) of the network input
+        max_batches: Optional cap on calibration batches
+
+    Returns:
+        The converted INT8 model (CPU only)
+    """
+    prepared = _prepare(model, backend, input_size)
+    with torch.no_grad():
+        for i, batch in enumerate(batches):
+            if max_batches is not None and i >= max_batches:
+                break
+            images = batch[0] if isinstance(batch, (list, tuple)) else batch
+            prepared(images.float().cpu())
+    return convert_fx(prepared)
+
+
+def _state_size_mb(model: Any) -> float:
+    total = 0
+    for value in model.state_dict().values():
+        if hasattr(value, "element_size"):
+            total += value.numel() * value.element_size()
+    return total / 1e6
+
+
+def _time_per_crop(model: Any, images: "torch.Tensor", repeats: int = 3) -> float:
+    with torch.no_grad():
+        model(images[:1])  # warm-up
+        best = float("inf")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            model(images)
+            best = min(best, time.perf_counter() - start)
+    return best * 1000.0 / len(images)
+
+
+def compare_models(fp32: Any, int8: Any, batches: Iterable, backend: str = "x86", calibration_images: int = 0) -> QuantizationReport:
+    """Top-1 agreement and per-crop CPU latency of ``int8`` against ``fp32`` on ``batches``."""
+    _require_torch()
+    fp32 = fp32.float().cpu().eval()
+    agree = total = 0
+    fp32_ms = int8_ms = 0.0
+    with torch.no_grad():
+        for batch in batches:
+            images = (batch[0] if isinstance(batch, (list, tuple)) else batch).float().cpu()
+            ref = fp32(images).argmax(dim=1)
+            out = int8(images).argmax(dim=1)
+            agree += int((ref == out).sum())
+            fp32_ms += _time_per_crop(fp32, images) * len(images)
+            int8_ms += _time_per_crop(int8, images) * len(images)
+            total += len(images)
+    if total == 0:
+        raise ValueError("No evaluation crops")
+    fp32_ms /= total
+    int8_ms /= total
+    return QuantizationReport(
+        backend=backend,
+        calibration_images=calibration_images,
+        eval_images=total,
+        top1_agreement=agree / total,
+        fp32_ms_per_crop=fp32_ms,
+        int8_ms_per_crop=int8_ms,
+        speedup=fp32_ms / int8_ms if int8_ms > 0 else 0.0,
+        fp32_size_mb=_state_size_mb(fp32),
+        int8_size_mb=_state_size_mb(int8),
+    )
+
+
+def quantize_classifier(cfg: ClassifierConfig, calib_dir: str, output: str, backend: str = "x86",
+                        eval_dir: Optional[str] = None, max_images: int = 512, batch_size: int = 32) -> QuantizationReport:
+    """
+    Calibrate the configured classifier on a folder of sign crops and save the INT8 weights.
+
+    Args:
+        cfg: Float classifier config (``model_path`` may hold fine-tuned FP32 weights)
+        calib_dir: Folder of crops (flat or ``<class>/`` subfolders) used for calibration
+        output: Destination of the quantized state dict
+        backend: Quantized engine
+        eval_dir: Crops for the report; defaults to ``calib_dir``
+        max_images: Cap on calibration and evaluation crops
+        batch_size: Crops per forward pass
+
+    Returns:
+        A ``QuantizationReport`` comparing the INT8 model with the FP32 one
+    """
+    from ..pipeline import build_classifier
+
+    _require_torch()
+    float_cfg = copy.copy(cfg)
+    float_cfg.device, float_cfg.half_precision, float_cfg.quantized = "cpu", False, False
+    classifier = build_classifier(AppConfig(classifier=float_cfg))
+    if getattr(classifier, "model", None) is None:
+        raise RuntimeError(f"Classifier '{cfg.name}' has no torch model to quantize")
+
+    calib = crop_loader(calib_dir, classifier.prepare, batch_size=batch_size, limit=max_images)
+    int8 = quantize_static(classifier.model, calib, backend=backend, input_size=classifier.input_size)
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    torch.save(int8.state_dict(), output)
+
+    evaluation = crop_loader(eval_dir or calib_dir, classifier.prepare, batch_size=batch_size, limit=max_images)
+    return compare_models(classifier.model, int8, evaluation, backend=backend, calibration_images=len(calib.dataset))
+
+
+def quantize_onnx(path: str, output: str) -> str:
+    """Dynamic INT8 weight quantization of an exported ONNX model with onnxruntime."""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(path, output, weight_type=QuantType.QInt8)
+    return output
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Post-training INT8 quantization of a classifier")
+    parser.add_argument("--name", required=True, help="Classifier name as used in the config (e.g. resnet50)")
+    parser.add_argument("--weights", default=None, help="Optional fine-tuned FP32 weights (model_path)")
+    parser.add_argument("--calib", required=True, help="Folder of sign crops for calibration")
+    parser.add_argument("--eval", default=None, help="Folder of crops for the report (default: --calib)")
+    parser.add_argument("--output", required=True, help="Destination of the quantized state dict")
+    parser.add_argument("--backend", default="x86", choices=["x86", "fbgemm", "qnnpack"])
+    parser.add_argument("--max-images", type=int, default=512)
+    args = parser.parse_args()
+
+    cfg = ClassifierConfig(name=args.name, model_path=args.weights, device="cpu")
+    report = quantize_classifier(cfg, args.calib, args.output, backend=args.backend, eval_dir=args.eval, max_images=args.max_images)
+    print(f"[optim] Saved INT8 weights to {args.output}")
+    print(f"[optim] {report.summary()}")
+    print(asdict(report))
+
+
+if __name__ == "__main__":
+    main()
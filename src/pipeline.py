@@ -1,25 +1,39 @@
 import time
-from typing import Generator, Iterable, Optional
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Generator, Iterable, List, Optional, Set, Tuple
 
 from .config import AppConfig
+from .detectors.base import Detector
 from .detectors.yolo_detector import YoloDetector
 from .detectors.efficientdet_detector import EfficientDetDetector
 from .detectors.ssd_mobilenet_detector import SSDMobileNetDetector
+from .detectors.onnx_detector import OnnxDetector
+from .detectors.tiling import detect_tiled, merge_detections
+from .classifiers.base import Classifier, crop_detection, crop_with_padding
 from .classifiers.resnet_classifier import ResNetClassifier
 from .classifiers.efficientnet_classifier import EfficientNetClassifier
 from .classifiers.mobilenetv3_classifier import MobileNetV3Classifier
 from .classifiers.vit_classifier import ViTClassifier
+from .classifiers.onnx_classifier import OnnxClassifier
+from .classifiers.track_cache import TrackClassificationCache
 from .llm.explainer import LLMExplainer
+from .llm.async_worker import AsyncExplainer
+from .llm.cache import ExplanationCache
 from .utils.metrics import ThroughputMeter
 from .utils.types import ClassificationResult, Detection, FrameResult
 from .utils.safety import SafetyGuard
-from .utils.preprocess import preprocess_frame
+from .utils.preprocess import FrameTransform, Preprocessor
 from .utils.tracker import SimpleTracker
+from .utils.scheduler import KeyframeScheduler, track_regions
 from .utils.controls import ControlState
+from .utils.staging import StagedExecutor
+from .utils.batching import BatchedClassifier, BatchedDetector
 
 
 def build_detector(cfg: AppConfig):
     name = cfg.detector.name.lower()
+    if name == "onnx" or name.endswith(".onnx"):
+        return OnnxDetector(cfg.detector)
     if name.startswith("yolo"):
         return YoloDetector(cfg.detector)
     if name.startswith("efficientdet"):
@@ -29,6 +43,8 @@ def build_detector(cfg: AppConfig):
 
 def build_classifier(cfg: AppConfig):
     name = cfg.classifier.name.lower()
+    if name == "onnx" or name.endswith(".onnx"):
+        return OnnxClassifier(cfg.classifier)
     if name.startswith("resnet"):
         return ResNetClassifier(cfg.classifier)
     if "efficientnet" in name:
@@ -60,75 +76,346 @@ def _safety_tier(conf: float, cfg: AppConfig) -> str:
     return "ignore"
 
 
-def process_stream(frames: Iterable[tuple[int, any]], cfg: AppConfig, controls: Optional[ControlState] = None) -> Generator[FrameResult, None, None]:
-    detector = build_detector(cfg)
-    classifier = build_classifier(cfg)
-    llm = LLMExplainer(cfg.llm)
-    safety = SafetyGuard(cfg.safety)
-    tracker = SimpleTracker(cfg.tracking.iou_threshold, cfg.tracking.max_age, cfg.tracking.min_stable)
-    meter = ThroughputMeter()
-    llm_cache = {}
+@dataclass
+class PipelineModels:
+    """Heavy model instances (and the label-keyed explanation cache) that can be shared by several streams."""
+    detector: Detector
+    classifier: Classifier
+    llm: LLMExplainer
+    llm_cache: ExplanationCache
+
+
+def build_llm_cache(cfg: AppConfig) -> ExplanationCache:
+    return ExplanationCache(
+        max_entries=cfg.llm.cache_size,
+        ttl_s=cfg.llm.cache_ttl_s,
+        confidence_bucket=cfg.llm.confidence_bucket,
+        path=cfg.llm.cache_path,
+    )
+
+
+def build_models(cfg: AppConfig) -> PipelineModels:
+    detector, classifier = build_detector(cfg), build_classifier(cfg)
+    batching = cfg.batching
+    if batching.enabled:
+        # Streams running on their own threads then share forward passes instead of taking turns.
+        detector = BatchedDetector(detector, batching.max_batch_frames, batching.max_wait_ms, batching.slo_ms)
+        classifier = BatchedClassifier(classifier, batching.max_batch_crops, batching.max_wait_ms, batching.slo_ms)
+    return PipelineModels(
+        detector=detector,
+        classifier=classifier,
+        llm=LLMExplainer(cfg.llm),
+        llm_cache=build_llm_cache(cfg),
+    )
 
-    for frame_id, frame in frames:
-        if controls and controls.request_quit:
-            break
-        if cfg.runtime.max_frames and frame_id >= cfg.runtime.max_frames:
-            break
-        if controls and controls.paused:
-            time.sleep(0.05)
-            continue
 
-        stage_latency = {}
-        loop_start = time.perf_counter()
+@dataclass
+class _FrameWork:
+    """Per-frame state handed from one pipeline stage to the next."""
+    frame_id: int
+    frame: Any
+    started: float
+    captured: Optional[float] = None  # perf_counter() when the source finished decoding the frame
+    dropped: int = 0  # frames the source had dropped before this one
+    stage_latency: Dict[str, float] = field(default_factory=dict)
+    processed: Any = None
+    transform: Optional[FrameTransform] = None  # source frame -> processed frame geometry
+    preprocess_ops: Dict[str, float] = field(default_factory=dict)
+    skip_detection: bool = False
+    keyframe: Optional[bool] = None  # full-frame detection (False: only regions around predicted tracks)
+    detections: List[Detection] = field(default_factory=list)
+    # Tracker state as of this frame, so later stages (other threads when pipelined) never read the live tracker
+    stable: List[bool] = field(default_factory=list)  # per detection
+    live_tracks: Set[int] = field(default_factory=set)
+    cls_results: List[Optional[ClassificationResult]] = field(default_factory=list)  # classifier output (or cached)
+    crop_index: List[int] = field(default_factory=list)  # detections that still need the classifier
+    crops: List[Any] = field(default_factory=list)
+    classifications: List[Optional[ClassificationResult]] = field(default_factory=list)
 
+
+class _StreamPipeline:
+    """Per-stream state (tracker, safety, throughput) and the stage functions that use it."""
+
+    def __init__(self, cfg: AppConfig, models: PipelineModels, controls: Optional[ControlState] = None) -> None:
+        self.cfg = cfg
+        self.models = models
+        self.controls = controls
+        self.safety = SafetyGuard(cfg.safety)
+        self.tracker = SimpleTracker(cfg.tracking.iou_threshold, cfg.tracking.max_age, cfg.tracking.min_stable)
+        self.meter = ThroughputMeter()
+        # Preprocessed frames are reused buffers; keep enough of them for every frame in flight.
+        slots = 1
+        if cfg.runtime.pipelined:
+            slots = len(self.stages()) * (cfg.runtime.stage_queue + 1) + 1
+        self.preprocessor = Preprocessor(cfg.preprocess, output_slots=slots)
+        # Crops that skip the full-frame enhancement (ROI-only or cut from the raw source frame) are
+        # enhanced on their own. Separate instance: it runs on the classify thread.
+        self.crop_enhancer = None
+        if cfg.preprocess.roi_only or cfg.preprocess.native_crops:
+            self.crop_enhancer = Preprocessor(cfg.preprocess)
+        self.detect_skips = 0
+        self.scheduler = KeyframeScheduler(cfg.scheduling) if cfg.scheduling.enabled else None
+        self.cls_cache = None
+        if cfg.classifier.reuse_stable_tracks:
+            self.cls_cache = TrackClassificationCache(
+                interval=cfg.classifier.reclassify_interval,
+                min_confidence=cfg.classifier.reclassify_min_conf,
+                confidence_drop=cfg.classifier.reclassify_conf_drop,
+                scale_change=cfg.classifier.reclassify_scale_change,
+            )
+        self.llm_worker = None
+        self._live_tracks: Set[int] = set()  # as of the last finalized frame
+        if cfg.llm.async_explain:
+            self.llm_worker = AsyncExplainer(models.llm, max_pending=cfg.llm.request_queue, on_result=models.llm_cache.put)
+
+    def _manual_override(self) -> bool:
+        return bool(self.controls and self.controls.manual_override)
+
+    def preprocess(self, work: _FrameWork) -> _FrameWork:
         t0 = time.perf_counter()
-        processed = preprocess_frame(frame, cfg.preprocess)
-        stage_latency["preprocess_ms"] = (time.perf_counter() - t0) * 1000
+        pre = self.preprocessor.run(work.frame)
+        work.processed = pre.image
+        work.transform = pre.transform
+        work.preprocess_ops = pre.timings
+        work.skip_detection = pre.skipped
+        work.stage_latency["preprocess_ms"] = (time.perf_counter() - t0) * 1000
+        return work
+
+    def plan_detection(self, work: _FrameWork) -> bool:
+        """Decide how ``work`` is detected; True when it needs a plain full-frame pass that callers may batch."""
+        if work.skip_detection:
+            return False
+        if work.keyframe is None:
+            work.keyframe = self.scheduler is None or self.scheduler.is_keyframe(work.frame_id, work.frame)
+        return work.keyframe and not self.cfg.detector.tiled
 
-        t1 = time.perf_counter()
-        detections = detector.detect(processed)
-        detections = [d for d in detections if d.confidence >= cfg.detector.conf_threshold]
-        detections = tracker.update(detections)
-        stage_latency["detect_ms"] = (time.perf_counter() - t1) * 1000
+    def detect(self, work: _FrameWork, raw: Optional[List[Detection]] = None, raw_ms: float = 0.0) -> _FrameWork:
+        """
+        Detect and track. ``raw`` is this frame's full-frame detector output when it
+        was computed elsewhere (e.g. in a batch across cameras), ``raw_ms`` its share
+        of that time.
+        """
+        t1 = time.perf_counter() - raw_ms / 1000
+        if work.skip_detection:
+            # No sign-colored pixels anywhere: nothing for the detector to find.
+            detections = []
+            self.detect_skips += 1
+        else:
+            self.plan_detection(work)
+            detections = self._detect_frame(work, raw) if work.keyframe else self._detect_tracks(work)
+            if self.scheduler is not None:
+                self.scheduler.record(work.keyframe, (time.perf_counter() - t1) * 1000)
+        work.detections = self.tracker.update(detections, frame_id=work.frame_id)
+        work.stable = [self.tracker.is_stable(det.track_id) for det in work.detections]
+        store = self.tracker.store
+        work.live_tracks = {int(tid) for tid in store.ids[store.active_rows()]}
+        work.stage_latency["detect_ms"] = (time.perf_counter() - t1) * 1000
+        return work
 
-        primary_det = detections[0] if detections else None
+    def _detect_frame(self, work: _FrameWork, raw: Optional[List[Detection]] = None) -> List[Detection]:
+        if self.cfg.detector.tiled:
+            # Tiles are cut from the full-resolution source frame, so boxes are already in source coordinates.
+            return detect_tiled(self.models.detector, work.frame, self.cfg.detector)
+        detections = raw if raw is not None else self.models.detector.detect(work.processed)
+        return [
+            Detection(d.label, d.confidence, work.transform.to_source(d.bbox), d.track_id)
+            for d in detections if d.confidence >= self.cfg.detector.conf_threshold
+        ]
 
+    def _detect_tracks(self, work: _FrameWork) -> List[Detection]:
+        """Detect only around where the tracker expects its tracks, on full-resolution crops in one batch."""
+        predicted = self.tracker.predict_boxes(work.frame_id)
+        h, w = work.frame.shape[:2]
+        regions = track_regions(predicted.values(), (w, h), self.cfg.scheduling.roi_expand, self.cfg.scheduling.roi_min_size)
+        if not regions:
+            return []
+        per_region = self.models.detector.detect_batch([work.frame[y1:y2, x1:x2] for x1, y1, x2, y2 in regions])
+        per_region = [[d for d in dets if d.confidence >= self.cfg.detector.conf_threshold] for dets in per_region]
+        return merge_detections(per_region, [(x1, y1) for x1, y1, _, _ in regions],
+                                self.cfg.detector.tile_merge_threshold, self.cfg.detector.max_det)
+
+    def classify(self, work: _FrameWork) -> _FrameWork:
         t2 = time.perf_counter()
-        cls_result = classifier.classify(processed, detections) if detections else None
-        stage_latency["classify_ms"] = (time.perf_counter() - t2) * 1000
+        self.prepare_crops(work)
+        fresh = self.models.classifier.classify_crops(work.crops) if work.crops else []
+        self.finish_classify(work, fresh)
+        work.stage_latency["classify_ms"] = (time.perf_counter() - t2) * 1000
+        return work
+
+    def prepare_crops(self, work: _FrameWork) -> None:
+        """Reuse cached results of stable tracks and cut crops for the detections that still need the classifier."""
+        detections = work.detections
+        work.cls_results = [None] * len(detections)
+        if self.cls_cache is None:
+            work.crop_index = list(range(len(detections)))
+        else:
+            for i, (det, stable) in enumerate(zip(detections, work.stable)):
+                work.cls_results[i] = self.cls_cache.lookup(det, work.frame_id, stable)
+            work.crop_index = [i for i, result in enumerate(work.cls_results) if result is None]
+        work.crops = self._crops(work, [detections[i] for i in work.crop_index])
+
+    def finish_classify(self, work: _FrameWork, fresh: List[ClassificationResult]) -> None:
+        """Merge classifier output for ``work.crops`` back in and fuse it with the detections."""
+        for i, result in zip(work.crop_index, fresh):
+            work.cls_results[i] = result
+            if self.cls_cache is not None:
+                self.cls_cache.store(work.detections[i], result, work.frame_id)
+        if self.cls_cache is not None:
+            self.cls_cache.prune(work.live_tracks.__contains__)
+        work.crops = []
+        work.classifications = [_fuse(det, cls) for det, cls in zip(work.detections, work.cls_results)]
+
+    def _crops(self, work: _FrameWork, detections: List[Detection]) -> List[Any]:
+        if not detections:
+            return []
+        # Detections are in source coordinates; crop the full-resolution frame unless told otherwise.
+        if self.cfg.preprocess.native_crops:
+            image, boxes = work.frame, [det.bbox for det in detections]
+        else:
+            image, boxes = work.processed, [work.transform.to_target(det.bbox) for det in detections]
+        if self.crop_enhancer is None:
+            return [crop_detection(image, Detection(det.label, det.confidence, box)) for det, box in zip(detections, boxes)]
+        t0 = time.perf_counter()
+        crops = [self._enhanced_crop(image, box) for box in boxes]
+        work.stage_latency["roi_enhance_ms"] = (time.perf_counter() - t0) * 1000
+        return crops
 
-        fused = _fuse(primary_det, cls_result)
+    def _enhanced_crop(self, image, bbox):
+        """Enhance a padded crop so the filters see context, then trim back to the box."""
+        padded, (x1, y1, x2, y2) = crop_with_padding(image, bbox, self.cfg.preprocess.roi_padding)
+        return self.crop_enhancer.enhance(padded)[y1:y2, x1:x2]
+
+    def finalize(self, work: _FrameWork) -> FrameResult:
+        primary_det = work.detections[0] if work.detections else None
+        fused = work.classifications[0] if work.classifications else None
 
         llm_text = None
         t3 = time.perf_counter()
         if fused and primary_det:
-            stable = tracker.is_stable(primary_det.track_id)
-            gate = fused.confidence >= 0.75 and stable
-            cache_key = primary_det.track_id
-            if gate and cache_key in llm_cache:
-                llm_text = llm_cache[cache_key]
-            elif gate and (not controls or not controls.manual_override):
-                llm_text = llm.explain(fused.label, fused.confidence)
-                if cache_key is not None:
-                    llm_cache[cache_key] = llm_text
-        stage_latency["llm_ms"] = (time.perf_counter() - t3) * 1000
-
-        fps = meter.tick()
-        latency_ms = (time.perf_counter() - loop_start) * 1000
-
-        safety_state = safety.evaluate(fps, primary_det, fused, manual_override=bool(controls and controls.manual_override))
-        tier = _safety_tier(fused.confidence if fused else 0.0, cfg)
-
-        result = FrameResult(
-            detections=detections,
+            gate = fused.confidence >= 0.75 and work.stable[0]
+            if gate:
+                llm_text = self.models.llm_cache.get(fused.label, fused.confidence)
+                if llm_text is None and not self._manual_override():
+                    llm_text = self._explain(primary_det.track_id, fused)
+        if self.llm_worker is not None:
+            # Expired tracks must not keep spending LLM calls on explanations nobody will show.
+            for track_id in self._live_tracks - work.live_tracks:
+                self.llm_worker.forget(track_id)
+            self._live_tracks = work.live_tracks
+        work.stage_latency["llm_ms"] = (time.perf_counter() - t3) * 1000
+
+        fps = self.meter.tick()
+        now = time.perf_counter()
+        latency_ms = (now - work.started) * 1000
+        frame_age_ms = (now - (work.captured if work.captured is not None else work.started)) * 1000
+
+        safety_state = self.safety.evaluate(fps, primary_det, fused, manual_override=self._manual_override())
+        tier = _safety_tier(fused.confidence if fused else 0.0, self.cfg)
+
+        return FrameResult(
+            detections=work.detections,
             classification=fused,
             llm_explanation=llm_text,
-            frame_id=frame_id,
+            frame_id=work.frame_id,
             fps=fps,
             latency_ms=latency_ms,
+            frame_age_ms=frame_age_ms,
+            dropped_frames=work.dropped,
             degraded=safety_state.degraded,
             safety_tier=tier,
-            manual_override=bool(controls and controls.manual_override),
-            stage_latency=stage_latency,
+            manual_override=self._manual_override(),
+            stage_latency=work.stage_latency,
+            classifications=work.classifications,
+            stats=self._stats(work),
         )
-        yield result
+
+    def _stats(self, work: _FrameWork) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {
+            "llm_cache": self.models.llm_cache.stats(),
+            "preprocess_ops": work.preprocess_ops,
+            "detect_skips": self.detect_skips,
+        }
+        if self.cls_cache is not None:
+            stats["cls_cache"] = self.cls_cache.stats()
+        if isinstance(self.models.detector, BatchedDetector):
+            stats["detect_batching"] = self.models.detector.batcher.stats()
+        if isinstance(self.models.classifier, BatchedClassifier):
+            stats["classify_batching"] = self.models.classifier.batcher.stats()
+        if self.scheduler is not None:
+            stats["scheduler"] = dict(self.scheduler.stats(), keyframe=bool(work.keyframe))
+        return stats
+
+    def _explain(self, track_id: Optional[int], fused: ClassificationResult) -> Optional[str]:
+        if self.llm_worker is None or track_id is None:
+            text = self.models.llm.explain(fused.label, fused.confidence)
+            if text is not None:
+                self.models.llm_cache.put(fused.label, fused.confidence, text)
+            return text
+        # Never wait on generation: use a finished explanation if there is one, else request it.
+        text = self.llm_worker.latest(track_id, fused.label)
+        if text is None:
+            self.llm_worker.submit(track_id, fused.label, fused.confidence)
+        return text
+
+    def start(self) -> None:
+        if self.llm_worker:
+            self.llm_worker.start()
+
+    def close(self) -> None:
+        if self.llm_worker:
+            self.llm_worker.stop()
+
+    def stages(self) -> List[Tuple[str, Callable]]:
+        return [
+            ("preprocess", self.preprocess),
+            ("detect", self.detect),
+            ("classify", self.classify),
+            ("finalize", self.finalize),
+        ]
+
+
+def _admit_frames(frames: Iterable[tuple[int, Any]], cfg: AppConfig, controls: Optional[ControlState]) -> Generator[_FrameWork, None, None]:
+    """
+    Apply quit/pause/max-frame controls and wrap admitted frames for the stages.
+    Items that carry ``captured_at``/``dropped`` (``CapturedFrame``) report frame age and drops.
+    """
+    for item in frames:
+        frame_id, frame = item
+        if controls and controls.request_quit:
+            break
+        if cfg.runtime.max_frames and frame_id >= cfg.runtime.max_frames:
+            break
+        if controls and controls.paused:
+            time.sleep(0.05)
+            continue
+        yield _FrameWork(frame_id=frame_id, frame=frame, started=time.perf_counter(),
+                         captured=getattr(item, "captured_at", None), dropped=getattr(item, "dropped", 0))
+
+
+def process_stream(frames: Iterable[tuple[int, any]], cfg: AppConfig, controls: Optional[ControlState] = None,
+                   models: Optional[PipelineModels] = None) -> Generator[FrameResult, None, None]:
+    """
+    Run the pipeline over ``frames``. Pass ``models`` to share one set of models
+    between streams on several threads (see ``cfg.batching`` for batching their calls).
+    """
+    owns_models = models is None
+    if owns_models:
+        models = build_models(cfg)
+    pipeline = _StreamPipeline(cfg, models, controls)
+    admitted = _admit_frames(frames, cfg, controls)
+    pipeline.start()
+    try:
+        if cfg.runtime.pipelined:
+            # Each stage runs on its own thread; queue depths show where frames back up.
+            executor = StagedExecutor(pipeline.stages(), queue_size=cfg.runtime.stage_queue)
+            for result in executor.run(admitted):
+                result.stats["queue_depth"] = executor.queue_depths()
+                yield result
+            return
+
+        for work in admitted:
+            yield pipeline.finalize(pipeline.classify(pipeline.detect(pipeline.preprocess(work))))
+    finally:
+        pipeline.close()
+        if owns_models:
+            models.llm_cache.close()
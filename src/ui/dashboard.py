@@ -43,13 +43,27 @@ class Dashboard:
         layout["body"].update(body_layout)
 
         status = Text()
-        status.append(f"Frame: {result.frame_id}  |  FPS: {result.fps:.1f}  |  Latency: {result.latency_ms:.1f} ms\n")
+        camera = f"Camera: {result.source_id}  |  " if result.source_id else ""
+        status.append(f"{camera}Frame: {result.frame_id}  |  FPS: {result.fps:.1f}  |  Latency: {result.latency_ms:.1f} ms  |  "
+                      f"Frame age: {result.frame_age_ms:.1f} ms  |  Dropped: {result.dropped_frames}\n")
         if result.stage_latency:
             det_ms = result.stage_latency.get("detect_ms", 0)
             cls_ms = result.stage_latency.get("classify_ms", 0)
             prep_ms = result.stage_latency.get("preprocess_ms", 0)
             llm_ms = result.stage_latency.get("llm_ms", 0)
             status.append(f"Prep {prep_ms:.1f} ms | Det {det_ms:.1f} ms | Cls {cls_ms:.1f} ms | LLM {llm_ms:.1f} ms\n")
+        if result.stats and result.stats.get("preprocess_ops"):
+            ops = " | ".join(f"{name} {ms:.1f}" for name, ms in result.stats["preprocess_ops"].items())
+            status.append(f"Prep ops (ms): {ops} | skipped det: {result.stats.get('detect_skips', 0)}\n")
+        if result.stats and result.stats.get("scheduler"):
+            sched = result.stats["scheduler"]
+            status.append(
+                f"Detect: {'keyframe' if sched['keyframe'] else 'track regions'} | every {sched['interval']} frames | "
+                f"full {sched['full_ms']:.1f} ms, regions {sched['roi_ms']:.1f} ms | scene changes {sched['scene_changes']}\n"
+            )
+        if result.stats and result.stats.get("queue_depth"):
+            depths = " | ".join(f"{name} {depth}" for name, depth in result.stats["queue_depth"].items())
+            status.append(f"Queues: {depths}\n")
         status.append(f"Tier: {result.safety_tier} | Degraded: {result.degraded} | Manual: {result.manual_override}\n")
         status.append(f"Classification: {(result.classification.label if result.classification else 'n/a')}\n")
         if result.degraded:
@@ -65,9 +79,12 @@ class Dashboard:
         table.add_column("Conf")
         table.add_column("Track")
         table.add_column("BBox")
-        for det in result.detections:
+        table.add_column("Class")
+        classifications = result.classifications or [None] * len(result.detections)
+        for det, cls in zip(result.detections, classifications):
             conf_style = "green" if det.confidence >= 0.6 else "yellow" if det.confidence >= 0.35 else "red"
-            table.add_row(det.label, f"{det.confidence:.2f}", str(det.track_id or "-"), str(det.bbox), style=conf_style)
+            cls_text = f"{cls.label} ({cls.confidence:.2f})" if cls else "-"
+            table.add_row(det.label, f"{det.confidence:.2f}", str(det.track_id or "-"), str(det.bbox), cls_text, style=conf_style)
         return table
 
     def run_live(self, result_stream):
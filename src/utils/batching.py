@@ -0,0 +1,190 @@
+"""Dynamic micro-batching of single inference requests from many callers."""
+
+import threading
+import time
+from concurrent.futures import Future
+from queue import Empty, Queue
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from ..classifiers.base import Classifier
+from ..detectors.base import Detector
+from .types import ClassificationResult, Detection
+from .metrics import LatencyWindow
+
+
+class _Request:
+    __slots__ = ("item", "future", "enqueued")
+
+    def __init__(self, item: Any) -> None:
+        self.item = item
+        self.future: Future = Future()
+        self.enqueued = time.perf_counter()
+
+
+class MicroBatcher:
+    """
+    Collect concurrently submitted items into batches for a function that maps a list to a list.
+
+    A worker thread takes the first waiting request, then keeps collecting
+    until ``batch_limit`` items are in or ``max_wait_ms`` has passed since that
+    request arrived. It runs ``fn`` once on the batch and resolves each
+    caller's future with its own result. An exception from ``fn`` fails every
+    request of that batch.
+
+    With ``slo_ms`` set, ``batch_limit`` adapts between 1 and ``max_batch``
+    (additive increase, multiplicative decrease). It halves when a request of
+    the last batch exceeded the SLO, counting queueing and compute time. It
+    grows by one when a full batch finished under 80% of the SLO. Under light
+    load batches stay small and fast; under heavy load they grow until compute
+    time would break the SLO.
+    """
+
+    def __init__(self, fn: Callable[[List[Any]], Sequence[Any]], max_batch: int = 8, max_wait_ms: float = 5.0,
+                 slo_ms: Optional[float] = None, name: str = "batcher", window: int = 1024) -> None:
+        """
+        Args:
+            fn: Batched function; must return one result per input, in order
+            max_batch: Largest batch passed to ``fn``
+            max_wait_ms: How long the first request of a batch waits for company
+            slo_ms: Optional end-to-end latency target per request (queueing + compute)
+            name: Worker thread name
+            window: Number of recent samples kept for the latency percentiles
+        """
+        self.fn = fn
+        self.max_batch = max(1, max_batch)
+        self.max_wait_s = max(0.0, max_wait_ms) / 1000
+        self.slo_ms = slo_ms
+        self.name = name
+        self.batch_limit = self.max_batch
+        self.batches = 0
+        self.items = 0
+        self.queue_ms = LatencyWindow(window)
+        self.compute_ms = LatencyWindow(window)
+        self.total_ms = LatencyWindow(window)
+        self._queue: Queue = Queue()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "MicroBatcher":
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._loop, daemon=True, name=self.name)
+                self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the worker; requests still queued fail with ``RuntimeError``."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+        while True:
+            try:
+                request = self._queue.get_nowait()
+            except Empty:
+                break
+            request.future.set_exception(RuntimeError(f"{self.name} stopped"))
+
+    def submit(self, item: Any) -> Future:
+        """Queue one item; the future resolves to ``fn``'s result for it. Starts the worker on first use."""
+        if self._thread is None or not self._thread.is_alive():
+            self.start()
+        request = _Request(item)
+        self._queue.put(request)
+        return request.future
+
+    def __call__(self, item: Any) -> Any:
+        return self.submit(item).result()
+
+    def map(self, items: Sequence[Any]) -> List[Any]:
+        """Submit several items at once (they may be batched with other callers') and wait for all of them."""
+        futures = [self.submit(item) for item in items]
+        return [future.result() for future in futures]
+
+    def _collect(self) -> List[_Request]:
+        try:
+            first = self._queue.get(timeout=0.05)
+        except Empty:
+            return []
+        batch = [first]
+        deadline = first.enqueued + self.max_wait_s
+        while len(batch) < self.batch_limit:
+            timeout = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get_nowait() if timeout <= 0 else self._queue.get(timeout=timeout))
+            except Empty:
+                break
+        return batch
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            batch = self._collect()
+            if not batch:
+                continue
+            start = time.perf_counter()
+            try:
+                results = list(self.fn([request.item for request in batch]))
+                if len(results) != len(batch):
+                    raise RuntimeError(f"{self.name}: batched function returned {len(results)} results for {len(batch)} inputs")
+            except BaseException as error:
+                for request in batch:
+                    request.future.set_exception(error)
+                continue
+            end = time.perf_counter()
+            compute_ms = (end - start) * 1000
+            worst = 0.0
+            for request, result in zip(batch, results):
+                queued_ms = (start - request.enqueued) * 1000
+                self.queue_ms.add(queued_ms)
+                self.compute_ms.add(compute_ms)
+                self.total_ms.add(queued_ms + compute_ms)
+                worst = max(worst, queued_ms + compute_ms)
+                request.future.set_result(result)
+            self.batches += 1
+            self.items += len(batch)
+            self._adapt(len(batch), worst)
+
+    def _adapt(self, size: int, worst_ms: float) -> None:
+        if self.slo_ms is None:
+            return
+        if worst_ms > self.slo_ms:
+            self.batch_limit = max(1, self.batch_limit // 2)
+        elif size >= self.batch_limit and worst_ms < 0.8 * self.slo_ms:
+            self.batch_limit = min(self.max_batch, self.batch_limit + 1)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch": self.items / self.batches if self.batches else 0.0,
+            "batch_limit": self.batch_limit,
+            "queue_ms": self.queue_ms.percentiles(),
+            "compute_ms": self.compute_ms.percentiles(),
+            "total_ms": self.total_ms.percentiles(),
+        }
+
+
+class BatchedDetector(Detector):
+    """A ``Detector`` whose calls from any number of threads are micro-batched into ``detect_batch``."""
+
+    def __init__(self, detector: Detector, max_batch: int = 8, max_wait_ms: float = 5.0, slo_ms: Optional[float] = None) -> None:
+        self.detector = detector
+        self.batcher = MicroBatcher(detector.detect_batch, max_batch, max_wait_ms, slo_ms, name="detect-batcher")
+
+    def detect(self, frame) -> List[Detection]:
+        return self.batcher(frame)
+
+    def detect_batch(self, frames) -> List[List[Detection]]:
+        return self.batcher.map(frames)
+
+
+class BatchedClassifier(Classifier):
+    """A ``Classifier`` whose crops from any number of threads are micro-batched into ``classify_crops``."""
+
+    def __init__(self, classifier: Classifier, max_batch: int = 32, max_wait_ms: float = 5.0, slo_ms: Optional[float] = None) -> None:
+        self.classifier = classifier
+        self.batcher = MicroBatcher(classifier.classify_crops, max_batch, max_wait_ms, slo_ms, name="classify-batcher")
+
+    def classify_crops(self, crops) -> List[ClassificationResult]:
+        return self.batcher.map(crops)
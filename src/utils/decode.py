@@ -0,0 +1,223 @@
+"""Video file decoding: capture options, frame sampling with grab()/retrieve(), and segment-parallel decoding."""
+
+import multiprocessing as mp
+import time
+from collections import deque
+from queue import Empty
+from typing import Generator, List, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+from .frame_ring import FrameRef, SharedFrameRing
+
+
+def open_capture(source: Union[str, int], hw_accel: bool = False, threads: int = 0) -> cv2.VideoCapture:
+    """
+    ``cv2.VideoCapture`` with optional hardware decoding and decoder thread count.
+    Backends that reject these open parameters get a plain capture instead.
+    """
+    index = int(source) if str(source).isdigit() else source
+    params = []
+    if hw_accel:
+        params += [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY]
+    if threads:
+        params += [cv2.CAP_PROP_N_THREADS, int(threads)]
+    if params:
+        cap = cv2.VideoCapture(index, cv2.CAP_ANY, params)
+        if cap.isOpened():
+            return cap
+        cap.release()
+    return cv2.VideoCapture(index)
+
+
+def decode_stride(source_fps: float, target_fps: float) -> int:
+    """Keep every Nth source frame so a ``source_fps`` file plays at roughly ``target_fps``."""
+    if source_fps <= 0 or target_fps <= 0:
+        return 1
+    return max(1, int(round(source_fps / target_fps)))
+
+
+def video_info(path: str) -> Tuple[int, float, Tuple[int, int, int]]:
+    """``(frame_count, fps, frame_shape)`` of a video file; frame_count is the container's estimate."""
+    cap = cv2.VideoCapture(path)
+    try:
+        ok, frame = cap.read()
+        if not ok:
+            raise RuntimeError(f"No frames from video source: {path}")
+        return int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), float(cap.get(cv2.CAP_PROP_FPS)), frame.shape
+    finally:
+        cap.release()
+
+
+def read_frames(cap: cv2.VideoCapture, start: int = 0, stop: Optional[int] = None, stride: int = 1,
+                resize: Optional[Tuple[int, int]] = None) -> Generator[Tuple[int, np.ndarray], None, None]:
+    """
+    ``(frame_index, frame)`` for every ``stride``-th frame in ``[start, stop)``.
+
+    Seeks once to ``start``. Frames in between are only ``grab()``bed, which
+    demuxes and decodes them (later frames may reference them) but skips the
+    colour conversion and copy that ``retrieve()`` does.
+    """
+    if start:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    frame_id = start
+    while stop is None or frame_id < stop:
+        if not cap.grab():
+            break
+        if (frame_id - start) % stride == 0:
+            ok, frame = cap.retrieve()
+            if not ok:
+                break
+            yield frame_id, cv2.resize(frame, resize) if resize else frame
+        frame_id += 1
+
+
+def split_segments(total: int, parts: int, stride: int = 1) -> List[Tuple[int, Optional[int]]]:
+    """
+    Split ``[0, total)`` into up to ``parts`` contiguous ``(start, stop)`` ranges.
+    Starts are aligned to ``stride``, so sampling matches a single sequential
+    pass. The last range is open-ended (``stop`` None) because container frame
+    counts are only estimates.
+    """
+    parts = max(1, min(parts, max(1, total // max(stride, 1))))
+    starts = sorted({(k * total // parts + stride - 1) // stride * stride for k in range(parts)})
+    return list(zip(starts, starts[1:] + [None]))
+
+
+def _decode_segment(path, segment, start, stop, stride, resize, spec, results, credits, hw_accel, threads):
+    ring = SharedFrameRing.attach(spec)
+    cap = open_capture(path, hw_accel, threads)
+    decode_buf = None
+    try:
+        if start:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+        frame_id = start
+        while stop is None or frame_id < stop:
+            if not cap.grab():
+                break
+            if (frame_id - start) % stride == 0:
+                credits.acquire()  # the parent is done with the frame this slot held
+                slot, view = ring.begin_write()
+                if resize:
+                    ok, decode_buf = cap.retrieve(decode_buf)
+                    if ok:
+                        cv2.resize(decode_buf, (view.shape[1], view.shape[0]), dst=view)
+                else:
+                    ok, frame = cap.retrieve(view)
+                    if ok and frame is not view:
+                        np.copyto(view, frame)
+                if not ok:
+                    ring.abort(slot)
+                    break
+                results.put((segment, FrameRef(frame_id, slot, ring.commit(slot))))
+            frame_id += 1
+    finally:
+        results.put((segment, None))
+        cap.release()
+        ring.close()
+
+
+class ParallelDecoder:
+    """
+    Decode one video file in contiguous segments on several worker processes.
+
+    Each worker seeks once to the start of its segment, decodes it (only
+    ``retrieve()``ing every ``stride``-th frame) and writes the frames into its
+    own ``SharedFrameRing``. The parent only passes small ``FrameRef``s over a
+    queue and never copies pixels. A worker may run ahead of the consumer by
+    at most ``slots`` frames. A frame's slot is reused only once the consumer
+    has taken ``hold`` newer frames from that segment.
+
+    ``frames()`` yields the frames in file order when ``ordered`` (later
+    segments decode ahead into their rings meanwhile), otherwise as soon as
+    any worker has one. Frames keep their source frame index as ``frame_id``.
+    """
+
+    def __init__(self, path: str, workers: int = 2, stride: int = 1, resize: Optional[Tuple[int, int]] = None,
+                 slots: int = 16, hold: int = 1, ordered: bool = True, hw_accel: bool = False, threads: int = 0,
+                 target_fps: Optional[float] = None) -> None:
+        """
+        Args:
+            path: Video file
+            workers: Number of segments / worker processes
+            stride: Keep every Nth frame
+            resize: Optional (width, height) applied in the workers
+            slots: Ring slots per worker, i.e. how far a worker may decode ahead
+            hold: Frames the consumer keeps using after taking newer ones (must be < slots)
+            ordered: Yield frames in file order instead of as they are decoded
+            hw_accel: Ask the backend for hardware decoding
+            threads: Decoder threads per worker (0: backend default)
+            target_fps: Derive ``stride`` from the file's frame rate instead
+        """
+        if slots <= hold:
+            raise ValueError("ParallelDecoder needs more ring slots than held frames")
+        self.path = path
+        self.workers = max(1, workers)
+        self.stride = max(1, stride)
+        self.resize = resize
+        self.slots = slots
+        self.hold = max(1, hold)
+        self.ordered = ordered
+        self.hw_accel = hw_accel
+        self.threads = threads
+        self.total, self.fps, shape = video_info(path)
+        if target_fps:
+            self.stride = decode_stride(self.fps, target_fps)
+        self.shape = (resize[1], resize[0], shape[2]) if resize else shape
+        self.segments = split_segments(self.total, self.workers, self.stride)
+        self.decoded = 0
+
+    def frames(self):
+        from .video_source import CapturedFrame
+
+        ctx = mp.get_context("spawn")
+        results = ctx.Queue()
+        rings = [SharedFrameRing(self.slots, self.shape) for _ in self.segments]
+        credits = [ctx.Semaphore(self.slots) for _ in self.segments]
+        procs = [
+            ctx.Process(target=_decode_segment, daemon=True,
+                        args=(self.path, i, start, stop, self.stride, self.resize, rings[i].spec, results, credits[i],
+                              self.hw_accel, self.threads))
+            for i, (start, stop) in enumerate(self.segments)
+        ]
+        pending = [deque() for _ in self.segments]
+        held = [deque() for _ in self.segments]
+        done = [False] * len(self.segments)
+        current = 0
+        try:
+            for proc in procs:
+                proc.start()
+            while current < len(self.segments) if self.ordered else not all(done):
+                if self.ordered and pending[current]:
+                    segment, ref = current, pending[current].popleft()
+                elif self.ordered and done[current]:
+                    current += 1
+                    continue
+                else:
+                    try:
+                        segment, ref = results.get(timeout=1.0)
+                    except Empty:
+                        failed = [i for i, proc in enumerate(procs) if not done[i] and not proc.is_alive()]
+                        if failed:
+                            raise RuntimeError(f"Decoder worker for segment {self.segments[failed[0]]} died")
+                        continue
+                    if ref is None:
+                        done[segment] = True
+                        continue
+                    if self.ordered and segment != current:
+                        pending[segment].append(ref)
+                        continue
+                self.decoded += 1
+                yield CapturedFrame(ref.frame_id, rings[segment].view(ref), time.perf_counter(), 0)
+                held[segment].append(ref)
+                if len(held[segment]) > self.hold:
+                    held[segment].popleft()
+                    credits[segment].release()
+        finally:
+            for proc in procs:
+                if proc.is_alive():
+                    proc.terminate()
+                proc.join(timeout=1)
+            for ring in rings:
+                ring.close()
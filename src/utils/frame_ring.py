@@ -0,0 +1,159 @@
+"""Preallocated ring of frame slots in shared memory, readable from other processes without copies."""
+
+import sys
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import NamedTuple, Optional, Tuple
+
+import numpy as np
+
+_WRITING = -1
+_EMPTY = -2
+_HEADER_ALIGN = 64
+
+
+@dataclass(frozen=True)
+class FrameRingSpec:
+    """Everything another process needs to attach to a ring (small and picklable)."""
+    name: str
+    slots: int
+    shape: Tuple[int, ...]
+    dtype: str = "uint8"
+
+
+class FrameRef(NamedTuple):
+    """A frame published in a ring: consumers pass these around instead of pixel arrays."""
+    frame_id: int
+    slot: int
+    seq: int
+
+
+def _header_bytes(slots: int) -> int:
+    size = slots * np.dtype(np.int64).itemsize
+    return (size + _HEADER_ALIGN - 1) // _HEADER_ALIGN * _HEADER_ALIGN
+
+
+class SharedFrameRing:
+    """
+    Fixed number of equally shaped frame slots in one ``multiprocessing.shared_memory`` block.
+
+    The single writer cycles through the slots. ``begin_write`` returns a slot
+    view to decode into, and ``commit`` publishes it under the next sequence
+    number. Each slot has a sequence word in the block header, which acts as a
+    seqlock: it holds ``-1`` while the slot is being written and the frame's
+    sequence number afterwards. A reader holding a ``FrameRef`` gets a view
+    with ``view(ref)``. Once it has finished with the pixels, ``is_valid(ref)``
+    says whether the writer lapped the ring in the meantime, in which case the
+    frame must be treated as dropped. Size the ring so that consumers normally
+    finish long before that.
+
+    The creating process owns the block and unlinks it on ``close``. Other
+    processes ``attach`` with the ring's ``spec``.
+    """
+
+    def __init__(self, slots: int, shape: Tuple[int, ...], dtype=np.uint8, name: Optional[str] = None,
+                 _shm: Optional[shared_memory.SharedMemory] = None) -> None:
+        """
+        Args:
+            slots: Number of frame slots
+            shape: Shape of one frame, e.g. (H, W, 3)
+            dtype: Pixel dtype
+            name: Optional shared-memory name (a random one is chosen otherwise)
+        """
+        if slots < 1:
+            raise ValueError("SharedFrameRing needs at least one slot")
+        self.slots = slots
+        self.shape = tuple(int(v) for v in shape)
+        self.dtype = np.dtype(dtype)
+        header = _header_bytes(slots)
+        frame_bytes = int(np.prod(self.shape)) * self.dtype.itemsize
+        self.owner = _shm is None
+        self._shm = _shm or shared_memory.SharedMemory(name=name, create=True, size=header + slots * frame_bytes)
+        self._seq = np.ndarray((slots,), dtype=np.int64, buffer=self._shm.buf)
+        self._frames = np.ndarray((slots,) + self.shape, dtype=self.dtype, buffer=self._shm.buf, offset=header)
+        self._next_slot = 0
+        self._next_seq = 0
+        if self.owner:
+            self._seq[:] = _EMPTY
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def spec(self) -> FrameRingSpec:
+        return FrameRingSpec(self.name, self.slots, self.shape, self.dtype.str)
+
+    @classmethod
+    def attach(cls, spec: FrameRingSpec) -> "SharedFrameRing":
+        """Open an existing ring (typically in a worker process) for reading."""
+        if sys.version_info >= (3, 13):
+            shm = shared_memory.SharedMemory(name=spec.name, track=False)
+        else:
+            # Only the owner may unlink the block, so it must not be registered with a resource tracker here:
+            # an own tracker would unlink it at exit, and unregistering from a tracker shared with the owner
+            # (spawned children) would drop the owner's registration instead.
+            from multiprocessing import resource_tracker
+            register = resource_tracker.register
+            resource_tracker.register = lambda name, rtype: None if rtype == "shared_memory" else register(name, rtype)
+            try:
+                shm = shared_memory.SharedMemory(name=spec.name)
+            finally:
+                resource_tracker.register = register
+        return cls(spec.slots, spec.shape, spec.dtype, _shm=shm)
+
+    def begin_write(self) -> Tuple[int, np.ndarray]:
+        """Claim the next slot for writing; returns ``(slot, view)`` to decode or resize into."""
+        slot = self._next_slot
+        self._seq[slot] = _WRITING
+        return slot, self._frames[slot]
+
+    def commit(self, slot: int) -> int:
+        """Publish the frame written into ``slot``; returns its sequence number."""
+        seq = self._next_seq
+        self._seq[slot] = seq
+        self._next_seq += 1
+        self._next_slot = (slot + 1) % self.slots
+        return seq
+
+    def abort(self, slot: int) -> None:
+        """Give up on a claimed slot (e.g. the decoder failed); the slot reads as empty."""
+        self._seq[slot] = _EMPTY
+
+    def write(self, frame: np.ndarray) -> Tuple[int, int]:
+        """Copy ``frame`` into the next slot and publish it; returns ``(slot, seq)``."""
+        slot, view = self.begin_write()
+        np.copyto(view, frame)
+        return slot, self.commit(slot)
+
+    def is_valid(self, ref) -> bool:
+        """True while ``ref``'s slot still holds the frame it was published with."""
+        return int(self._seq[ref.slot]) == ref.seq
+
+    def view(self, ref) -> Optional[np.ndarray]:
+        """Zero-copy view of ``ref``'s frame, or None if it was already overwritten. Check ``is_valid`` after use."""
+        if not self.is_valid(ref):
+            return None
+        return self._frames[ref.slot]
+
+    def read(self, ref) -> Optional[np.ndarray]:
+        """Private copy of ``ref``'s frame, or None if it was overwritten before or during the copy."""
+        view = self.view(ref)
+        if view is None:
+            return None
+        frame = view.copy()
+        return frame if self.is_valid(ref) else None
+
+    def close(self) -> None:
+        """Release this process's mapping; the owner also unlinks the block."""
+        self._seq = None
+        self._frames = None
+        try:
+            self._shm.close()
+        except BufferError:
+            pass  # a consumer still holds a view; the mapping goes away with it
+        if self.owner:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,109 @@
+"""Batched constant-velocity Kalman filter for bounding-box tracks."""
+
+import numpy as np
+
+# State: [cx, cy, w, h, vcx, vcy, vw, vh]; measurement: [cx, cy, w, h]
+STATE_DIM = 8
+MEAS_DIM = 4
+_H = np.hstack([np.eye(MEAS_DIM), np.zeros((MEAS_DIM, MEAS_DIM))])
+
+
+def bbox_to_measurement(bboxes: np.ndarray) -> np.ndarray:
+    """Convert (N, 4) ``x1, y1, x2, y2`` boxes to (N, 4) ``cx, cy, w, h``."""
+    b = np.asarray(bboxes, dtype=np.float64).reshape(-1, 4)
+    w = b[:, 2] - b[:, 0]
+    h = b[:, 3] - b[:, 1]
+    return np.stack([b[:, 0] + w / 2, b[:, 1] + h / 2, w, h], axis=1)
+
+
+def state_to_bbox(x: np.ndarray) -> np.ndarray:
+    """Convert (N, 8) states back to (N, 4) ``x1, y1, x2, y2`` boxes."""
+    cx, cy = x[:, 0], x[:, 1]
+    w = np.maximum(x[:, 2], 1.0)
+    h = np.maximum(x[:, 3], 1.0)
+    return np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+
+
+class ConstantVelocityKalman:
+    """
+    Kalman filter over many tracks at once.
+
+    Every method takes stacked state means ``x`` of shape (N, 8) and covariances
+    ``P`` of shape (N, 8, 8) and returns new arrays, so predict and update cost
+    one set of NumPy calls regardless of the number of tracks. Noise scales with
+    box height, as in SORT/DeepSORT, so near and far signs behave alike.
+    """
+
+    def __init__(self, std_position: float = 1.0 / 20, std_velocity: float = 1.0 / 160, std_measurement: float = 1.0 / 20) -> None:
+        """
+        Args:
+            std_position: Process noise on position/size, as a fraction of box height per frame
+            std_velocity: Process noise on velocity, as a fraction of box height per frame
+            std_measurement: Detector noise, as a fraction of box height
+        """
+        self.std_position = std_position
+        self.std_velocity = std_velocity
+        self.std_measurement = std_measurement
+
+    def initiate(self, bboxes: np.ndarray):
+        """Create states for new tracks from (N, 4) boxes, with zero initial velocity."""
+        z = bbox_to_measurement(bboxes)
+        n = z.shape[0]
+        x = np.zeros((n, STATE_DIM))
+        x[:, :MEAS_DIM] = z
+        h = np.maximum(z[:, 3], 1.0)
+        std = np.stack([
+            2 * self.std_position * h, 2 * self.std_position * h, 2 * self.std_position * h, 2 * self.std_position * h,
+            10 * self.std_velocity * h, 10 * self.std_velocity * h, 10 * self.std_velocity * h, 10 * self.std_velocity * h,
+        ], axis=1)
+        P = np.zeros((n, STATE_DIM, STATE_DIM))
+        idx = np.arange(STATE_DIM)
+        P[:, idx, idx] = std ** 2
+        return x, P
+
+    def predict(self, x: np.ndarray, P: np.ndarray, dt):
+        """
+        Propagate states ``dt`` frames ahead.
+
+        Args:
+            x: State means (N, 8)
+            P: State covariances (N, 8, 8)
+            dt: Frames elapsed, scalar or per-track array of shape (N,)
+        """
+        n = x.shape[0]
+        if n == 0:
+            return x, P
+        dt = np.broadcast_to(np.asarray(dt, dtype=np.float64), (n,))
+        F = np.broadcast_to(np.eye(STATE_DIM), (n, STATE_DIM, STATE_DIM)).copy()
+        idx = np.arange(MEAS_DIM)
+        F[:, idx, idx + MEAS_DIM] = dt[:, None]
+
+        h = np.maximum(x[:, 3], 1.0)
+        q_pos = (self.std_position * h) ** 2 * dt
+        q_vel = (self.std_velocity * h) ** 2 * dt
+        Q = np.zeros((n, STATE_DIM, STATE_DIM))
+        Q[:, idx, idx] = q_pos[:, None]
+        Q[:, idx + MEAS_DIM, idx + MEAS_DIM] = q_vel[:, None]
+
+        x = np.einsum("nij,nj->ni", F, x)
+        P = F @ P @ F.transpose(0, 2, 1) + Q
+        return x, P
+
+    def update(self, x: np.ndarray, P: np.ndarray, bboxes: np.ndarray):
+        """Correct states (N, 8) with matched (N, 4) ``x1, y1, x2, y2`` detections."""
+        n = x.shape[0]
+        if n == 0:
+            return x, P
+        z = bbox_to_measurement(bboxes)
+        h = np.maximum(x[:, 3], 1.0)
+        R = np.zeros((n, MEAS_DIM, MEAS_DIM))
+        idx = np.arange(MEAS_DIM)
+        R[:, idx, idx] = ((self.std_measurement * h) ** 2)[:, None]
+
+        PHt = P @ _H.T
+        S = _H @ PHt + R
+        K = np.linalg.solve(S, PHt.transpose(0, 2, 1)).transpose(0, 2, 1)
+        innovation = z - x[:, :MEAS_DIM]
+        x = x + np.einsum("nij,nj->ni", K, innovation)
+        P = P - K @ _H @ P
+        return x, P
@@ -1,6 +1,8 @@
 import time
 from collections import deque
-from typing import Deque, Optional
+from typing import Deque, Dict, Optional
+
+import numpy as np
 
 
 class ThroughputMeter:
@@ -21,3 +23,22 @@ class ThroughputMeter:
             return 0.0
         avg = sum(self.times) / len(self.times)
         return 1.0 / avg if avg > 0 else 0.0
+
+
+class LatencyWindow:
+    """Percentiles over the most recent latency samples (milliseconds)."""
+
+    def __init__(self, window: int = 1024) -> None:
+        self.samples: Deque[float] = deque(maxlen=window)
+
+    def add(self, ms: float) -> None:
+        self.samples.append(ms)
+
+    def extend(self, values) -> None:
+        self.samples.extend(values)
+
+    def percentiles(self) -> Dict[str, float]:
+        if not self.samples:
+            return {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+        p50, p95, p99 = np.percentile(list(self.samples), [50, 95, 99])
+        return {"p50": float(p50), "p95": float(p95), "p99": float(p99)}
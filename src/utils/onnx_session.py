@@ -0,0 +1,40 @@
+"""Shared onnxruntime session construction for the ONNX backends."""
+
+from typing import Any, Dict
+
+try:
+    import onnxruntime as ort  # type: ignore
+except ImportError:  # pragma: no cover - optional
+    ort = None
+
+
+def create_session(path: str, device: str = "cpu", intra_op_threads: int = 0, inter_op_threads: int = 0):
+    """
+    Open an ONNX model with onnxruntime.
+
+    Args:
+        path: ONNX model file
+        device: "cpu" or "cuda"; CUDA is used only if the provider is installed
+        intra_op_threads: Threads used inside one operator (0 lets onnxruntime decide)
+        inter_op_threads: Threads used to run independent operators in parallel (0 lets onnxruntime decide)
+
+    Returns:
+        An ``onnxruntime.InferenceSession``, or None if onnxruntime is missing
+    """
+    if ort is None:
+        return None
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    options.intra_op_num_threads = intra_op_threads
+    options.inter_op_num_threads = inter_op_threads
+    if inter_op_threads > 1:
+        options.execution_mode = ort.ExecutionMode.ORT_PARALLEL
+    providers = ["CPUExecutionProvider"]
+    if device.startswith("cuda") and "CUDAExecutionProvider" in ort.get_available_providers():
+        providers.insert(0, "CUDAExecutionProvider")
+    return ort.InferenceSession(path, sess_options=options, providers=providers)
+
+
+def session_metadata(session) -> Dict[str, Any]:
+    """Custom metadata embedded in the model (e.g. class names written at export time)."""
+    return dict(session.get_modelmeta().custom_metadata_map)
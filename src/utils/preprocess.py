@@ -1,70 +1,377 @@
 """Image preprocessing utilities for road sign detection."""
 
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
 import cv2
 import numpy as np
-from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from ..config import PreprocessConfig
 
+# Order used when ``PreprocessConfig.ops`` is not given. The HSV mask runs first on
+# the raw colours so an empty frame can skip every enhancement after it.
+DEFAULT_OP_ORDER = ("hsv_mask", "dehaze", "clahe", "blur", "bilateral", "sharpen", "gamma", "adaptive_thresh")
+_ENABLE_FLAGS = {
+    "hsv_mask": "enable_hsv_mask",
+    "dehaze": "enable_dehaze",
+    "clahe": "enable_clahe",
+    "blur": "enable_blur",
+    "bilateral": "enable_bilateral",
+    "sharpen": "enable_sharpen",
+    "gamma": "enable_gamma",
+    "adaptive_thresh": "enable_adaptive_thresh",
+}
+# Ops that only inspect the current image and add an auxiliary output
+_ANALYSIS_OPS = {"hsv_mask", "adaptive_thresh"}
+
+# OpenCV hue runs 0-179; red wraps around 0.
+_SIGN_HUES = {
+    "red": ((0, 10), (170, 179)),
+    "yellow": ((15, 35),),
+    "blue": ((100, 130),),
+}
+_MASK_SCALE = 0.25  # the HSV mask is computed at a quarter of the detector resolution
+
+
+@dataclass(frozen=True)
+class FrameTransform:
+    """
+    Geometry of a resize from the source frame to the detector input.
+
+    A source point ``(x, y)`` lands at ``(x * scale_x + pad_x, y * scale_y + pad_y)``.
+    Letterboxing has ``scale_x == scale_y`` and non-zero padding on one axis; a
+    plain stretch has different scales and no padding.
+    """
+    scale_x: float
+    scale_y: float
+    pad_x: int
+    pad_y: int
+    source_size: Tuple[int, int]  # (width, height)
+
+    def to_source(self, bbox) -> Tuple[int, int, int, int]:
+        """Map an ``x1, y1, x2, y2`` box from detector-input to source coordinates, clipped to the frame."""
+        w, h = self.source_size
+        x1, y1, x2, y2 = bbox
+        return (
+            int(min(max((x1 - self.pad_x) / self.scale_x, 0), w)),
+            int(min(max((y1 - self.pad_y) / self.scale_y, 0), h)),
+            int(min(max((x2 - self.pad_x) / self.scale_x, 0), w)),
+            int(min(max((y2 - self.pad_y) / self.scale_y, 0), h)),
+        )
+
+    def to_target(self, bbox) -> Tuple[int, int, int, int]:
+        """Map an ``x1, y1, x2, y2`` box from source to detector-input coordinates."""
+        x1, y1, x2, y2 = bbox
+        return (
+            int(round(x1 * self.scale_x + self.pad_x)),
+            int(round(y1 * self.scale_y + self.pad_y)),
+            int(round(x2 * self.scale_x + self.pad_x)),
+            int(round(y2 * self.scale_y + self.pad_y)),
+        )
+
+
+def letterbox_transform(source_size: Tuple[int, int], target_size: Tuple[int, int]) -> FrameTransform:
+    """Aspect-preserving fit of ``source_size`` (w, h) into ``target_size`` (w, h), centred."""
+    sw, sh = source_size
+    tw, th = target_size
+    scale = min(tw / sw, th / sh)
+    nw, nh = max(int(round(sw * scale)), 1), max(int(round(sh * scale)), 1)
+    return FrameTransform(nw / sw, nh / sh, (tw - nw) // 2, (th - nh) // 2, (sw, sh))
+
+
+def letterbox(frame: np.ndarray, target_size: Tuple[int, int], color: int = 114, dst: Optional[np.ndarray] = None):
+    """
+    Resize ``frame`` into ``target_size`` (w, h) keeping its aspect ratio, padding the rest with ``color``.
+
+    Returns:
+        ``(image, transform)``; ``image`` is ``dst`` when given
+    """
+    h, w = frame.shape[:2]
+    tw, th = target_size
+    transform = letterbox_transform((w, h), target_size)
+    if dst is None:
+        dst = np.empty((th, tw) + frame.shape[2:], dtype=frame.dtype)
+    nw = int(round(w * transform.scale_x))
+    nh = int(round(h * transform.scale_y))
+    px, py = transform.pad_x, transform.pad_y
+    # Only the borders are filled; the resize writes straight into the inner view.
+    dst[:py] = color
+    dst[py + nh:] = color
+    dst[py:py + nh, :px] = color
+    dst[py:py + nh, px + nw:] = color
+    cv2.resize(frame, (nw, nh), dst=dst[py:py + nh, px:px + nw], interpolation=cv2.INTER_LINEAR)
+    return dst, transform
+
+
+@dataclass
+class PreprocessResult:
+    image: np.ndarray
+    transform: Optional[FrameTransform] = None  # source frame -> ``image`` geometry
+    timings: Dict[str, float] = field(default_factory=dict)  # per-op ms, in execution order
+    sign_mask: Optional[np.ndarray] = None  # red/blue/yellow mask at _MASK_SCALE of ``image``
+    regions: Optional[List[Tuple[int, int, int, int]]] = None  # sign-colored boxes in ``image`` coordinates
+    threshold: Optional[np.ndarray] = None  # adaptive-threshold binary image
+    skipped: bool = False  # True when no sign-colored region was found and skip_empty_frames is set
+
+
+class Preprocessor:
+    """
+    Frame preprocessing built once from a ``PreprocessConfig``.
+
+    Preprocessing is an ordered list of named ops (``DEFAULT_OP_ORDER`` filtered
+    by the ``enable_*`` flags, or ``cfg.ops``). Image ops rewrite the frame;
+    analysis ops (``hsv_mask``, ``adaptive_thresh``) leave it alone and attach an
+    auxiliary output to the ``PreprocessResult``. Every op is timed. With
+    ``cfg.roi_only`` the frame is only resized (plus analysis ops) and the image
+    ops are applied to detection crops through ``enhance``. With ``cfg.letterbox``
+    the frame is fitted without distortion and ``PreprocessResult.transform``
+    maps detector boxes back to the source frame. The HSV mask (and its
+    connected components) runs only when something uses it: with
+    ``cfg.skip_empty_frames``, in an explicit ``cfg.ops``, or for callers that
+    pass ``regions=True`` to read ``PreprocessResult.regions``.
+
+    The CLAHE object, kernels and gamma LUT are created in the constructor, and
+    every OpenCV call writes into buffers kept between frames (``dst=``), so
+    steady-state preprocessing allocates little. Returned frames live in a ring
+    of ``output_slots`` buffers: a result stays valid until ``output_slots``
+    further frames have been processed.
+    """
+
+    def __init__(self, cfg: Optional['PreprocessConfig'] = None, target_size: tuple = (640, 640), output_slots: int = 1,
+                 regions: bool = False) -> None:
+        """
+        Args:
+            cfg: Preprocessing configuration; None applies CLAHE only
+            target_size: Target size for resizing (width, height)
+            output_slots: Number of output buffers cycled through
+            regions: Run the enabled HSV mask even without ``skip_empty_frames``, for callers reading region proposals
+        """
+        self.cfg = cfg
+        self.regions = regions
+        self.target_size = tuple(target_size)
+        self.output_slots = max(1, output_slots)
+        self._clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+        self._sharpen_kernel = np.array([[-1, -1, -1],
+                                         [-1,  9, -1],
+                                         [-1, -1, -1]], dtype=np.float32)
+        self._open_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
+        self._dehaze_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (5, 5))
+        self._gamma_lut = None
+        if cfg is not None:
+            inv_gamma = 1.0 / cfg.gamma
+            self._gamma_lut = ((np.arange(256) / 255.0) ** inv_gamma * 255).astype(np.uint8)
+        self.op_names = self._op_names()
+        self._ops = [(name, getattr(self, f"_{name}_op")) for name in self.op_names]
+        self.roi_only = bool(cfg is not None and cfg.roi_only)
+        self.letterbox = bool(cfg is not None and cfg.letterbox)
+        image_ops = [i for i, name in enumerate(self.op_names) if name not in _ANALYSIS_OPS]
+        self._last_image_op = image_ops[-1] if image_ops and not self.roi_only else -1
+        self._buffers: Dict[str, np.ndarray] = {}
+        self._outputs: List[np.ndarray] = []
+        self._next_output = 0
+
+    def _op_names(self) -> List[str]:
+        cfg = self.cfg
+        if cfg is None:
+            return ["clahe"]
+        if cfg.ops is not None:
+            unknown = [name for name in cfg.ops if name not in _ENABLE_FLAGS]
+            if unknown:
+                raise ValueError(f"Unknown preprocessing ops {unknown}; choose from {list(DEFAULT_OP_ORDER)}")
+            names = list(cfg.ops)
+        else:
+            names = [name for name in DEFAULT_OP_ORDER if getattr(cfg, _ENABLE_FLAGS[name])]
+            if not (self.regions or cfg.skip_empty_frames):
+                # Nobody reads the sign-colour regions; spare the mask and connected components on every frame.
+                names = [name for name in names if name != "hsv_mask"]
+        if cfg.skip_empty_frames and "hsv_mask" not in names:
+            names.insert(0, "hsv_mask")
+        return names
+
+    def _buffer(self, name: str, shape: tuple, dtype=np.uint8) -> np.ndarray:
+        buf = self._buffers.get(name)
+        if buf is None or buf.shape != shape or buf.dtype != dtype:
+            buf = self._buffers[name] = np.empty(shape, dtype=dtype)
+        return buf
+
+    def _output(self, shape: tuple) -> np.ndarray:
+        if not self._outputs or self._outputs[0].shape != shape:
+            self._outputs = [np.empty(shape, dtype=np.uint8) for _ in range(self.output_slots)]
+            self._next_output = 0
+        out = self._outputs[self._next_output]
+        self._next_output = (self._next_output + 1) % self.output_slots
+        return out
+
+    def __call__(self, frame: np.ndarray) -> np.ndarray:
+        """Preprocess ``frame`` and return only the image (a reused buffer, see the class docstring)."""
+        return self.run(frame).image
+
+    def run(self, frame: np.ndarray) -> PreprocessResult:
+        """
+        Preprocess a frame for detection and classification.
+
+        Args:
+            frame: Input image frame (BGR format from OpenCV)
+
+        Returns:
+            ``PreprocessResult`` with the processed image, per-op timings and auxiliary outputs
+        """
+        if frame is None:
+            raise ValueError("Input frame is None")
+        w, h = self.target_size
+        shape = (h, w) + frame.shape[2:]
+        t0 = time.perf_counter()
+        current = self._output(shape) if self._last_image_op < 0 else self._buffer("resize", shape)
+        if self.letterbox:
+            current, transform = letterbox(frame, self.target_size, dst=current)
+        else:
+            current = cv2.resize(frame, self.target_size, dst=current, interpolation=cv2.INTER_LINEAR)
+            src_h, src_w = frame.shape[:2]
+            transform = FrameTransform(w / src_w, h / src_h, 0, 0, (src_w, src_h))
+        result = PreprocessResult(image=current, transform=transform, timings={"resize": (time.perf_counter() - t0) * 1000})
+
+        written = 0
+        for i, (name, op) in enumerate(self._ops):
+            t0 = time.perf_counter()
+            if name in _ANALYSIS_OPS:
+                op(current, result)
+            elif self.roi_only:
+                continue  # image ops run on detection crops instead, see enhance()
+            else:
+                # Ping-pong between two scratch buffers; the last image op writes the output slot.
+                dst = self._output(shape) if i == self._last_image_op else self._buffer(f"scratch{written % 2}", shape)
+                op(current, dst)
+                current = dst
+                written += 1
+            result.timings[name] = (time.perf_counter() - t0) * 1000
+            if name == "hsv_mask" and self.cfg.skip_empty_frames and not result.regions:
+                result.skipped = True
+                break
+
+        if result.skipped and i < self._last_image_op:
+            # Enhancement was cut short; hand out an output slot instead of a scratch buffer.
+            out = self._output(shape)
+            np.copyto(out, current)
+            current = out
+        result.image = current
+        return result
+
+    def enhance(self, image: np.ndarray) -> np.ndarray:
+        """
+        Apply the image ops (not the resize or analysis ops) to an image of any size, e.g. a detection crop.
+
+        Returns a new array. Scratch buffers are shared with ``run``, so one
+        instance must not call both from different threads.
+        """
+        current = image
+        for name, op in self._ops:
+            if name not in _ANALYSIS_OPS:
+                dst = np.empty_like(current)
+                op(current, dst)
+                current = dst
+        return np.ascontiguousarray(current) if current is image else current
+
+    # Image ops read ``src`` and write ``dst``; the two never alias.
+
+    def _clahe_op(self, src: np.ndarray, dst: np.ndarray) -> None:
+        lab = cv2.cvtColor(src, cv2.COLOR_BGR2LAB, dst=self._buffer("lab", src.shape))
+        lightness = cv2.extractChannel(lab, 0, dst=self._buffer("lightness", src.shape[:2]))
+        self._clahe.apply(lightness, dst=lightness)
+        cv2.insertChannel(lightness, lab, 0)
+        cv2.cvtColor(lab, cv2.COLOR_LAB2BGR, dst=dst)
+
+    def _blur_op(self, src: np.ndarray, dst: np.ndarray) -> None:
+        k = self.cfg.blur_kernel
+        cv2.GaussianBlur(src, (k, k), 0, dst=dst)
+
+    def _bilateral_op(self, src: np.ndarray, dst: np.ndarray) -> None:
+        cv2.bilateralFilter(src, 9, 75, 75, dst=dst)
+
+    def _sharpen_op(self, src: np.ndarray, dst: np.ndarray) -> None:
+        cv2.filter2D(src, -1, self._sharpen_kernel, dst=dst)
+
+    def _gamma_op(self, src: np.ndarray, dst: np.ndarray) -> None:
+        cv2.LUT(src, self._gamma_lut, dst=dst)
+
+    def _dehaze_op(self, src: np.ndarray, dst: np.ndarray) -> None:
+        """
+        Dark-channel-prior dehazing (He et al.).
+
+        Atmospheric light and transmission are estimated on a quarter-resolution
+        copy and the transmission map is upsampled, which keeps the cost close to
+        a couple of full-frame arithmetic passes.
+        """
+        h, w = src.shape[:2]
+        small = cv2.resize(src, (max(w // 4, 1), max(h // 4, 1)), dst=self._buffer("haze_small", (max(h // 4, 1), max(w // 4, 1), 3)),
+                           interpolation=cv2.INTER_AREA)
+        dark = cv2.erode(small.min(axis=2), self._dehaze_kernel)
+        # Atmospheric light: mean colour of the haziest 0.1% of pixels
+        flat = dark.ravel()
+        count = max(flat.size // 1000, 1)
+        brightest = np.argpartition(flat, flat.size - count)[-count:]
+        airlight = np.maximum(small.reshape(-1, 3)[brightest].mean(axis=0), 1.0).astype(np.float32)
+
+        normalized = cv2.erode((small.astype(np.float32) / airlight).min(axis=2), self._dehaze_kernel)
+        transmission = 1.0 - self.cfg.dehaze_strength * normalized
+        transmission = cv2.resize(transmission, (w, h), dst=self._buffer("haze_t", (h, w), np.float32),
+                                  interpolation=cv2.INTER_LINEAR)
+        np.maximum(transmission, 0.1, out=transmission)
+
+        image = self._buffer("haze_f", src.shape, np.float32)
+        np.subtract(src, airlight, out=image, dtype=np.float32)
+        np.divide(image, transmission[..., None], out=image)
+        np.add(image, airlight, out=image)
+        np.clip(image, 0, 255, out=image)
+        dst[...] = image
+
+    # Analysis ops read ``src`` and fill fields of ``result``.
+
+    def _hsv_mask_op(self, src: np.ndarray, result: PreprocessResult) -> None:
+        """Red/blue/yellow mask of saturated, bright pixels and the boxes of its blobs."""
+        h, w = src.shape[:2]
+        sw, sh = max(int(w * _MASK_SCALE), 1), max(int(h * _MASK_SCALE), 1)
+        small = cv2.resize(src, (sw, sh), dst=self._buffer("mask_small", (sh, sw, 3)), interpolation=cv2.INTER_AREA)
+        hsv = cv2.cvtColor(small, cv2.COLOR_BGR2HSV, dst=self._buffer("hsv", (sh, sw, 3)))
+        mask = np.zeros((sh, sw), dtype=np.uint8)
+        part = self._buffer("hsv_part", (sh, sw))
+        s_min, v_min = self.cfg.hsv_min_saturation, self.cfg.hsv_min_value
+        for ranges in _SIGN_HUES.values():
+            for lo, hi in ranges:
+                cv2.inRange(hsv, (lo, s_min, v_min), (hi, 255, 255), dst=part)
+                cv2.bitwise_or(mask, part, dst=mask)
+        cv2.morphologyEx(mask, cv2.MORPH_OPEN, self._open_kernel, dst=mask)
+
+        count, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+        min_area = self.cfg.min_region_area * _MASK_SCALE * _MASK_SCALE
+        sx, sy = w / sw, h / sh
+        regions = []
+        for x, y, bw, bh, area in stats[1:count].tolist():
+            if area >= min_area:
+                regions.append((int(x * sx), int(y * sy), int(min((x + bw) * sx, w)), int(min((y + bh) * sy, h))))
+        result.sign_mask = mask
+        result.regions = regions
+
+    def _adaptive_thresh_op(self, src: np.ndarray, result: PreprocessResult) -> None:
+        """Binary mean-adaptive threshold of the grey image, useful for sign shape/edge analysis."""
+        gray = cv2.cvtColor(src, cv2.COLOR_BGR2GRAY, dst=self._buffer("gray", src.shape[:2]))
+        result.threshold = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY_INV, 15, 5)
+
 
 def preprocess_frame(frame: np.ndarray, cfg: 'PreprocessConfig' = None, target_size: tuple = (640, 640)) -> np.ndarray:
     """
     Preprocess a frame for detection and classification.
-    
+
+    One-off convenience wrapper; per-frame callers should keep a ``Preprocessor``
+    so CLAHE, kernels, LUTs and buffers are reused.
+
     Args:
         frame: Input image frame (BGR format from OpenCV)
         cfg: Preprocessing configuration object
         target_size: Target size for resizing (width, height)
-    
+
     Returns:
         Preprocessed frame
     """
-    if frame is None:
-        raise ValueError("Input frame is None")
-    
-    # Resize frame to target size
-    processed = cv2.resize(frame, target_size, interpolation=cv2.INTER_LINEAR)
-    
-    # If no config provided, use default processing
-    if cfg is None:
-        # Apply basic CLAHE
-        lab = cv2.cvtColor(processed, cv2.COLOR_BGR2LAB)
-        l, a, b = cv2.split(lab)
-        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-        l = clahe.apply(l)
-        processed = cv2.merge([l, a, b])
-        processed = cv2.cvtColor(processed, cv2.COLOR_LAB2BGR)
-        return processed
-    
-    # Apply CLAHE for contrast enhancement
-    if cfg.enable_clahe:
-        lab = cv2.cvtColor(processed, cv2.COLOR_BGR2LAB)
-        l, a, b = cv2.split(lab)
-        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-        l = clahe.apply(l)
-        processed = cv2.merge([l, a, b])
-        processed = cv2.cvtColor(processed, cv2.COLOR_LAB2BGR)
-    
-    # Apply Gaussian blur for noise reduction
-    if cfg.enable_blur:
-        processed = cv2.GaussianBlur(processed, (cfg.blur_kernel, cfg.blur_kernel), 0)
-    
-    # Apply bilateral filter
-    if cfg.enable_bilateral:
-        processed = cv2.bilateralFilter(processed, 9, 75, 75)
-    
-    # Apply sharpening
-    if cfg.enable_sharpen:
-        kernel = np.array([[-1, -1, -1],
-                          [-1,  9, -1],
-                          [-1, -1, -1]])
-        processed = cv2.filter2D(processed, -1, kernel)
-    
-    # Apply gamma correction
-    if cfg.enable_gamma:
-        inv_gamma = 1.0 / cfg.gamma
-        table = np.array([((i / 255.0) ** inv_gamma) * 255 for i in range(256)]).astype("uint8")
-        processed = cv2.LUT(processed, table)
-    
-    return processed
+    return Preprocessor(cfg, target_size)(frame)
@@ -0,0 +1,274 @@
+"""Streaming columnar storage of FrameResults (Parquet / Arrow IPC, or memory-mappable .npy columns without pyarrow)."""
+
+import json
+import os
+import struct
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .types import FrameResult
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional
+    pa = None
+    pq = None
+
+STAGES = ("preprocess_ms", "detect_ms", "classify_ms", "llm_ms")
+# One row per detection; a frame without detections still gets one row (det_index -1) so its latencies are kept.
+# Missing values use sentinels instead of nulls so that every format reads back the same:
+# -1 for ids and track ids, NaN for confidences/latencies, None for categories.
+COLUMNS = {
+    "frame_id": np.int64,
+    "det_index": np.int16,
+    "track_id": np.int32,
+    "x1": np.int32,
+    "y1": np.int32,
+    "x2": np.int32,
+    "y2": np.int32,
+    "det_confidence": np.float32,
+    "cls_confidence": np.float32,
+    "degraded": np.bool_,
+    "latency_ms": np.float32,
+    "frame_age_ms": np.float32,
+    **{stage: np.float32 for stage in STAGES},
+}
+CATEGORIES = ("source_id", "label", "cls_label", "safety_tier")
+FORMATS = ("parquet", "arrow", "npy")
+
+_NPY_HEADER_BYTES = 128  # fixed, so the row count can be patched in when the column is closed
+
+
+def infer_format(path: str) -> str:
+    """``.parquet`` -> parquet, ``.arrow``/``.feather``/``.ipc`` -> Arrow IPC, anything else -> .npy column directory."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".parquet":
+        return "parquet"
+    if ext in (".arrow", ".feather", ".ipc"):
+        return "arrow"
+    return "npy"
+
+
+class ResultSink:
+    """
+    Buffers ``FrameResult``s as columnar rows (one per detection) and flushes them in batches of ``batch_rows``.
+
+    ``parquet`` writes one row group per batch. ``arrow`` writes an uncompressed
+    Arrow IPC file that ``read_results`` memory-maps without copying. ``npy``
+    needs no pyarrow. It writes a directory with one ``.npy`` file per column,
+    appended to on every flush, so ``np.load(..., mmap_mode="r")`` works.
+    Categories are stored as int32 codes, with names in ``meta.json``. With
+    ``logits`` the classifier logits of each detection are stored too: a float
+    list column in Arrow/Parquet, a 2-D NaN-padded array in npy.
+    """
+
+    def __init__(self, path: str, format: Optional[str] = None, batch_rows: int = 4096, logits: bool = False,
+                 compression: str = "zstd") -> None:
+        self.path = path
+        self.format = format or infer_format(path)
+        if self.format not in FORMATS:
+            raise ValueError(f"Unknown result format '{self.format}' (expected one of {FORMATS})")
+        if self.format != "npy" and pa is None:
+            raise RuntimeError(f"Writing {self.format} results requires pyarrow; use the npy format instead")
+        self.batch_rows = max(1, batch_rows)
+        self.logits = logits
+        self.compression = compression
+        self.frames = 0
+        self.rows = 0
+        self._buffer: Dict[str, List[Any]] = {name: [] for name in (*COLUMNS, *CATEGORIES)}
+        self._logits: List[Optional[np.ndarray]] = []
+        self._writer = None
+        self._npy: Optional[_NpyColumns] = _NpyColumns(path) if self.format == "npy" else None
+
+    def __enter__(self) -> "ResultSink":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def write(self, result: FrameResult, source_id: Optional[str] = None) -> None:
+        source_id = source_id if source_id is not None else result.source_id
+        stages = result.stage_latency or {}
+        frame = {
+            "frame_id": result.frame_id,
+            "degraded": result.degraded,
+            "latency_ms": result.latency_ms,
+            "frame_age_ms": result.frame_age_ms,
+            "source_id": source_id,
+            "safety_tier": result.safety_tier,
+            **{stage: stages.get(stage, np.nan) for stage in STAGES},
+        }
+        classifications = result.classifications or []
+        detections = result.detections or [None]
+        for index, det in enumerate(detections):
+            cls = classifications[index] if index < len(classifications) else None
+            row = dict(frame)
+            row["det_index"] = index if det is not None else -1
+            row["track_id"] = det.track_id if det is not None and det.track_id is not None else -1
+            row["x1"], row["y1"], row["x2"], row["y2"] = det.bbox if det is not None else (-1, -1, -1, -1)
+            row["label"] = det.label if det is not None else None
+            row["det_confidence"] = det.confidence if det is not None else np.nan
+            row["cls_label"] = cls.label if cls is not None else None
+            row["cls_confidence"] = cls.confidence if cls is not None else np.nan
+            for name, value in row.items():
+                self._buffer[name].append(value)
+            if self.logits:
+                logits = getattr(cls, "logits", None)
+                self._logits.append(None if logits is None else np.asarray(logits, dtype=np.float32).ravel())
+        self.frames += 1
+        if len(self._buffer["frame_id"]) >= self.batch_rows:
+            self.flush()
+
+    def flush(self) -> None:
+        count = len(self._buffer["frame_id"])
+        if not count:
+            return
+        numeric = {name: np.asarray(self._buffer[name], dtype=dtype) for name, dtype in COLUMNS.items()}
+        if self._npy is not None:
+            self._npy.append(numeric, {name: self._buffer[name] for name in CATEGORIES}, self._logits if self.logits else None)
+        else:
+            self._write_arrow(numeric)
+        self.rows += count
+        for values in self._buffer.values():
+            values.clear()
+        self._logits.clear()
+
+    def _write_arrow(self, numeric: Dict[str, np.ndarray]) -> None:
+        arrays = [pa.array(values) for values in numeric.values()]
+        arrays += [pa.array(self._buffer[name], type=pa.string()) for name in CATEGORIES]
+        if self.logits:
+            arrays.append(pa.array([None if v is None else v.tolist() for v in self._logits], type=pa.list_(pa.float32())))
+        batch = pa.RecordBatch.from_arrays(arrays, schema=_arrow_schema(self.logits))
+        if self._writer is None:
+            if self.format == "parquet":
+                self._writer = pq.ParquetWriter(self.path, batch.schema, compression=self.compression)
+            else:
+                self._writer = pa.ipc.new_file(self.path, batch.schema)
+        if self.format == "parquet":
+            self._writer.write_table(pa.Table.from_batches([batch]))
+        else:
+            self._writer.write_batch(batch)
+
+    def close(self) -> None:
+        self.flush()
+        if self._npy is not None:
+            self._npy.close(self.frames)
+            self._npy = None
+        elif self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        elif self.format != "npy" and pa is not None:
+            # No rows at all: still leave a readable, empty file behind
+            schema = _arrow_schema(self.logits)
+            if self.format == "parquet":
+                pq.write_table(schema.empty_table(), self.path)
+            else:
+                pa.ipc.new_file(self.path, schema).close()
+
+
+def _arrow_schema(logits: bool):
+    fields = [pa.field(name, pa.from_numpy_dtype(dtype)) for name, dtype in COLUMNS.items()]
+    fields += [pa.field(name, pa.string()) for name in CATEGORIES]
+    if logits:
+        fields.append(pa.field("logits", pa.list_(pa.float32())))
+    return pa.schema(fields)
+
+
+def _npy_header(dtype: np.dtype, shape: Sequence[int]) -> bytes:
+    header = "{'descr': %r, 'fortran_order': False, 'shape': %r, }" % (np.lib.format.dtype_to_descr(dtype), tuple(shape))
+    size = _NPY_HEADER_BYTES - 10  # magic (6) + version (2) + header length (2)
+    if len(header) >= size:
+        raise ValueError(f"Column shape {tuple(shape)} does not fit the fixed .npy header")
+    return b"\x93NUMPY\x01\x00" + struct.pack("<H", size) + header.ljust(size - 1).encode("latin1") + b"\n"
+
+
+class _NpyColumns:
+    """One growing ``.npy`` file per column; each header gets its final row count on ``close``."""
+
+    def __init__(self, directory: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.rows = 0
+        self.vocab: Dict[str, Dict[str, int]] = {name: {} for name in CATEGORIES}
+        self._files: Dict[str, Any] = {}
+        self._shapes: Dict[str, tuple] = {}
+        self._dtypes: Dict[str, np.dtype] = {}
+
+    def _write(self, name: str, array: np.ndarray) -> None:
+        handle = self._files.get(name)
+        if handle is None:
+            handle = self._files[name] = open(os.path.join(self.directory, f"{name}.npy"), "wb")
+            self._shapes[name] = array.shape[1:]
+            self._dtypes[name] = array.dtype
+            handle.write(_npy_header(array.dtype, (0,) + array.shape[1:]))
+        handle.write(np.ascontiguousarray(array).tobytes())
+
+    def append(self, numeric: Dict[str, np.ndarray], categories: Dict[str, List[Optional[str]]],
+               logits: Optional[List[Optional[np.ndarray]]]) -> None:
+        for name, values in numeric.items():
+            self._write(name, values)
+        for name, values in categories.items():
+            vocab = self.vocab[name]
+            codes = [-1 if v is None else vocab.setdefault(v, len(vocab)) for v in values]
+            self._write(name, np.asarray(codes, dtype=np.int32))
+        if logits is not None:
+            self._append_logits(logits)
+        self.rows += len(numeric["frame_id"])
+
+    def _append_logits(self, logits: List[Optional[np.ndarray]]) -> None:
+        width = self._shapes["logits"][0] if "logits" in self._files else next((len(v) for v in logits if v is not None), None)
+        if width is None:
+            return  # no logits seen yet; earlier rows are NaN-filled once the width is known
+        block = np.full((len(logits), width), np.nan, dtype=np.float32)
+        for i, values in enumerate(logits):
+            if values is not None:
+                if len(values) != width:
+                    raise ValueError(f"Logits of width {len(values)} in a column of width {width}")
+                block[i] = values
+        if "logits" not in self._files:
+            self._write("logits", np.full((self.rows, width), np.nan, dtype=np.float32))
+        self._write("logits", block)
+
+    def close(self, frames: int) -> None:
+        for name, handle in self._files.items():
+            handle.seek(0)
+            handle.write(_npy_header(self._dtypes[name], (self.rows,) + self._shapes[name]))
+            handle.close()
+        self._files.clear()
+        meta = {"rows": self.rows, "frames": frames, "categories": {name: list(vocab) for name, vocab in self.vocab.items()}}
+        with open(os.path.join(self.directory, "meta.json"), "w", encoding="utf-8") as handle:
+            json.dump(meta, handle)
+
+
+def read_results(path: str, columns: Optional[Sequence[str]] = None, format: Optional[str] = None):
+    """
+    Open a result file for analysis without reading it up front.
+
+    Arrow IPC files are memory-mapped and come back as a zero-copy
+    ``pyarrow.Table``. Parquet comes back as a ``pyarrow.Table`` read through a
+    memory map, limited to ``columns`` if given. An npy directory comes back as
+    a dict of ``np.memmap`` columns, with category codes decoded to object
+    arrays (None where missing).
+    """
+    format = format or infer_format(path)
+    if format == "npy":
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as handle:
+            meta = json.load(handle)
+        names = columns or [name[:-4] for name in sorted(os.listdir(path)) if name.endswith(".npy")]
+        out = {}
+        for name in names:
+            data = np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+            if name in CATEGORIES:
+                lookup = np.asarray(meta["categories"][name] + [None], dtype=object)  # code -1 -> None
+                data = lookup[data]
+            out[name] = data
+        return out
+    if pa is None:
+        raise RuntimeError(f"Reading {format} results requires pyarrow")
+    if format == "parquet":
+        return pq.read_table(path, columns=list(columns) if columns else None, memory_map=True)
+    table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+    return table.select(list(columns)) if columns else table
@@ -0,0 +1,157 @@
+"""Keyframe scheduling: full-frame detection every N frames, track-guided regions in between."""
+
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from ..config import SchedulingConfig
+
+Region = Tuple[int, int, int, int]  # x1, y1, x2, y2 in source-frame pixels
+
+
+def track_regions(boxes: Iterable[tuple], frame_size: Tuple[int, int], expand: float = 0.5, min_size: int = 96) -> List[Region]:
+    """
+    Search regions around predicted track boxes.
+
+    Each box grows by ``expand`` of its width/height on every side and to at
+    least ``min_size`` pixels, is clipped to the frame, and overlapping regions
+    are merged so no area is detected twice.
+
+    Args:
+        boxes: (x1, y1, x2, y2) boxes in frame pixels
+        frame_size: (width, height) of the frame
+        expand: Margin per side as a fraction of the box size
+        min_size: Minimum region width/height in pixels
+
+    Returns:
+        Disjoint integer regions
+    """
+    width, height = frame_size
+    regions = []
+    for x1, y1, x2, y2 in boxes:
+        cx, cy = (x1 + x2) / 2, (y1 + y2) / 2
+        w = int(round(max((x2 - x1) * (1 + 2 * expand), min_size)))
+        h = int(round(max((y2 - y1) * (1 + 2 * expand), min_size)))
+        left, top = int(round(cx - w / 2)), int(round(cy - h / 2))
+        region = [max(0, left), max(0, top), min(width, left + w), min(height, top + h)]
+        if region[2] > region[0] and region[3] > region[1]:
+            regions.append(region)
+
+    merged = True
+    while merged:
+        merged = False
+        for i in range(len(regions)):
+            for j in range(i + 1, len(regions)):
+                a, b = regions[i], regions[j]
+                if a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]:
+                    regions[i] = [min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])]
+                    del regions[j]
+                    merged = True
+                    break
+            if merged:
+                break
+    return [tuple(r) for r in regions]
+
+
+class KeyframeScheduler:
+    """
+    Decides per frame whether the detector sees the whole frame or only the regions around live tracks.
+
+    A frame is a keyframe when ``interval`` frames have passed since the last
+    one, when its small grayscale thumbnail differs from the last keyframe's by
+    more than ``scene_change_threshold`` (a camera cut, a tunnel exit), or when
+    there was no keyframe yet. With ``detect_budget_ms`` set, ``interval`` is
+    re-derived after every frame from running averages of the full-frame and
+    region detection times, so that the mean detection time per frame stays
+    within the budget:
+
+        (full_ms + (N - 1) * roi_ms) / N <= budget
+
+    Signs that appear between keyframes are found at the next keyframe, so
+    ``max_interval`` bounds that delay.
+    """
+
+    THUMBNAIL = (32, 18)
+
+    def __init__(self, cfg: Optional[SchedulingConfig] = None, smoothing: float = 0.2) -> None:
+        """
+        Args:
+            cfg: Scheduling settings
+            smoothing: Weight of the newest sample in the running detection-time averages
+        """
+        self.cfg = cfg or SchedulingConfig()
+        self.smoothing = smoothing
+        self.interval = self._clamp(self.cfg.keyframe_interval)
+        self.full_ms: Optional[float] = None
+        self.roi_ms: Optional[float] = None
+        self.keyframes = 0
+        self.roi_frames = 0
+        self.scene_changes = 0
+        self._last_keyframe: Optional[int] = None
+        self._thumbnail: Optional[np.ndarray] = None
+
+    def _clamp(self, interval: int) -> int:
+        return int(min(max(interval, self.cfg.min_interval, 1), max(self.cfg.max_interval, 1)))
+
+    def _make_thumbnail(self, frame: np.ndarray) -> np.ndarray:
+        # Subsample before resizing so the cost stays well under a millisecond at 1080p.
+        step = max(1, min(frame.shape[0], frame.shape[1]) // 144)
+        small = frame[::step, ::step]
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.resize(small, self.THUMBNAIL, interpolation=cv2.INTER_AREA)
+
+    def scene_difference(self, thumbnail: np.ndarray) -> float:
+        """Mean absolute difference (0-1) between ``thumbnail`` and the last keyframe's."""
+        if self._thumbnail is None:
+            return 1.0
+        return float(cv2.absdiff(thumbnail, self._thumbnail).mean()) / 255.0
+
+    def is_keyframe(self, frame_id: int, frame: np.ndarray) -> bool:
+        """Decide for ``frame`` and update the keyframe bookkeeping."""
+        thumbnail = self._make_thumbnail(frame)
+        keyframe = self._last_keyframe is None or frame_id - self._last_keyframe >= self.interval
+        if not keyframe and self.scene_difference(thumbnail) > self.cfg.scene_change_threshold:
+            keyframe = True
+            self.scene_changes += 1
+        if keyframe:
+            self._last_keyframe = frame_id
+            self._thumbnail = thumbnail
+            self.keyframes += 1
+        else:
+            self.roi_frames += 1
+        return keyframe
+
+    def record(self, keyframe: bool, elapsed_ms: float) -> None:
+        """Feed back how long detection took on a frame and adapt the interval to the budget."""
+        if keyframe:
+            self.full_ms = self._average(self.full_ms, elapsed_ms)
+        else:
+            self.roi_ms = self._average(self.roi_ms, elapsed_ms)
+        if self.cfg.detect_budget_ms is not None and self.full_ms is not None:
+            self.interval = self.interval_for_budget(self.cfg.detect_budget_ms, self.full_ms, self.roi_ms or 0.0)
+
+    def _average(self, current: Optional[float], sample: float) -> float:
+        if current is None:
+            return sample
+        return (1.0 - self.smoothing) * current + self.smoothing * sample
+
+    def interval_for_budget(self, budget_ms: float, full_ms: float, roi_ms: float) -> int:
+        """Smallest keyframe interval whose mean detection time per frame fits ``budget_ms``."""
+        if full_ms <= budget_ms:
+            return self._clamp(self.cfg.min_interval)
+        if roi_ms >= budget_ms:
+            return self._clamp(self.cfg.max_interval)
+        return self._clamp(math.ceil((full_ms - roi_ms) / (budget_ms - roi_ms)))
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "interval": self.interval,
+            "keyframes": self.keyframes,
+            "roi_frames": self.roi_frames,
+            "scene_changes": self.scene_changes,
+            "full_ms": self.full_ms or 0.0,
+            "roi_ms": self.roi_ms or 0.0,
+        }
@@ -0,0 +1,119 @@
+"""Threaded multi-stage executor connecting pipeline stages with bounded queues."""
+
+import threading
+from queue import Empty, Full, Queue
+from typing import Any, Callable, Dict, Generator, Iterable, List, Optional, Tuple
+
+_SENTINEL = object()
+
+
+class _StageFailure:
+    """Carries an exception raised inside a stage down to the consumer."""
+
+    def __init__(self, stage: str, error: BaseException) -> None:
+        self.stage = stage
+        self.error = error
+
+
+class StagedExecutor:
+    """
+    Run a chain of stage functions, each on its own worker thread.
+
+    Stages are connected by bounded queues, so a slow stage applies backpressure
+    upstream instead of letting frames pile up in memory. Every stage has exactly
+    one worker and queues are FIFO, so items leave in the order they entered.
+    Throughput approaches that of the slowest stage rather than the sum of all
+    stages, as long as the stages release the GIL (OpenCV, PyTorch, onnxruntime).
+    """
+
+    def __init__(self, stages: List[Tuple[str, Callable[[Any], Any]]], queue_size: int = 2, poll_interval: float = 0.05):
+        """
+        Args:
+            stages: Ordered ``(name, fn)`` pairs; each ``fn`` maps an item to the next stage's input
+            queue_size: Capacity of the queue in front of each stage
+            poll_interval: Seconds between shutdown checks while blocked on a queue
+        """
+        if not stages:
+            raise ValueError("StagedExecutor needs at least one stage")
+        self.stages = stages
+        self.queue_size = max(1, queue_size)
+        self.poll_interval = poll_interval
+        # _queues[i] feeds stage i; the last queue holds finished items
+        self._queues: List[Queue] = [Queue(maxsize=self.queue_size) for _ in range(len(stages) + 1)]
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def queue_depths(self) -> Dict[str, int]:
+        """Number of items waiting in front of each stage (and at the output)."""
+        depths = {name: self._queues[i].qsize() for i, (name, _) in enumerate(self.stages)}
+        depths["output"] = self._queues[-1].qsize()
+        return depths
+
+    def run(self, items: Iterable[Any]) -> Generator[Any, None, None]:
+        """Feed ``items`` through every stage and yield the outputs in input order."""
+        self._stop.clear()
+        self._threads = [threading.Thread(target=self._feed, args=(items,), daemon=True, name="stage-feed")]
+        for idx, (name, fn) in enumerate(self.stages):
+            self._threads.append(threading.Thread(target=self._work, args=(idx, fn), daemon=True, name=f"stage-{name}"))
+        for thread in self._threads:
+            thread.start()
+
+        output = self._queues[-1]
+        try:
+            while True:
+                try:
+                    item = output.get(timeout=self.poll_interval)
+                except Empty:
+                    continue
+                if item is _SENTINEL:
+                    break
+                if isinstance(item, _StageFailure):
+                    raise RuntimeError(f"Pipeline stage '{item.stage}' failed: {item.error}") from item.error
+                yield item
+        finally:
+            self.stop()
+
+    def stop(self) -> None:
+        """Signal all workers to exit and wait briefly for them."""
+        self._stop.set()
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout=1.0)
+
+    def _put(self, queue: Queue, item: Any) -> bool:
+        while not self._stop.is_set():
+            try:
+                queue.put(item, timeout=self.poll_interval)
+                return True
+            except Full:
+                continue
+        return False
+
+    def _feed(self, items: Iterable[Any]) -> None:
+        try:
+            for item in items:
+                if not self._put(self._queues[0], item):
+                    return
+        except Exception as exc:  # source errors surface at the consumer
+            self._put(self._queues[0], _StageFailure("source", exc))
+        self._put(self._queues[0], _SENTINEL)
+
+    def _work(self, idx: int, fn: Callable[[Any], Any]) -> None:
+        inbox, outbox = self._queues[idx], self._queues[idx + 1]
+        name = self.stages[idx][0]
+        while not self._stop.is_set():
+            try:
+                item = inbox.get(timeout=self.poll_interval)
+            except Empty:
+                continue
+            if item is _SENTINEL or isinstance(item, _StageFailure):
+                self._put(outbox, item)
+                if item is _SENTINEL:
+                    return
+                continue
+            try:
+                result: Optional[Any] = fn(item)
+            except Exception as exc:
+                self._put(outbox, _StageFailure(name, exc))
+                continue
+            self._put(outbox, result)
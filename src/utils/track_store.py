@@ -0,0 +1,132 @@
+"""Structure-of-arrays storage for tracker state."""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .kalman import STATE_DIM
+
+
+class TrackStore:
+    """
+    Preallocated NumPy arrays holding every live track, one row per track.
+
+    Rows of removed tracks are marked inactive and reused by later tracks, so
+    steady-state tracking allocates nothing per frame. The arrays only grow
+    (doubling) when more tracks are alive at once than ever before. Per-track
+    confidence history is a fixed-width ring buffer instead of a Python list.
+    """
+
+    def __init__(self, capacity: int = 64, history: int = 10) -> None:
+        """
+        Args:
+            capacity: Initial number of track rows
+            history: Length of the per-track confidence ring buffer
+        """
+        self.history = max(1, history)
+        self.capacity = 0
+        self.label_names: List[str] = []
+        self._label_codes: Dict[str, int] = {}
+        self._row_of: Dict[int, int] = {}
+        self._allocate(max(1, capacity))
+
+    def _allocate(self, capacity: int) -> None:
+        old = self.capacity
+        fields = {
+            "ids": ((), np.int64),
+            "active": ((), bool),
+            "labels": ((), np.int32),
+            "bbox": ((4,), np.float64),
+            "confidence": ((), np.float64),
+            "conf_hist": ((self.history,), np.float64),
+            "hist_len": ((), np.int32),
+            "hist_pos": ((), np.int32),
+            "hits": ((), np.int32),
+            "last_frame": ((), np.int64),
+            "last_seen": ((), np.float64),
+            "kf_x": ((STATE_DIM,), np.float64),
+            "kf_P": ((STATE_DIM, STATE_DIM), np.float64),
+        }
+        for name, (shape, dtype) in fields.items():
+            arr = np.zeros((capacity,) + shape, dtype=dtype)
+            if old:
+                arr[:old] = getattr(self, name)
+            setattr(self, name, arr)
+        self.capacity = capacity
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    def label_code(self, label: str) -> int:
+        code = self._label_codes.get(label)
+        if code is None:
+            code = self._label_codes[label] = len(self.label_names)
+            self.label_names.append(label)
+        return code
+
+    def row_of(self, track_id: int) -> Optional[int]:
+        return self._row_of.get(track_id)
+
+    def active_rows(self) -> np.ndarray:
+        """Rows of live tracks, ordered by track ID (i.e. creation order)."""
+        rows = np.flatnonzero(self.active)
+        return rows[np.argsort(self.ids[rows], kind="stable")]
+
+    def add(self, ids: np.ndarray, labels: np.ndarray, bboxes: np.ndarray, confidences: np.ndarray,
+            frame: int, now: float, kf_x: np.ndarray, kf_P: np.ndarray) -> np.ndarray:
+        """Insert new tracks into free rows and return those rows."""
+        n = len(ids)
+        free = np.flatnonzero(~self.active)
+        if len(free) < n:
+            capacity = self.capacity
+            while capacity - len(self) < n:
+                capacity *= 2
+            self._allocate(capacity)
+            free = np.flatnonzero(~self.active)
+        rows = free[:n]
+        self.ids[rows] = ids
+        self.active[rows] = True
+        self.labels[rows] = labels
+        self.bbox[rows] = bboxes
+        self.confidence[rows] = confidences
+        self.conf_hist[rows] = 0.0
+        self.hist_len[rows] = 0
+        self.hist_pos[rows] = 0
+        self.hits[rows] = 1
+        self.last_frame[rows] = frame
+        self.last_seen[rows] = now
+        self.kf_x[rows] = kf_x
+        self.kf_P[rows] = kf_P
+        self.push_confidence(rows, confidences)
+        for row, tid in zip(rows.tolist(), np.asarray(ids).tolist()):
+            self._row_of[tid] = row
+        return rows
+
+    def remove(self, rows: np.ndarray) -> None:
+        if len(rows) == 0:
+            return
+        self.active[rows] = False
+        for tid in self.ids[rows].tolist():
+            self._row_of.pop(tid, None)
+
+    def push_confidence(self, rows: np.ndarray, confidences: np.ndarray) -> None:
+        self.conf_hist[rows, self.hist_pos[rows]] = confidences
+        self.hist_pos[rows] = (self.hist_pos[rows] + 1) % self.history
+        self.hist_len[rows] = np.minimum(self.hist_len[rows] + 1, self.history)
+
+    def avg_confidence(self, rows: np.ndarray) -> np.ndarray:
+        # Unused ring slots are zero, so a plain row sum is the sum of the history.
+        counts = np.maximum(self.hist_len[rows], 1)
+        return self.conf_hist[rows].sum(axis=1) / counts
+
+    def confidence_history(self, row: int) -> List[float]:
+        """Confidence history of one track, oldest first."""
+        n, pos = int(self.hist_len[row]), int(self.hist_pos[row])
+        ordered = np.roll(self.conf_hist[row], -pos) if n == self.history else self.conf_hist[row, :n]
+        return ordered.tolist()
+
+    def clear(self) -> None:
+        self.active[:] = False
+        self._row_of.clear()
+        self.label_names.clear()
+        self._label_codes.clear()
@@ -5,13 +5,85 @@ from dataclasses import dataclass, field
 import time
 import numpy as np
 
+from .kalman import ConstantVelocityKalman, state_to_bbox
+from .track_store import TrackStore
+
+try:
+    from scipy.optimize import linear_sum_assignment  # type: ignore
+except ImportError:  # pragma: no cover - optional
+    linear_sum_assignment = None
+
 if TYPE_CHECKING:
     from .types import Detection
 
 
+def iou_matrix(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """
+    Pairwise IoU between two sets of (x1, y1, x2, y2) boxes.
+    
+    Args:
+        boxes_a: Array of shape (N, 4)
+        boxes_b: Array of shape (M, 4)
+    
+    Returns:
+        IoU matrix of shape (N, M)
+    """
+    a = np.asarray(boxes_a, dtype=np.float64).reshape(-1, 4)
+    b = np.asarray(boxes_b, dtype=np.float64).reshape(-1, 4)
+    ix1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    iy1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    ix2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    iy2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(ix2 - ix1, 0, None) * np.clip(iy2 - iy1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+
+
+def linear_assignment(cost: np.ndarray, max_cost: float) -> List[Tuple[int, int]]:
+    """
+    Solve a rectangular assignment problem, keeping only pairs with ``cost < max_cost``.
+    
+    Uses SciPy's Jonker-Volgenant solver when available (optimal), otherwise a
+    vectorized greedy pass that takes the cheapest remaining pair first.
+    
+    Args:
+        cost: Cost matrix of shape (n_rows, n_cols); ``inf`` marks forbidden pairs
+        max_cost: Pairs at or above this cost are discarded
+    
+    Returns:
+        List of (row, col) index pairs
+    """
+    if cost.size == 0:
+        return []
+    feasible = cost < max_cost
+    if not feasible.any():
+        return []
+    
+    if linear_sum_assignment is not None:
+        # Forbidden pairs get a cost larger than any feasible assignment so the
+        # solver never prefers them; they are filtered out afterwards.
+        bounded = np.where(feasible, cost, max_cost + cost.shape[0] + cost.shape[1] + 1.0)
+        rows, cols = linear_sum_assignment(bounded)
+        return [(int(r), int(c)) for r, c in zip(rows, cols) if feasible[r, c]]
+    
+    rows, cols = np.nonzero(feasible)
+    order = np.argsort(cost[rows, cols], kind="stable")
+    used_rows = np.zeros(cost.shape[0], dtype=bool)
+    used_cols = np.zeros(cost.shape[1], dtype=bool)
+    matches = []
+    for r, c in zip(rows[order], cols[order]):
+        if used_rows[r] or used_cols[c]:
+            continue
+        used_rows[r] = used_cols[c] = True
+        matches.append((int(r), int(c)))
+    return matches
+
+
 @dataclass
 class TrackedObject:
-    """Represents a tracked object across frames with enhanced tracking metadata."""
+    """Snapshot of a tracked object's state, built on demand from the track store."""
     track_id: int
     label: str
     confidence: float
@@ -19,45 +91,27 @@ class TrackedObject:
     last_seen: float = field(default_factory=time.time)
     frame_count: int = 0
     confidence_history: List[float] = field(default_factory=list)
-    bbox_history: List[tuple] = field(default_factory=list)
-    velocity: Tuple[float, float] = (0.0, 0.0)  # (vx, vy)
+    velocity: Tuple[float, float] = (0.0, 0.0)  # (vx, vy) in pixels per frame, from the Kalman state
     avg_confidence: float = 0.0
-    
-    def update_history(self, confidence: float, bbox: tuple, max_history: int = 10):
-        """Update tracking history and calculate statistics."""
-        self.confidence_history.append(confidence)
-        self.bbox_history.append(bbox)
-        
-        # Keep only recent history
-        if len(self.confidence_history) > max_history:
-            self.confidence_history = self.confidence_history[-max_history:]
-        if len(self.bbox_history) > max_history:
-            self.bbox_history = self.bbox_history[-max_history:]
-        
-        # Calculate average confidence
-        self.avg_confidence = sum(self.confidence_history) / len(self.confidence_history)
-        
-        # Calculate velocity (center displacement)
-        if len(self.bbox_history) >= 2:
-            prev_center = self._get_center(self.bbox_history[-2])
-            curr_center = self._get_center(self.bbox_history[-1])
-            self.velocity = (curr_center[0] - prev_center[0], curr_center[1] - prev_center[1])
-    
-    @staticmethod
-    def _get_center(bbox: tuple) -> Tuple[float, float]:
-        """Get center point of bounding box."""
-        x1, y1, x2, y2 = bbox
-        return ((x1 + x2) / 2, (y1 + y2) / 2)
+    last_frame: int = 0  # tracker frame index of the last matched detection
 
 
 class EnhancedTracker:
     """
-    Enhanced tracker for road signs with IoU-based matching, Kalman filtering hints,
-    and velocity prediction for improved tracking accuracy.
+    Enhanced tracker for road signs with IoU-based matching and a constant-velocity
+    Kalman filter per track.
+    
+    All track state lives in a structure-of-arrays ``TrackStore`` (boxes, Kalman
+    states, confidence ring buffers, hit counts), so prediction, ageing and
+    correction are vectorized across tracks and memory stays flat over a long
+    drive. Tracks age in frames: a track is dropped once ``max_age`` frames pass
+    without a match, independent of how long each frame took to process.
+    Passing ``frame_id`` to ``update`` counts dropped frames too.
     """
     
     def __init__(self, iou_threshold: float = 0.3, max_age: int = 30, min_stable: int = 3, 
-                 use_prediction: bool = True, confidence_decay: float = 0.95):
+                 use_prediction: bool = True, confidence_decay: float = 0.95,
+                 capacity: int = 64, history: int = 10):
         """
         Initialize enhanced tracker.
         
@@ -67,213 +121,196 @@ class EnhancedTracker:
             min_stable: Minimum number of frames for a track to be considered stable
             use_prediction: Enable velocity-based position prediction
             confidence_decay: Decay factor for tracks without updates
+            capacity: Initial number of preallocated track slots
+            history: Length of the per-track confidence history
         """
         self.iou_threshold = iou_threshold
         self.max_age = max_age
         self.min_stable = min_stable
         self.use_prediction = use_prediction
         self.confidence_decay = confidence_decay
-        self.tracks: Dict[int, TrackedObject] = {}
+        self.store = TrackStore(capacity=capacity, history=history)
+        self.kalman = ConstantVelocityKalman()
         self.next_id = 0
         self.frame_count = 0
+        self._frame_index = -1
     
-    def update(self, detections: List) -> List:
+    @property
+    def tracks(self) -> Dict[int, TrackedObject]:
+        """Snapshots of all active tracks keyed by track ID."""
+        return {int(self.store.ids[row]): self._snapshot(row) for row in self.store.active_rows()}
+    
+    def update(self, detections: List, frame_id: Optional[int] = None) -> List:
         """
         Update tracks with new detections using enhanced matching.
         
         Args:
             detections: List of Detection objects
+            frame_id: Source frame index; gaps since the previous call (dropped
+                frames) count towards ageing and are predicted over. Defaults to
+                one frame per call.
         
         Returns:
             List of Detection objects with updated track_id fields
         """
-        current_time = time.time()
+        store = self.store
+        now = time.time()
         self.frame_count += 1
+        frame_index = frame_id if frame_id is not None else self._frame_index + 1
+        dt = max(1, frame_index - self._frame_index) if self._frame_index >= 0 else 1
+        self._frame_index = frame_index
         
-        # Predict positions for existing tracks
-        if self.use_prediction:
-            self._predict_positions()
+        # Remove tracks that have gone unmatched for more than max_age frames
+        rows = store.active_rows()
+        expired = (frame_index - store.last_frame[rows]) > self.max_age
+        store.remove(rows[expired])
+        rows = rows[~expired]
         
-        # Remove old tracks
-        self.tracks = {
-            tid: track for tid, track in self.tracks.items()
-            if (current_time - track.last_seen) < self.max_age
-        }
-        
-        if not detections:
-            return []
-        
-        # Build cost matrix for Hungarian algorithm (simplified greedy matching)
-        cost_matrix = self._build_cost_matrix(detections)
+        # Predict positions for existing tracks
+        self._predict_positions(rows, dt)
         
-        # Match detections to existing tracks
-        matched_tracks = set()
-        matched_detections = set()
+        matched = np.zeros(len(rows), dtype=bool)
         updated_detections = []
         
-        # Greedy matching: sort by IoU score (best matches first)
-        matches = []
-        for det_idx, detection in enumerate(detections):
-            bbox = detection.bbox
-            label = detection.label
-            confidence = detection.confidence
+        if detections:
+            # Solve the detection-track assignment on the full cost matrix
+            cost_matrix = self._build_cost_matrix(detections, rows)
+            matches = linear_assignment(cost_matrix, max_cost=1.0 - self.iou_threshold)
             
-            best_match = None
-            best_score = self.iou_threshold
-            
-            # Find best matching track
-            for tid, track in self.tracks.items():
-                if tid in matched_tracks:
-                    continue
-                
-                # Skip if labels don't match
-                if track.label != label:
-                    continue
+            if matches:
+                det_idx = np.array([d for d, _ in matches])
+                col_idx = np.array([t for _, t in matches])
+                match_rows = rows[col_idx]
+                measured = np.array([detections[d].bbox for d in det_idx], dtype=np.float64)
+                confidences = np.array([detections[d].confidence for d in det_idx], dtype=np.float64)
                 
-                # Calculate IoU score
-                iou = self._calculate_iou(bbox, track.bbox)
+                # Correct the matched Kalman states in one vectorized step
+                store.kf_x[match_rows], store.kf_P[match_rows] = self.kalman.update(
+                    store.kf_x[match_rows], store.kf_P[match_rows], measured
+                )
+                store.bbox[match_rows] = state_to_bbox(store.kf_x[match_rows])
+                store.confidence[match_rows] = confidences
+                store.last_frame[match_rows] = frame_index
+                store.last_seen[match_rows] = now
+                store.hits[match_rows] += 1
+                store.push_confidence(match_rows, confidences)
+                matched[col_idx] = True
                 
-                # Apply confidence weighting
-                score = iou * 0.7 + (confidence * track.avg_confidence) * 0.3
-                
-                if score > best_score:
-                    best_score = score
-                    best_match = tid
-            
-            if best_match is not None:
-                matches.append((det_idx, best_match, best_score))
-        
-        # Sort matches by score (descending)
-        matches.sort(key=lambda x: x[2], reverse=True)
-        
-        # Apply matches
-        for det_idx, track_id, score in matches:
-            if det_idx in matched_detections or track_id in matched_tracks:
-                continue
-            
-            detection = detections[det_idx]
-            track = self.tracks[track_id]
-            
-            # Update existing track
-            track.bbox = detection.bbox
-            track.confidence = detection.confidence
-            track.last_seen = current_time
-            track.frame_count += 1
-            track.update_history(detection.confidence, detection.bbox)
-            matched_tracks.add(track_id)
-            matched_detections.add(det_idx)
+                # Update detections with track_id
+                for d, row in zip(det_idx.tolist(), match_rows.tolist()):
+                    detection = detections[d]
+                    detection.track_id = int(store.ids[row])
+                    updated_detections.append(detection)
+                matched_detections = set(det_idx.tolist())
+            else:
+                matched_detections = set()
             
-            # Update detection with track_id
-            detection.track_id = track_id
-            updated_detections.append(detection)
-        
-        # Create new tracks for unmatched detections
-        for det_idx, detection in enumerate(detections):
-            if det_idx in matched_detections:
-                continue
-            
-            new_track = TrackedObject(
-                track_id=self.next_id,
-                label=detection.label,
-                confidence=detection.confidence,
-                bbox=detection.bbox,
-                last_seen=current_time,
-                frame_count=1
-            )
-            new_track.update_history(detection.confidence, detection.bbox)
-            self.tracks[self.next_id] = new_track
-            
-            # Update detection with new track_id
-            detection.track_id = self.next_id
-            updated_detections.append(detection)
-            self.next_id += 1
+            # Create new tracks for unmatched detections
+            new = [detection for d, detection in enumerate(detections) if d not in matched_detections]
+            if new:
+                ids = np.arange(self.next_id, self.next_id + len(new))
+                boxes = np.array([d.bbox for d in new], dtype=np.float64)
+                confidences = np.array([d.confidence for d in new], dtype=np.float64)
+                labels = np.array([store.label_code(d.label) for d in new], dtype=np.int32)
+                kf_x, kf_P = self.kalman.initiate(boxes)
+                store.add(ids, labels, boxes, confidences, frame_index, now, kf_x, kf_P)
+                for tid, detection in zip(ids.tolist(), new):
+                    detection.track_id = tid
+                    updated_detections.append(detection)
+                self.next_id += len(new)
         
         # Apply confidence decay to unmatched tracks
-        for tid, track in self.tracks.items():
-            if tid not in matched_tracks:
-                track.confidence *= self.confidence_decay
+        store.confidence[rows[~matched]] *= self.confidence_decay
         
         return updated_detections
     
-    def _predict_positions(self):
-        """Predict future positions of tracks based on velocity."""
-        for track in self.tracks.values():
-            if track.frame_count > 1 and track.velocity != (0.0, 0.0):
-                x1, y1, x2, y2 = track.bbox
-                vx, vy = track.velocity
-                # Simple linear prediction
-                track.bbox = (x1 + vx, y1 + vy, x2 + vx, y2 + vy)
+    def _predict_positions(self, rows: np.ndarray, dt: int = 1):
+        """Advance the Kalman states of ``rows`` by ``dt`` frames and use the prediction for matching."""
+        if len(rows) == 0:
+            return
+        store = self.store
+        store.kf_x[rows], store.kf_P[rows] = self.kalman.predict(store.kf_x[rows], store.kf_P[rows], dt)
+        if self.use_prediction:
+            store.bbox[rows] = state_to_bbox(store.kf_x[rows])
+    
+    def predicted_bbox(self, track_id: int) -> Optional[tuple]:
+        """Current Kalman estimate of a track's box, or None for unknown tracks."""
+        row = self.store.row_of(track_id)
+        if row is None:
+            return None
+        return tuple(float(v) for v in state_to_bbox(self.store.kf_x[row:row + 1])[0])
+    
+    def predict_boxes(self, frame_id: Optional[int] = None) -> Dict[int, tuple]:
+        """
+        Where every live track is expected to be at ``frame_id``, without changing any state.
+    
+        Tracks that would expire by then are left out. Defaults to the frame after
+        the last ``update``.
+        """
+        store = self.store
+        rows = store.active_rows()
+        frame_index = frame_id if frame_id is not None else self._frame_index + 1
+        rows = rows[(frame_index - store.last_frame[rows]) <= self.max_age]
+        if len(rows) == 0:
+            return {}
+        dt = max(1, frame_index - self._frame_index)
+        x, _ = self.kalman.predict(store.kf_x[rows], store.kf_P[rows], dt)
+        boxes = state_to_bbox(x)
+        return {int(store.ids[row]): tuple(float(v) for v in box) for row, box in zip(rows.tolist(), boxes)}
     
-    def _build_cost_matrix(self, detections: List) -> np.ndarray:
+    def _build_cost_matrix(self, detections: List, rows: Optional[np.ndarray] = None) -> np.ndarray:
         """
         Build cost matrix for detection-track matching.
         
+        The match score mirrors the original weighting (0.7 * IoU plus 0.3 * the
+        product of detection and track confidence); cost is ``1 - score``. Pairs
+        with different labels get an infinite cost so they can never match.
+        
         Args:
             detections: List of Detection objects
+            rows: Track-store rows giving the column order (defaults to all active tracks)
         
         Returns:
-            Cost matrix (lower is better)
+            Cost matrix of shape (n_detections, n_tracks) (lower is better)
         """
+        store = self.store
+        if rows is None:
+            rows = store.active_rows()
         n_detections = len(detections)
-        n_tracks = len(self.tracks)
+        n_tracks = len(rows)
         
         if n_detections == 0 or n_tracks == 0:
-            return np.array([])
+            return np.zeros((n_detections, n_tracks))
         
-        cost_matrix = np.zeros((n_detections, n_tracks))
+        det_boxes = np.array([d.bbox for d in detections], dtype=np.float64)
+        det_conf = np.array([d.confidence for d in detections], dtype=np.float64)
+        track_conf = store.avg_confidence(rows)
         
-        for i, detection in enumerate(detections):
-            for j, (tid, track) in enumerate(self.tracks.items()):
-                if detection.label != track.label:
-                    cost_matrix[i, j] = 1.0  # High cost for label mismatch
-                else:
-                    iou = self._calculate_iou(detection.bbox, track.bbox)
-                    cost_matrix[i, j] = 1.0 - iou  # Convert IoU to cost
+        score = 0.7 * iou_matrix(det_boxes, store.bbox[rows]) + 0.3 * np.outer(det_conf, track_conf)
+        cost = 1.0 - score
         
-        return cost_matrix
+        # Label gating via integer codes so the comparison stays vectorized
+        det_labels = np.array([store.label_code(d.label) for d in detections])
+        cost[det_labels[:, None] != store.labels[rows][None, :]] = np.inf
+        return cost
     
-    @staticmethod
-    def _calculate_iou(box1: tuple, box2: tuple) -> float:
-        """
-        Calculate Intersection over Union between two bounding boxes.
-        
-        Args:
-            box1: First bounding box (x1, y1, x2, y2)
-            box2: Second bounding box (x1, y1, x2, y2)
-        
-        Returns:
-            IoU score between 0.0 and 1.0
-        """
-        x1_min, y1_min, x1_max, y1_max = box1
-        x2_min, y2_min, x2_max, y2_max = box2
-        
-        # Calculate intersection area
-        inter_x_min = max(x1_min, x2_min)
-        inter_y_min = max(y1_min, y2_min)
-        inter_x_max = min(x1_max, x2_max)
-        inter_y_max = min(y1_max, y2_max)
-        
-        if inter_x_max < inter_x_min or inter_y_max < inter_y_min:
-            return 0.0
-        
-        inter_area = (inter_x_max - inter_x_min) * (inter_y_max - inter_y_min)
-        
-        # Calculate union area
-        box1_area = (x1_max - x1_min) * (y1_max - y1_min)
-        box2_area = (x2_max - x2_min) * (y2_max - y2_min)
-        union_area = box1_area + box2_area - inter_area
-        
-        return inter_area / union_area if union_area > 0 else 0.0
+    def _snapshot(self, row: int) -> TrackedObject:
+        store = self.store
+        return TrackedObject(
+            track_id=int(store.ids[row]),
+            label=store.label_names[store.labels[row]],
+            confidence=float(store.confidence[row]),
+            bbox=tuple(float(v) for v in store.bbox[row]),
+            last_seen=float(store.last_seen[row]),
+            frame_count=int(store.hits[row]),
+            confidence_history=store.confidence_history(row),
+            velocity=(float(store.kf_x[row, 4]), float(store.kf_x[row, 5])),
+            avg_confidence=float(store.avg_confidence(np.array([row]))[0]),
+            last_frame=int(store.last_frame[row]),
+        )
     
-    @staticmethod
-    def _calculate_center_distance(box1: tuple, box2: tuple) -> float:
-        """Calculate Euclidean distance between box centers."""
-        x1_center = (box1[0] + box1[2]) / 2
-        y1_center = (box1[1] + box1[3]) / 2
-        x2_center = (box2[0] + box2[2]) / 2
-        y2_center = (box2[1] + box2[3]) / 2
-        
-        return np.sqrt((x1_center - x2_center)**2 + (y1_center - y2_center)**2)
+    def _stable_mask(self, rows: np.ndarray) -> np.ndarray:
+        return (self.store.hits[rows] >= self.min_stable) & (self.store.avg_confidence(rows) >= 0.5)
     
     def is_stable(self, track_id: int) -> bool:
         """
@@ -285,10 +322,10 @@ class EnhancedTracker:
         Returns:
             True if the track is stable, False otherwise
         """
-        if track_id not in self.tracks:
+        row = self.store.row_of(track_id) if track_id is not None else None
+        if row is None:
             return False
-        track = self.tracks[track_id]
-        return track.frame_count >= self.min_stable and track.avg_confidence >= 0.5
+        return bool(self._stable_mask(np.array([row]))[0])
     
     def get_stable_tracks(self) -> List[TrackedObject]:
         """
@@ -297,10 +334,8 @@ class EnhancedTracker:
         Returns:
             List of TrackedObject instances that are stable
         """
-        return [
-            track for track in self.tracks.values() 
-            if track.frame_count >= self.min_stable and track.avg_confidence >= 0.5
-        ]
+        rows = self.store.active_rows()
+        return [self._snapshot(row) for row in rows[self._stable_mask(rows)]]
     
     def get_track_by_id(self, track_id: int) -> Optional[TrackedObject]:
         """
@@ -312,15 +347,16 @@ class EnhancedTracker:
         Returns:
             TrackedObject if found, None otherwise
         """
-        return self.tracks.get(track_id)
+        row = self.store.row_of(track_id)
+        return self._snapshot(row) if row is not None else None
     
     def get_all_tracks(self) -> List[TrackedObject]:
         """Get all active tracks."""
-        return list(self.tracks.values())
+        return [self._snapshot(row) for row in self.store.active_rows()]
     
     def get_track_count(self) -> int:
         """Get the number of active tracks."""
-        return len(self.tracks)
+        return len(self.store)
     
     def get_statistics(self) -> Dict[str, any]:
         """
@@ -329,14 +365,15 @@ class EnhancedTracker:
         Returns:
             Dictionary with tracking metrics
         """
-        total_tracks = len(self.tracks)
-        stable_tracks = len(self.get_stable_tracks())
+        rows = self.store.active_rows()
+        total_tracks = len(rows)
+        stable_tracks = int(self._stable_mask(rows).sum())
         
         avg_confidence = 0.0
         avg_frame_count = 0.0
         if total_tracks > 0:
-            avg_confidence = sum(t.avg_confidence for t in self.tracks.values()) / total_tracks
-            avg_frame_count = sum(t.frame_count for t in self.tracks.values()) / total_tracks
+            avg_confidence = float(self.store.avg_confidence(rows).mean())
+            avg_frame_count = float(self.store.hits[rows].mean())
         
         return {
             'total_tracks': total_tracks,
@@ -349,10 +386,11 @@ class EnhancedTracker:
     
     def reset(self):
         """Reset the tracker, clearing all tracks and statistics."""
-        self.tracks.clear()
+        self.store.clear()
         self.next_id = 0
         self.frame_count = 0
+        self._frame_index = -1
 
 
 # Backward compatibility alias
-SimpleTracker = EnhancedTracker
\ No newline at end of file
+SimpleTracker = EnhancedTracker
@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 import numpy as np
 
 
@@ -30,3 +30,8 @@ class FrameResult:
     safety_tier: str = "unknown"
     manual_override: bool = False
     stage_latency: Optional[Dict[str, float]] = None
+    classifications: Optional[List[Optional[ClassificationResult]]] = None  # aligned with detections
+    stats: Optional[Dict[str, Any]] = None  # runtime counters, e.g. per-stage queue depth
+    source_id: Optional[str] = None  # camera name in multi-camera mode
+    frame_age_ms: float = 0.0  # capture (decode finished) to result; latency_ms starts when the pipeline admits the frame
+    dropped_frames: int = 0  # frames the source dropped so far because the pipeline was busy
@@ -1,26 +1,176 @@
 import cv2
+import numpy as np
 import threading
 import time
+from collections import deque
 from queue import Queue, Full, Empty
 from typing import Generator, Optional, Union
 
+from .decode import decode_stride, open_capture
+from .frame_ring import FrameRef, SharedFrameRing
+
+
+class CapturedFrame(tuple):
+    """
+    ``(frame_id, frame)`` pair as yielded by ``FrameStream.frames()``, so existing
+    ``for frame_id, frame in ...`` loops keep working. It also carries
+    ``captured_at`` (``time.perf_counter()`` when decoding finished) and
+    ``dropped`` (frames the stream had dropped by then).
+    """
+
+    def __new__(cls, frame_id: int, frame, captured_at: float, dropped: int = 0):
+        item = super().__new__(cls, (frame_id, frame))
+        item.captured_at = captured_at
+        item.dropped = dropped
+        return item
+
+
+class LatestFrameBuffer:
+    """
+    Single-writer, single-reader hand-off where the reader always gets the newest frame.
+
+    It works like a triple buffer that also supports readers holding on to recent
+    frames. The writer decodes into a buffer from ``acquire()`` and ``publish()``es
+    it as the latest frame. If the previous latest frame was never taken, that
+    frame is dropped and counted, and its buffer goes back to the pool. ``take()``
+    hands the reader the latest frame. The ``hold`` frames taken most recently are
+    never written to, and older ones are recycled. With ``hold=1`` this is the
+    classic back/middle/front triple buffer. In general ``hold + 2`` buffers
+    circulate and no allocation happens after warm-up.
+
+    The lock guards only a few reference swaps. Decoding and consuming happen
+    outside it, so neither side ever waits on the other's work.
+    """
+
+    def __init__(self, hold: int = 1) -> None:
+        self.hold = max(1, hold)
+        self.published = 0
+        self.dropped = 0  # published frames replaced before the reader took them
+        self.closed = False
+        self._free: deque = deque()
+        self._held: deque = deque()
+        self._latest = None  # (frame_id, frame, captured_at)
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+
+    def acquire(self) -> Optional[np.ndarray]:
+        """A recycled buffer to decode the next frame into, or None while the pool is still warming up."""
+        with self._lock:
+            return self._free.popleft() if self._free else None
+
+    def release(self, frame: Optional[np.ndarray]) -> None:
+        """Return an acquired buffer that was not published (e.g. the decoder failed)."""
+        if frame is not None:
+            with self._lock:
+                self._free.append(frame)
+
+    def publish(self, frame_id: int, frame: np.ndarray, captured_at: float) -> None:
+        with self._lock:
+            if self._latest is not None:
+                self.dropped += 1
+                self._free.append(self._latest[1])
+            self._latest = (frame_id, frame, captured_at)
+            self.published += 1
+            self._ready.notify()
+
+    def take(self, timeout: Optional[float] = None) -> Optional[CapturedFrame]:
+        """Wait up to ``timeout`` seconds for a frame newer than the last one taken; None on timeout or close."""
+        with self._lock:
+            if not self._ready.wait_for(lambda: self._latest is not None or self.closed, timeout):
+                return None
+            if self._latest is None:
+                return None
+            frame_id, frame, captured_at = self._latest
+            self._latest = None
+            self._held.append(frame)
+            while len(self._held) > self.hold:
+                self._free.append(self._held.popleft())
+            return CapturedFrame(frame_id, frame, captured_at, self.dropped)
+
+    def close(self) -> None:
+        with self._lock:
+            self.closed = True
+            self._ready.notify_all()
+
 
 class FrameStream:
-    def __init__(self, source: Union[str, int], resize: Optional[tuple[int, int]] = None, max_queue: int = 5, target_fps: float = 20.0) -> None:
+    """
+    Capture thread feeding a bounded, drop-oldest queue of frames.
+
+    With ``ring_slots`` set, frames are decoded (or resized) straight into a
+    preallocated ``SharedFrameRing`` and the queue carries ``FrameRef``s (frame
+    id, slot, sequence number) instead of arrays. ``frame_refs()`` hands those
+    out, e.g. to worker processes that ``SharedFrameRing.attach(stream.ring.spec)``,
+    and ``frames()`` yields zero-copy slot views in-process. The ring gets at
+    least ``max_queue + hold + 1`` slots (queued refs, frames the consumer
+    still uses, the slot being written), so pass the frames the pipeline keeps
+    in flight as ``hold``. ``frames()`` skips refs that were already overwritten.
+
+    With ``latest`` set there is no queue at all: capture and consumer meet in
+    a ``LatestFrameBuffer``. The consumer always gets the newest frame and
+    anything it was too slow for is dropped. Live sources are then read at the
+    camera's own rate instead of being paced to ``target_fps``, so driver
+    buffers never fill up with stale frames. Here too ``hold`` must cover the
+    frames the consumer keeps in flight (e.g. across pipelined stages).
+
+    With ``sample`` set, file sources keep only every Nth frame so that they
+    play at ``target_fps`` (N = source fps / target fps). Skipped frames are
+    ``grab()``bed, never ``retrieve()``d, and ``frame_id`` stays the source
+    frame index. ``hw_accel`` and ``decode_threads`` are passed to the capture
+    backend (see ``decode.open_capture``).
+
+    ``frames()`` yields ``CapturedFrame``s in every mode. ``dropped`` counts
+    frames that were captured but never reached the consumer.
+    """
+
+    def __init__(self, source: Union[str, int], resize: Optional[tuple[int, int]] = None, max_queue: int = 5, target_fps: float = 20.0,
+                 ring_slots: int = 0, latest: bool = False, hold: int = 1, sample: bool = False, hw_accel: bool = False,
+                 decode_threads: int = 0) -> None:
+        if latest and ring_slots:
+            raise ValueError("FrameStream: latest-frame mode and ring_slots are mutually exclusive")
         self.source = source
         self.resize = resize
         self.max_queue = max_queue
         self.target_fps = target_fps
+        self.ring_slots = ring_slots
+        self.hold = max(1, hold)
+        self.latest = latest
+        self.live = str(source).isdigit() or "://" in str(source)  # camera index or network stream
+        self.sample = sample
+        self.hw_accel = hw_accel
+        self.decode_threads = decode_threads
+        self.stride = 1  # source frames per kept frame (set in start() when sampling a file)
+        self.ring: Optional[SharedFrameRing] = None
+        self.buffer: Optional[LatestFrameBuffer] = LatestFrameBuffer(hold) if latest else None
+        self.queue_drops = 0  # oldest queued frames discarded to make room (capture thread)
+        self.overwritten = 0  # refs whose slot was reused before frames() got to them
         self._queue: Queue = Queue(maxsize=max_queue)
         self._cap = None
         self._thread = None
         self._running = False
         self._frame_id = 0
+        self._pending = None  # first frame, read in start() to size the ring
+        self._decode_buf = None
+
+    @property
+    def dropped(self) -> int:
+        """Frames captured but never handed to the consumer."""
+        return self.queue_drops + self.overwritten + (self.buffer.dropped if self.buffer is not None else 0)
 
     def start(self):
-        self._cap = cv2.VideoCapture(int(self.source) if str(self.source).isdigit() else self.source)
+        self._cap = open_capture(self.source, self.hw_accel, self.decode_threads)
         if not self._cap.isOpened():
             raise RuntimeError(f"Unable to open video source: {self.source}")
+        if self.sample and not self.live:
+            self.stride = decode_stride(self._cap.get(cv2.CAP_PROP_FPS), self.target_fps)
+        if self.ring_slots:
+            ok, first = self._cap.read()
+            if not ok:
+                raise RuntimeError(f"No frames from video source: {self.source}")
+            shape = (self.resize[1], self.resize[0], first.shape[2]) if self.resize else first.shape
+            # The writer must never wrap onto a queued frame or one the consumer still holds.
+            self.ring = SharedFrameRing(max(self.ring_slots, self.max_queue + self.hold + 1), shape)
+            self._pending = first
         self._running = True
         self._thread = threading.Thread(target=self._loop, daemon=True)
         self._thread.start()
@@ -28,43 +178,137 @@ class FrameStream:
 
     def stop(self):
         self._running = False
+        if self.buffer is not None:
+            self.buffer.close()
         if self._thread:
             self._thread.join(timeout=1)
         if self._cap:
             self._cap.release()
+        if self.ring is not None and (self._thread is None or not self._thread.is_alive()):
+            self.ring.close()
+            self.ring = None
 
-    def _loop(self):
-        min_interval = 1.0 / max(self.target_fps, 1e-3)
-        while self._running and self._cap:
-            start = time.perf_counter()
-            ok, frame = self._cap.read()
-            if not ok:
-                self._running = False
-                break
-            if self.resize:
-                frame = cv2.resize(frame, self.resize)
-            item = (self._frame_id, frame)
+    def _skip(self) -> bool:
+        """Grab (but never retrieve) the frames sampling leaves out; False at the end of the stream."""
+        for _ in range(self.stride - 1):
+            if not self._cap.grab():
+                return False
+        return True
+
+    def _read(self):
+        ok, frame = self._cap.read()
+        if ok and self.resize:
+            frame = cv2.resize(frame, self.resize)
+        return frame if ok else None
+
+    def _read_into_ring(self) -> Optional[FrameRef]:
+        slot, view = self.ring.begin_write()
+        if self._pending is not None:
+            ok, frame, self._pending = True, self._pending, None
+        elif self.resize:
+            # Decode into a reused buffer, then resize straight into the slot.
+            ok, frame = self._cap.read(self._decode_buf)
+            self._decode_buf = frame if ok else self._decode_buf
+        else:
+            ok, frame = self._cap.read(view)
+        if not ok:
+            self.ring.abort(slot)
+            return None
+        if frame is not view:
+            if frame.shape == view.shape:
+                np.copyto(view, frame)
+            else:
+                cv2.resize(frame, (view.shape[1], view.shape[0]), dst=view)
+        return FrameRef(self._frame_id, slot, self.ring.commit(slot))
+
+    def _read_latest(self) -> Optional[np.ndarray]:
+        buf = self.buffer.acquire()
+        if self.resize:
+            ok, frame = self._cap.read(self._decode_buf)
+            self._decode_buf = frame if ok else self._decode_buf
+            if ok:
+                fits = buf is not None and buf.shape[:2] == (self.resize[1], self.resize[0]) and buf.shape[2:] == frame.shape[2:]
+                frame = cv2.resize(frame, self.resize, dst=buf) if fits else cv2.resize(frame, self.resize)
+        else:
+            ok, frame = self._cap.read(buf)
+        if not ok:
+            self.buffer.release(buf)
+            return None
+        return frame
+
+    def _put(self, item) -> int:
+        """Enqueue without ever blocking the capture thread, dropping the oldest queued frames to make room."""
+        dropped = 0
+        while True:
             try:
-                self._queue.put(item, timeout=0.01)
+                self._queue.put_nowait(item)
+                break
             except Full:
-                # drop the oldest to maintain latency bounds
                 try:
                     self._queue.get_nowait()
+                    dropped += 1
                 except Empty:
                     pass
-                self._queue.put(item, timeout=0.01)
-            self._frame_id += 1
+        self.queue_drops += dropped
+        return dropped
+
+    def _loop(self):
+        min_interval = 1.0 / max(self.target_fps, 1e-3)
+        while self._running and self._cap:
+            start = time.perf_counter()
+            if self._frame_id and not self._skip():
+                break
+            if self.buffer is not None:
+                frame = self._read_latest()
+                if frame is None:
+                    break
+                self.buffer.publish(self._frame_id, frame, time.perf_counter())
+                # Live sources pace themselves; sleeping would only let stale frames pile up in the driver.
+                behind = self.live
+            else:
+                payload = self._read_into_ring() if self.ring is not None else self._read()
+                if payload is None:
+                    break
+                behind = self._put((self._frame_id, payload, time.perf_counter())) > 0 and self.live
+            self._frame_id += self.stride
             elapsed = time.perf_counter() - start
-            if elapsed < min_interval:
+            if not behind and elapsed < min_interval:
                 time.sleep(min_interval - elapsed)
+        self._running = False
 
-    def frames(self) -> Generator[tuple[int, any], None, None]:
-        while self._running:
+    def _items(self):
+        while True:
+            running = self._running  # read before polling so frames queued just before EOF are not lost
             try:
                 yield self._queue.get(timeout=0.1)
             except Empty:
-                if not self._running:
+                if not running:
+                    break
+
+    def frame_refs(self) -> Generator[FrameRef, None, None]:
+        """``FrameRef``s of captured frames (ring mode only); resolve them with ``ring.view``/``ring.read``."""
+        if self.ring is None:
+            raise RuntimeError("frame_refs() needs a stream started with ring_slots")
+        for _, ref, _ in self._items():
+            yield ref
+
+    def frames(self) -> Generator[CapturedFrame, None, None]:
+        if self.buffer is not None:
+            while True:
+                running = self._running
+                item = self.buffer.take(timeout=0.1)
+                if item is not None:
+                    yield item
+                elif not running or self.buffer.closed:
                     break
+            return
+        for frame_id, payload, captured_at in self._items():
+            if self.ring is not None:
+                payload = self.ring.view(payload)
+                if payload is None:
+                    self.overwritten += 1
+                    continue
+            yield CapturedFrame(frame_id, payload, captured_at, self.dropped)
 
 
 def open_stream(source: Union[str, int], resize: Optional[tuple[int, int]] = None) -> Generator[tuple[int, any], None, None]:
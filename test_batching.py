@@ -0,0 +1,138 @@
+"""Test dynamic micro-batching: batch formation, result scatter, latency percentiles and SLO adaptation."""
+
+import threading
+import time
+
+import numpy as np
+
+from src.classifiers.base import Classifier
+from src.detectors.base import Detector
+from src.utils.batching import BatchedClassifier, BatchedDetector, MicroBatcher
+from src.utils.types import ClassificationResult, Detection
+
+
+class CostModel:
+    """Batched function costing ``fixed + per_item * n`` ms; records the batch sizes it sees."""
+
+    def __init__(self, fixed_ms: float = 20.0, per_item_ms: float = 1.0):
+        self.fixed_ms = fixed_ms
+        self.per_item_ms = per_item_ms
+        self.sizes = []
+
+    def __call__(self, items):
+        self.sizes.append(len(items))
+        time.sleep((self.fixed_ms + self.per_item_ms * len(items)) / 1000)
+        return [item * 10 for item in items]
+
+
+def _callers(batcher, n_threads, per_thread):
+    results = {}
+
+    def worker(tid):
+        results[tid] = [batcher(tid * 100 + i) for i in range(per_thread)]
+
+    threads = [threading.Thread(target=worker, args=(t,)) for t in range(n_threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, time.perf_counter() - start
+
+
+def test_batches_concurrent_callers():
+    """Concurrent single requests share forward passes and every caller gets its own result."""
+    print("\nTesting micro-batch formation...")
+    model = CostModel(fixed_ms=20.0)
+    batcher = MicroBatcher(model, max_batch=8, max_wait_ms=10.0)
+    results, batched_s = _callers(batcher, 8, 5)
+    batcher.stop()
+
+    assert all(results[t] == [(t * 100 + i) * 10 for i in range(5)] for t in range(8))
+    assert sum(model.sizes) == 40 and max(model.sizes) <= 8
+    assert len(model.sizes) < 20  # mostly shared passes instead of 40 single ones
+    stats = batcher.stats()
+    assert stats["items"] == 40 and stats["mean_batch"] > 2
+    assert set(stats["queue_ms"]) == {"p50", "p95", "p99"}
+    assert stats["compute_ms"]["p50"] >= 20.0
+    assert stats["total_ms"]["p99"] >= stats["total_ms"]["p50"]
+
+    serial = MicroBatcher(CostModel(fixed_ms=20.0), max_batch=1, max_wait_ms=0.0)
+    _, serial_s = _callers(serial, 8, 5)
+    serial.stop()
+    assert batched_s < serial_s / 2  # throughput scales with load
+    print(f"✓ Micro-batch formation passed ({serial_s * 1000:.0f} ms serial vs {batched_s * 1000:.0f} ms batched)")
+
+
+def test_slo_adapts_batch_size():
+    """Batches shrink when they break the latency SLO and grow back while there is headroom."""
+    print("\nTesting SLO-adaptive batch size...")
+    batcher = MicroBatcher(CostModel(fixed_ms=2.0, per_item_ms=10.0), max_batch=16, max_wait_ms=5.0, slo_ms=60.0)
+    _callers(batcher, 16, 6)
+    stats = batcher.stats()
+    batcher.stop()
+    # 16 items would take 162 ms; under the SLO a batch holds at most 5 (52 ms) plus queueing
+    assert stats["batch_limit"] <= 5
+    assert stats["mean_batch"] < 8
+
+    relaxed = MicroBatcher(CostModel(fixed_ms=2.0, per_item_ms=0.1), max_batch=16, max_wait_ms=5.0, slo_ms=500.0)
+    relaxed.batch_limit = 2
+    _callers(relaxed, 16, 6)
+    relaxed.stop()
+    assert relaxed.batch_limit > 2
+    print("✓ SLO-adaptive batch size passed")
+
+
+def test_errors_and_wrappers():
+    """A failing batch fails each of its requests; the detector/classifier wrappers batch across threads."""
+    print("\nTesting batch errors and model wrappers...")
+
+    def broken(items):
+        raise ValueError("bad batch")
+
+    batcher = MicroBatcher(broken, max_wait_ms=1.0)
+    try:
+        batcher(1)
+    except ValueError as error:
+        assert "bad batch" in str(error)
+    else:
+        raise AssertionError("the batch error must reach the caller")
+    batcher.stop()
+
+    class Recorder(Detector):
+        def __init__(self):
+            self.sizes = []
+
+        def detect(self, frame):
+            raise AssertionError("batched detectors must use detect_batch")
+
+        def detect_batch(self, frames):
+            self.sizes.append(len(frames))
+            time.sleep(0.01)
+            return [[Detection("stop", 0.9, (int(f[0, 0, 0]), 0, 10, 10))] for f in frames]
+
+    class Labeller(Classifier):
+        def classify_crops(self, crops):
+            return [ClassificationResult(f"class_{int(c[0, 0, 0])}", 0.8) for c in crops]
+
+    inner = Recorder()
+    detector = BatchedDetector(inner, max_batch=4, max_wait_ms=10.0)
+    out = {}
+
+    def camera(value):
+        out[value] = detector.detect(np.full((8, 8, 3), value, dtype=np.uint8))
+
+    threads = [threading.Thread(target=camera, args=(v,)) for v in (1, 2, 3, 4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(out[v][0].bbox[0] == v for v in (1, 2, 3, 4))
+    assert max(inner.sizes) > 1
+    detector.batcher.stop()
+
+    classifier = BatchedClassifier(Labeller(), max_wait_ms=1.0)
+    crops = [np.full((4, 4, 3), v, dtype=np.uint8) for v in (5, 6, 7)]
+    assert [r.label for r in classifier.classify_crops(crops)] == ["class_5", "class_6", "class_7"]
+    classifier.batcher.stop()
+    print("✓ Batch errors and model wrappers passed")
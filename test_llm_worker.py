@@ -0,0 +1,174 @@
+"""Test the asynchronous LLM explanation worker (with a slow fake generator) and the explanation cache."""
+
+import time
+
+from src.config import LLMConfig
+from src.llm.async_worker import AsyncExplainer
+from src.llm.explainer import LLMExplainer
+
+
+class SlowFakeGenerator:
+    """Stands in for a transformers text-generation pipeline that takes a while."""
+
+    def __init__(self, delay: float = 0.2):
+        self.delay = delay
+        self.prompts = []
+
+    def __call__(self, prompt, max_new_tokens=None, temperature=None):
+        self.prompts.append(prompt)
+        time.sleep(self.delay)
+        return [{"generated_text": f"explained #{len(self.prompts)}"}]
+
+
+def _slow_explainer(delay: float = 0.2) -> LLMExplainer:
+    explainer = LLMExplainer(LLMConfig())
+    explainer._client = SlowFakeGenerator(delay)
+    return explainer
+
+
+def test_submit_never_blocks():
+    """Submitting and polling must return immediately while generation is slow."""
+    print("\nTesting AsyncExplainer non-blocking submit...")
+    worker = AsyncExplainer(_slow_explainer(0.2), max_pending=4).start()
+    try:
+        start = time.perf_counter()
+        assert worker.submit(1, "stop", 0.9)
+        assert worker.latest(1) is None
+        assert (time.perf_counter() - start) < 0.05
+
+        deadline = time.time() + 2.0
+        while worker.latest(1) is None and time.time() < deadline:
+            time.sleep(0.01)
+        assert worker.latest(1, "stop") == "explained #1"
+        assert worker.latest(1, "yield") is None
+    finally:
+        worker.stop()
+    print("✓ Non-blocking submit passed")
+
+
+def test_coalescing_and_bounded_queue():
+    """Repeated requests for one track coalesce; new tracks are rejected when full."""
+    print("\nTesting AsyncExplainer coalescing...")
+    explainer = _slow_explainer(0.15)
+    worker = AsyncExplainer(explainer, max_pending=2).start()
+    try:
+        assert worker.submit(1, "stop", 0.9)
+        time.sleep(0.05)  # track 1 is now in flight
+        for _ in range(10):
+            assert worker.submit(1, "stop", 0.9)
+            assert worker.submit(2, "yield", 0.8)
+            assert worker.submit(3, "no_entry", 0.8)
+        assert not worker.submit(4, "school_zone", 0.8)
+        assert worker.rejected == 1
+        assert worker.coalesced >= 27
+
+        deadline = time.time() + 3.0
+        while worker.pending_count() and time.time() < deadline:
+            time.sleep(0.01)
+        assert len(explainer._client.prompts) == 3
+        assert worker.latest(2) is not None and worker.latest(3) is not None
+    finally:
+        worker.stop()
+    print("✓ Coalescing and bounded queue passed")
+
+
+def test_explanation_cache_lru_ttl_and_persistence(tmp_path):
+    """Label-keyed cache evicts LRU entries, expires by TTL and reloads from disk."""
+    print("\nTesting ExplanationCache...")
+    from src.llm.cache import ExplanationCache
+
+    cache = ExplanationCache(max_entries=2, ttl_s=None, confidence_bucket=0.1)
+    cache.put("stop", 0.91, "Stop fully.")
+    assert cache.get("stop", 0.95) == "Stop fully."  # same bucket, any track
+    assert cache.get("stop", 0.55) is None  # different bucket
+    cache.put("yield", 0.8, "Give way.")
+    cache.get("stop", 0.9)  # stop is now most recently used
+    cache.put("no_entry", 0.8, "Do not enter.")
+    assert cache.get("yield", 0.8) is None
+    assert cache.stats() == {"hits": 2, "misses": 2, "evictions": 1, "expirations": 0, "size": 2}
+
+    expiring = ExplanationCache(ttl_s=0.05)
+    expiring.put("stop", 0.9, "Stop fully.")
+    time.sleep(0.1)
+    assert expiring.get("stop", 0.9) is None
+    assert expiring.stats()["expirations"] == 1
+
+    db = str(tmp_path / "explanations.sqlite")
+    persisted = ExplanationCache(path=db)
+    persisted.put("speed_limit_50", 0.88, "Keep below 50 km/h.")
+    persisted.close()
+    warm = ExplanationCache(path=db)
+    assert warm.get("speed_limit_50", 0.85) == "Keep below 50 km/h."
+    warm.close()
+    assert ExplanationCache(path=db, template="other prompt {label} {confidence}").get("speed_limit_50", 0.85) is None
+    print("✓ Explanation cache passed")
+
+
+def test_failed_generation_is_not_cached():
+    """A generator error yields no explanation, and nothing is cached for the sign."""
+    print("\nTesting LLM failure handling...")
+    from src.llm.cache import ExplanationCache
+
+    def failing(prompt, max_new_tokens=None, temperature=None):
+        raise RuntimeError("model offline")
+
+    explainer = LLMExplainer(LLMConfig())
+    explainer._client = failing
+    assert explainer.explain("stop", 0.9) is None
+
+    cache = ExplanationCache()
+    worker = AsyncExplainer(explainer, on_result=cache.put).start()
+    try:
+        worker.submit(1, "stop", 0.9)
+        deadline = time.time() + 1.0
+        while worker.pending_count() and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        worker.stop()
+    assert worker.latest(1) is None and worker.completed == 0
+    assert cache.get("stop", 0.9) is None
+    print("✓ Failed generations are not cached")
+
+
+def test_pipeline_forgets_expired_tracks():
+    """Once the tracker drops a track, its pending and finished explanations are forgotten."""
+    print("\nTesting expired-track cleanup...")
+    import numpy as np
+    from _testing import CenterSign, StopClassifier, make_models
+    from src.config import AppConfig
+    from src.pipeline import _FrameWork, _StreamPipeline
+
+    class RecordingWorker:
+        def __init__(self):
+            self.submitted, self.forgotten = [], []
+
+        def latest(self, track_id, label=None):
+            return None
+
+        def submit(self, track_id, label, confidence):
+            self.submitted.append(track_id)
+            return True
+
+        def forget(self, track_id):
+            self.forgotten.append(track_id)
+
+    class Blinking(CenterSign):
+        visible = True
+
+        def detect(self, frame):
+            return super().detect(frame) if self.visible else []
+
+    cfg = AppConfig()
+    cfg.tracking.max_age = 2
+    detector = Blinking()
+    pipeline = _StreamPipeline(cfg, make_models(detector, StopClassifier(), cfg))
+    pipeline.llm_worker = worker = RecordingWorker()
+    frame = np.full((480, 640, 3), 90, dtype=np.uint8)
+    for frame_id in range(10):
+        detector.visible = frame_id < 5
+        work = pipeline.detect(pipeline.preprocess(_FrameWork(frame_id, frame, 0.0)))
+        pipeline.finalize(pipeline.classify(work))
+        if frame_id == 4:
+            assert worker.submitted and not worker.forgotten
+    assert worker.forgotten == [0]
+    print("✓ Expired tracks are forgotten")
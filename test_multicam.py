@@ -0,0 +1,148 @@
+"""Test multi-camera serving: shared models, batches across cameras, per-camera trackers and result streams."""
+
+import time
+
+import numpy as np
+
+from _testing import make_models, sync_config
+from src.classifiers.base import Classifier
+from src.detectors.base import Detector
+from src.multicam import MultiCameraServer, parse_sources
+from src.utils.types import ClassificationResult, Detection
+
+
+class BatchRecorder(Detector):
+    """Reports one sign per image whose position encodes the image's brightness (= camera)."""
+
+    def __init__(self):
+        self.batches = []
+
+    def detect(self, frame):
+        raise AssertionError("multi-camera frames must go through detect_batch")
+
+    def detect_batch(self, frames):
+        self.batches.append(len(frames))
+        out = []
+        for frame in frames:
+            x = int(frame[320, 320, 0])
+            out.append([Detection("stop", 0.9, (x, 300, x + 40, 340))])
+        return out
+
+
+class CropCounter(Classifier):
+    def __init__(self):
+        self.calls = []
+
+    def classify_crops(self, crops):
+        self.calls.append(len(crops))
+        return [ClassificationResult("stop", 0.95) for _ in crops]
+
+
+def _camera(value, count, delay=0.0):
+    for frame_id in range(count):
+        if delay:
+            time.sleep(delay)
+        yield frame_id, np.full((480, 640, 3), value, dtype=np.uint8)
+
+
+def _config():
+    cfg = sync_config()
+    cfg.classifier.reuse_stable_tracks = False
+    cfg.preprocess.enable_hsv_mask = False
+    for name in ("enable_clahe", "enable_blur", "enable_sharpen"):
+        setattr(cfg.preprocess, name, False)
+    return cfg
+
+
+def test_parse_sources():
+    print("\nTesting camera source names...")
+    assert parse_sources(["front=0", "left=1", "videos/right.mp4"]) == {"front": "0", "left": "1", "cam2": "videos/right.mp4"}
+    assert parse_sources(["rtsp://cam/stream?id=3"]) == {"cam0": "rtsp://cam/stream?id=3"}
+    try:
+        parse_sources(["a=0", "a=1"])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("duplicate camera names must be rejected")
+    print("✓ Camera source names passed")
+
+
+def test_batches_across_cameras():
+    """Frames of all cameras share one detector and one classifier pass; each camera keeps its own tracks."""
+    print("\nTesting batched multi-camera inference...")
+    detector, classifier = BatchRecorder(), CropCounter()
+    sources = {"front": _camera(100, 5), "left": _camera(150, 5), "right": _camera(200, 5)}
+    server = MultiCameraServer(sources, _config(), models=make_models(detector, classifier), max_wait_ms=500)
+    results = list(server.run())
+
+    assert len(results) == 15
+    assert detector.batches == [3] * 5 and classifier.calls == [3] * 5
+    by_camera = {}
+    for result in results:
+        by_camera.setdefault(result.source_id, []).append(result)
+        assert result.stats["batch"] == {"cameras": 3, "full_frames": 3, "crops": 3}
+    for name, x in (("front", 100), ("left", 150), ("right", 200)):
+        frames = by_camera[name]
+        assert [r.frame_id for r in frames] == list(range(5))
+        # letterboxed 640x480 -> scale 1, 80 px top padding
+        assert all(r.detections[0].bbox == (x, 220, x + 40, 260) for r in frames)
+        # separate trackers: each camera numbers its own tracks from 0
+        assert {r.detections[0].track_id for r in frames} == {0}
+    assert len({id(p.tracker) for p in server.pipelines.values()}) == 3
+    print("✓ Batched multi-camera inference passed")
+
+
+def test_fast_camera_backpressure():
+    """While batches wait for a slow camera, a fast one blocks on its own bounded queue instead of piling up frames."""
+    print("\nTesting per-camera backpressure...")
+    produced = {"fast": 0}
+
+    def fast_camera():
+        for frame_id in range(200):
+            produced["fast"] = frame_id + 1
+            yield frame_id, np.full((480, 640, 3), 100, dtype=np.uint8)
+
+    cfg = _config()
+    sources = {"fast": fast_camera(), "slow": _camera(200, 5, delay=0.05)}
+    server = MultiCameraServer(sources, cfg, models=make_models(BatchRecorder(), CropCounter()), max_wait_ms=500)
+    leads = []
+    for result in server.run():
+        if result.source_id == "fast" and result.frame_id < 5:
+            leads.append(produced["fast"] - (result.frame_id + 1))
+    # its inbox, the frame being admitted and the one blocked on a full queue
+    assert max(leads) <= cfg.runtime.frame_queue + 2, leads
+    print("✓ Per-camera backpressure passed")
+
+
+def test_deadline_and_result_streams():
+    """A slow camera does not hold the others beyond the deadline; per-camera streams stay in order."""
+    print("\nTesting batch deadline and per-camera streams...")
+    detector, classifier = BatchRecorder(), CropCounter()
+    sources = {"fast": _camera(100, 6), "slow": _camera(200, 2, delay=0.3)}
+    server = MultiCameraServer(sources, _config(), models=make_models(detector, classifier), max_wait_ms=20).start()
+    fast = list(server.results("fast"))
+    slow = list(server.results("slow"))
+    server.stop()
+
+    assert [r.frame_id for r in fast] == list(range(6))
+    assert [r.frame_id for r in slow] == [0, 1]
+    assert sum(detector.batches) == 8
+    assert max(detector.batches) <= 2 and detector.batches.count(1) >= 4  # fast frames did not wait for the slow camera
+    print("✓ Batch deadline and per-camera streams passed")
+
+
+def test_stop_with_unread_results():
+    """Stopping with a full, unread result queue still ends the serving thread and each stream."""
+    print("\nTesting stop with unread results...")
+    sources = {"front": _camera(100, 50)}
+    server = MultiCameraServer(sources, _config(), models=make_models(BatchRecorder(), CropCounter()),
+                               max_wait_ms=5, result_queue=2).start()
+    deadline = time.time() + 5
+    while not server._outboxes["front"].full() and time.time() < deadline:
+        time.sleep(0.01)
+    assert server._outboxes["front"].full()
+    server.stop()
+    server._serve_thread.join(timeout=5)
+    assert not server._serve_thread.is_alive()
+    assert len(list(server.results("front"))) < 2  # end-of-stream took the place of the oldest result
+    print("✓ Stop with unread results passed")
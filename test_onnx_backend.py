@@ -0,0 +1,119 @@
+"""Test ONNX export and the onnxruntime classifier/detector backends."""
+
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("onnxruntime")
+pytest.importorskip("onnx")
+
+from src.config import AppConfig, ClassifierConfig, DetectorConfig
+from src.optimization.onnx_export import export_onnx
+from src.pipeline import build_classifier, build_detector
+from src.classifiers.onnx_classifier import OnnxClassifier, _MEAN, _STD
+from src.detectors.onnx_detector import OnnxDetector
+from src.utils.preprocess import FrameTransform
+
+
+def _tiny_net(num_classes: int = 3):
+    torch.manual_seed(0)
+    return torch.nn.Sequential(
+        torch.nn.Conv2d(3, 8, 3, stride=2, padding=1),
+        torch.nn.ReLU(),
+        torch.nn.AdaptiveAvgPool2d(1),
+        torch.nn.Flatten(),
+        torch.nn.Linear(8, num_classes),
+    )
+
+
+def test_onnx_classifier_matches_torch(tmp_path):
+    """Exported classifier runs batched on onnxruntime and agrees with PyTorch."""
+    print("\nTesting OnnxClassifier...")
+    net = _tiny_net().eval()
+    path = str(tmp_path / "cls.onnx")
+    export_onnx(net, torch.zeros(1, 3, 32, 32), path, metadata={"class_names": '["stop", "yield", "no_entry"]'})
+
+    cfg = ClassifierConfig(name="onnx", model_path=path, device="cpu", onnx_intra_threads=1)
+    clf = build_classifier(AppConfig(classifier=cfg))
+    assert isinstance(clf, OnnxClassifier)
+    assert clf.input_size == (32, 32)
+
+    rng = np.random.default_rng(0)
+    crops = [rng.integers(0, 255, (h, w, 3), dtype=np.uint8) for h, w in [(32, 32), (32, 32), (32, 32)]]
+    results = clf.classify_crops(crops)
+    assert len(results) == 3 and all(r.label in ("stop", "yield", "no_entry") for r in results)
+
+    batch = np.stack([((c.astype(np.float32) / 255.0 - _MEAN) / _STD).transpose(2, 0, 1) for c in crops])
+    with torch.no_grad():
+        expected = net(torch.from_numpy(batch)).numpy()
+    got = np.concatenate([r.logits for r in results])
+    assert np.allclose(got, expected, atol=1e-4)
+    print("✓ ONNX classifier matches torch")
+
+
+def test_onnx_detector_decode():
+    """YOLOv8 head decoding rescales boxes and applies class-aware NMS."""
+    print("\nTesting OnnxDetector decoding...")
+    det = build_detector(AppConfig(detector=DetectorConfig(name="onnx", device="cpu", conf_threshold=0.3)))
+    assert isinstance(det, OnnxDetector)
+    det.names = {0: "stop", 1: "yield"}
+    # columns: cx, cy, w, h, score_stop, score_yield
+    preds = np.array([
+        [100, 100, 40, 40, 0.9, 0.1],
+        [102, 101, 40, 40, 0.8, 0.1],  # overlaps the first, same class -> suppressed
+        [101, 100, 40, 40, 0.1, 0.7],  # overlaps but different class -> kept
+        [300, 300, 20, 20, 0.2, 0.1],  # below threshold
+    ], dtype=np.float32)
+    # Network input is half the source width: x coordinates double on the way back.
+    dets = det._decode(preds.T, FrameTransform(scale_x=0.5, scale_y=1.0, pad_x=0, pad_y=0, source_size=(1280, 640)))
+    assert [d.label for d in dets] == ["stop", "yield"]
+    assert dets[0].bbox == (160, 80, 240, 120)
+    print("✓ ONNX detector decoding passed")
+
+
+class _BrightnessHead(torch.nn.Module):
+    """Fake YOLOv8 head: one anchor centred in the input whose 'stop' score is the image brightness."""
+
+    def forward(self, x):
+        score = x.mean(dim=(1, 2, 3)).reshape(-1, 1, 1)
+        box = torch.tensor([32.0, 32.0, 16.0, 16.0]).reshape(1, 4, 1) + score * 0
+        return torch.cat([box, score, score * 0], dim=1)  # (N, 4 + 2 classes, 1 anchor)
+
+
+def test_onnx_detector_batch(tmp_path):
+    """detect_batch letterboxes every image and runs them through one session call."""
+    print("\nTesting OnnxDetector batching...")
+    path = str(tmp_path / "det.onnx")
+    export_onnx(_BrightnessHead(), torch.zeros(1, 3, 64, 64), path)
+    det = build_detector(AppConfig(detector=DetectorConfig(name=path, device="cpu", conf_threshold=0.5)))
+    assert det.dynamic_batch and det.input_size == (64, 64)
+
+    calls = []
+    session = det.session
+
+    class CountingSession:
+        def run(self, *args, **kwargs):
+            calls.append(args[1]["images"].shape)
+            return session.run(*args, **kwargs)
+
+    det.session = CountingSession()
+    bright = np.full((128, 128, 3), 255, dtype=np.uint8)
+    dark = np.zeros((128, 128, 3), dtype=np.uint8)
+    results = det.detect_batch([bright, dark, bright])
+    assert calls == [(3, 3, 64, 64)]
+    assert [len(r) for r in results] == [1, 0, 1]
+    assert results[0][0].bbox == (48, 48, 80, 80)  # centre box mapped back to the 128 px source
+    print("✓ ONNX detector batching passed")
+
+
+def test_apply_quantization_onnx_paths(tmp_path, monkeypatch):
+    """The INT8 copy sits next to the exported file; a module instead of a path is rejected."""
+    print("\nTesting ONNX quantization paths...")
+    from src.optimization import optim_utils
+
+    monkeypatch.setattr(optim_utils.quantization, "quantize_onnx", lambda path, output: output)
+    assert optim_utils.apply_quantization("models/v1.2/classifier.onnx") == "models/v1.2/classifier_int8.onnx"
+    assert optim_utils.apply_quantization(tmp_path / "v1.2" / "detector") == str(tmp_path / "v1.2" / "detector_int8.onnx")
+    with pytest.raises(TypeError):
+        optim_utils.apply_quantization(_tiny_net())
+    print("✓ ONNX quantization paths")
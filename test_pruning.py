@@ -0,0 +1,62 @@
+"""Test structured channel pruning and loading pruned weights through build_classifier."""
+
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+models = pytest.importorskip("torchvision.models")
+
+from src.config import AppConfig, ClassifierConfig
+from src.optimization.pruning import count_params, prune_channels, prune_classifier, prune_to_budget
+from src.pipeline import build_classifier
+
+
+@pytest.fixture
+def random_mobilenet(monkeypatch):
+    # Avoid downloading ImageNet weights; random weights exercise the same layers.
+    original = models.mobilenet_v3_large
+    monkeypatch.setattr(models, "mobilenet_v3_large", lambda weights=None: original(weights=None))
+
+
+def test_prune_channels_shrinks_resnet():
+    """Pruning removes whole hidden channels and keeps block input/output widths."""
+    print("\nTesting ResNet channel pruning...")
+    model = models.resnet18(weights=None).eval()
+    pruned = prune_channels(model, 0.5)
+    assert not pruned.training
+    assert pruned.layer1[0].conv1.out_channels == 32 and pruned.layer1[0].conv2.in_channels == 32
+    assert pruned.layer1[0].conv2.out_channels == 64
+    assert count_params(pruned) < 0.6 * count_params(model)
+    out = pruned(torch.zeros(1, 3, 64, 64))
+    assert out.shape == (1, 1000)
+    print("✓ ResNet hidden channels pruned")
+
+
+def test_prune_classifier_round_trip(tmp_path, random_mobilenet):
+    """Pruned MobileNetV3 weights load back via model_path and reproduce the pruned outputs."""
+    print("\nTesting pruning round trip...")
+    torch.manual_seed(0)
+    output = str(tmp_path / "pruned.pt")
+    cfg = ClassifierConfig(name="mobilenet_v3_large", device="cpu")
+    report = prune_classifier(cfg, output, amount=0.4)
+    assert report.params_after < report.params_before
+    print(f"✓ {report.summary()}")
+
+    state = torch.load(output)
+    clf = build_classifier(AppConfig(classifier=ClassifierConfig(name="mobilenet_v3_large", device="cpu", model_path=output)))
+    for key, value in clf.model.state_dict().items():
+        assert value.shape == state[key].shape, key
+    crops = [np.full((40, 40, 3), v, dtype=np.uint8) for v in (20, 220)]
+    assert len(clf.classify_crops(crops)) == 2
+    print("✓ Pruned weights load back through build_classifier")
+
+
+def test_prune_to_budget_stops_at_max_amount():
+    """An unreachable latency budget prunes up to max_amount and no further."""
+    model = models.resnet18(weights=None).eval()
+    pruned, amount = prune_to_budget(model, budget_ms=0.0, input_size=(32, 32), step=0.3, max_amount=0.6)
+    assert amount == pytest.approx(0.6)
+    assert count_params(pruned) < count_params(model)
+    pruned_again, none = prune_to_budget(model, budget_ms=1e9, input_size=(32, 32))
+    assert none == 0.0 and count_params(pruned_again) == count_params(model)
+    print("✓ Latency-budget search")
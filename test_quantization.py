@@ -0,0 +1,56 @@
+"""Test post-training INT8 quantization and loading the result through build_classifier."""
+
+import cv2
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+models = pytest.importorskip("torchvision.models")
+
+from src.config import AppConfig, ClassifierConfig
+from src.optimization.quantization import quantize_classifier
+from src.pipeline import build_classifier
+
+
+def _write_crops(root, count=6):
+    rng = np.random.default_rng(0)
+    for i in range(count):
+        cls_dir = root / ("stop" if i % 2 else "yield")
+        cls_dir.mkdir(parents=True, exist_ok=True)
+        crop = rng.integers(0, 255, size=(48 + i, 40 + i, 3), dtype=np.uint8)
+        cv2.imwrite(str(cls_dir / f"{i}.png"), crop)
+
+
+def test_quantize_classifier_round_trip(tmp_path, monkeypatch):
+    """Calibrated INT8 weights reload via build_classifier(quantized=True) and give the same outputs."""
+    print("\nTesting INT8 quantization...")
+    # Avoid downloading ImageNet weights; random weights exercise the same graph.
+    original = models.mobilenet_v3_large
+    monkeypatch.setattr(models, "mobilenet_v3_large", lambda weights=None: original(weights=None))
+    torch.manual_seed(0)
+
+    _write_crops(tmp_path / "crops")
+    output = str(tmp_path / "int8.pt")
+    cfg = ClassifierConfig(name="mobilenet_v3_large", device="cpu")
+    report = quantize_classifier(cfg, str(tmp_path / "crops"), output, backend="x86", batch_size=3)
+
+    assert report.eval_images == 6 and report.calibration_images == 6
+    assert 0.0 <= report.top1_agreement <= 1.0
+    assert report.int8_size_mb < report.fp32_size_mb
+    print(f"✓ {report.summary()}")
+
+    # The quantized classifier is built from fresh float weights, then gets the saved INT8 state.
+    torch.manual_seed(1)
+    qcfg = ClassifierConfig(name="mobilenet_v3_large", device="cpu", model_path=output, quantized=True)
+    clf = build_classifier(AppConfig(classifier=qcfg))
+    assert clf.device == "cpu"
+    crops = [np.full((50, 50, 3), v, dtype=np.uint8) for v in (30, 200)]
+    results = clf.classify_crops(crops)
+    assert len(results) == 2 and all(r.logits.shape == (1, 1000) for r in results)
+
+    reference = torch.load(output)
+    clf_state = clf.model.state_dict()
+    for key, value in reference.items():
+        if isinstance(value, torch.Tensor):
+            assert torch.equal(clf_state[key], value), key
+    print("✓ Quantized weights load back through build_classifier")
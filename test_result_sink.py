@@ -0,0 +1,80 @@
+"""Test the columnar result sink: row layout, batched flushing, logits and memory-mapped reads."""
+
+import os
+
+import numpy as np
+import pytest
+
+from src.utils.result_sink import ResultSink, infer_format, read_results
+from src.utils.types import ClassificationResult, Detection, FrameResult
+
+
+def _results(count=10):
+    out = []
+    for frame_id in range(count):
+        dets, classes = [], []
+        for k in range(frame_id % 3):  # frames with 0, 1 and 2 detections
+            dets.append(Detection("stop" if k == 0 else "yield", 0.5 + 0.01 * frame_id, (k * 10, 5, k * 10 + 8, 13), track_id=k))
+            logits = np.arange(4, dtype=np.float32) + frame_id if frame_id >= 4 else None  # the classifier starts late
+            classes.append(ClassificationResult(dets[-1].label, 0.9, logits) if k == 0 else None)
+        out.append(FrameResult(detections=dets, classification=classes[0] if classes else None, llm_explanation=None,
+                               frame_id=frame_id, fps=20.0, latency_ms=10.0 + frame_id, frame_age_ms=12.0 + frame_id,
+                               stage_latency={"detect_ms": 4.0, "classify_ms": 2.0}, classifications=classes, safety_tier="warn"))
+    return out
+
+
+def test_npy_columns(tmp_path):
+    """Without pyarrow: one memory-mappable .npy per column, appended batch by batch."""
+    print("\nTesting npy result columns...")
+    path = str(tmp_path / "drive")
+    assert infer_format(path) == "npy" and infer_format("a.parquet") == "parquet" and infer_format("a.arrow") == "arrow"
+    with ResultSink(path, batch_rows=3, logits=True) as sink:
+        for result in _results():
+            sink.write(result, source_id="front")
+    assert sink.frames == 10 and sink.rows == 13  # 9 detections plus one row per empty frame
+
+    cols = read_results(path)
+    assert isinstance(cols["frame_id"], np.memmap) and len(cols["frame_id"]) == 13
+    empty = cols["det_index"] == -1
+    assert cols["frame_id"][empty].tolist() == [0, 3, 6, 9]
+    assert list(cols["label"][:4]) == [None, "stop", "stop", "yield"]
+    assert list(cols["cls_label"][:4]) == [None, "stop", "stop", None]
+    assert np.isnan(cols["det_confidence"][0]) and cols["track_id"][3] == 1
+    assert cols["x1"][3] == 10 and cols["y2"][3] == 13
+    assert set(cols["source_id"]) == {"front"} and cols["latency_ms"][-1] == 19.0 and cols["frame_age_ms"][-1] == 21.0
+    assert cols["detect_ms"][0] == 4.0 and np.isnan(cols["preprocess_ms"][0])
+    # Logits arrived after the first flush: earlier rows are NaN, later ones carry the vector
+    assert cols["logits"].shape == (13, 4) and np.isnan(cols["logits"][:5]).all()
+    row = np.flatnonzero((cols["frame_id"] == 5) & (cols["det_index"] == 0))[0]
+    assert cols["logits"][row].tolist() == [5.0, 6.0, 7.0, 8.0]
+
+    subset = read_results(path, columns=["frame_id", "label"])
+    assert set(subset) == {"frame_id", "label"}
+    print("✓ npy result columns passed")
+
+
+def test_arrow_and_parquet(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    print("\nTesting Arrow/Parquet result files...")
+    for name in ("drive.arrow", "drive.parquet"):
+        path = str(tmp_path / name)
+        with ResultSink(path, batch_rows=4, logits=True) as sink:
+            for result in _results():
+                sink.write(result)
+        table = read_results(path)
+        assert isinstance(table, pa.Table) and table.num_rows == 13
+        assert table.column("label").to_pylist()[:4] == [None, "stop", "stop", "yield"]
+        logits = table.column("logits").to_pylist()
+        assert logits[0] is None and logits[6] == [5.0, 6.0, 7.0, 8.0]  # row 6: frame 5, first detection
+        assert read_results(path, columns=["frame_id"]).column_names == ["frame_id"]
+    print("✓ Arrow/Parquet result files passed")
+
+
+def test_missing_pyarrow(tmp_path):
+    from src.utils import result_sink
+
+    if result_sink.pa is not None:
+        pytest.skip("pyarrow is installed")
+    with pytest.raises(RuntimeError):
+        ResultSink(str(tmp_path / "drive.parquet"))
+    assert not os.path.exists(tmp_path / "drive.parquet")